@@ -4,35 +4,56 @@ Authentication dependency for protected routes
 """
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, get_async_db
 from app.db.models import User
 from app.core.security import verify_access_token
 from app.core.exceptions import UnauthorizedException
 from app.core.constants import UserRole
+from app.services.user_service import UserService, UserPrincipal
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+class CurrentUser:
     """
-    Dependency to get current authenticated user from JWT token
+    Authenticated user for the current request
     
-    Args:
-        credentials: HTTP Bearer credentials
-        db: Database session
+    Principal fields (id, email, role, names, is_active) come from the
+    principal cache; other columns are not attributes. Routes that need
+    them depend on `get_current_db_user` (or read `.user`, the full row from
+    the request's read-only session, in sync routes).
+    """
     
-    Returns:
-        Current user
+    __slots__ = ("id", "email", "role", "first_name", "last_name", "is_active", "_db", "_user")
     
-    Raises:
-        UnauthorizedException: If token is invalid or user not found
-    """
+    def __init__(self, principal: UserPrincipal, db: Optional[Session]):
+        self.id = principal.id
+        self.email = principal.email
+        self.role = principal.role
+        self.first_name = principal.first_name
+        self.last_name = principal.last_name
+        self.is_active = principal.is_active
+        self._db = db
+        self._user = None
+    
+    @property
+    def user(self) -> User:
+        """Full ORM user, loaded on first access"""
+        if self._user is None:
+            if self._db is None:
+                raise RuntimeError("Full user row is not available in async routes")
+            self._user = self._db.get(User, self.id)
+            if self._user is None:
+                raise UnauthorizedException(detail="User not found")
+        return self._user
+
+
+def _user_id_from_token(credentials: HTTPAuthorizationCredentials) -> int:
+    """Validate bearer token and return its user ID"""
     try:
         # Verify token
         payload = verify_access_token(credentials.credentials)
@@ -43,7 +64,7 @@ def get_current_user(
         
         # Convert user_id from string to int
         try:
-            user_id = int(user_id_str)
+            return int(user_id_str)
         except (ValueError, TypeError):
             raise UnauthorizedException(detail="Invalid user ID in token")
         
@@ -54,22 +75,77 @@ def get_current_user(
         import logging
         logging.error(f"Token validation error: {type(e).__name__}: {str(e)}")
         raise UnauthorizedException(detail="Could not validate credentials")
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if user is None:
+
+
+def _check_principal(principal: Optional[UserPrincipal]) -> UserPrincipal:
+    if principal is None:
         raise UnauthorizedException(detail="User not found")
     
-    if not user.is_active:
+    if not principal.is_active:
         raise UnauthorizedException(detail="User is inactive")
     
+    return principal
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_read_db)
+) -> CurrentUser:
+    """
+    Dependency to get current authenticated user from JWT token
+    
+    Args:
+        credentials: HTTP Bearer credentials
+        db: Read-only database session
+    
+    Returns:
+        Current user principal (full row available as `.user`)
+    
+    Raises:
+        UnauthorizedException: If token is invalid or user not found
+    """
+    user_id = _user_id_from_token(credentials)
+    
+    # Get user principal (cached, short TTL)
+    principal = _check_principal(UserService.get_principal(db, user_id))
+    
+    return CurrentUser(principal, db)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """
+    Async version of `get_current_user` for routes using `get_async_db`
+    
+    Only principal fields are available; load the full row with
+    `await db.get(User, current_user.id)` if needed.
+    """
+    user_id = _user_id_from_token(credentials)
+    principal = _check_principal(await UserService.get_principal_async(db, user_id))
+    return CurrentUser(principal, None)
+
+
+def get_current_db_user(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency to get the full ORM row of the current user
+    
+    Use for endpoints that modify the user or need columns outside the principal.
+    The row is loaded in the request's writable session.
+    """
+    user = db.get(User, current_user.id)
+    if user is None:
+        raise UnauthorizedException(detail="User not found")
     return user
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user)
+) -> CurrentUser:
     """
     Dependency to ensure user is active
     """
@@ -91,7 +167,7 @@ def require_role(required_role: UserRole):
     Returns:
         Dependency function
     """
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    def role_checker(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if current_user.role != required_role and current_user.role != UserRole.ADMIN:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -102,7 +178,7 @@ def require_role(required_role: UserRole):
     return role_checker
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to require admin role"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -112,7 +188,7 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def require_seller_or_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_seller_or_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """Dependency to require seller or admin role"""
     if current_user.role not in [UserRole.SELLER, UserRole.ADMIN]:
         raise HTTPException(
@@ -1,24 +1,31 @@
 """
 Admin endpoints - Administrative functions
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
-from app.db.models import User, Order, Product
+from app.config import settings
+from app.db.session import get_db, get_read_db, slow_query_recorder
+from app.db.models import User, Order, Product, EmailCampaign
 from app.schemas.user import UserResponse, UserAdminUpdate
 from app.schemas.order import OrderResponse, OrderListResponse, OrderFilter
 from app.schemas.product import ProductResponse
 from app.schemas.common import MessageResponse
 from app.services.user_service import UserService
 from app.services.order_service import OrderService
-from app.core.exceptions import NotFoundException
-from app.api.v1 import require_admin
-from pydantic import BaseModel
+from app.services.product_service import PRODUCT_RESPONSE_COLUMNS
+from app.core.constants import UserRole, CampaignStatus
+from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.profiling import (
+    ProfilingRoute, PROFILE_HEADER, PROFILE_QUERY_PARAM, create_profile_token, profile_store
+)
+from app.api.v1 import CurrentUser, require_admin
+from pydantic import BaseModel, Field
 import math
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class PlatformStats(BaseModel):
@@ -33,8 +40,8 @@ class PlatformStats(BaseModel):
 
 @router.get("/stats", response_model=PlatformStats)
 def get_platform_stats(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get platform-wide statistics
@@ -77,8 +84,8 @@ class DashboardStats(BaseModel):
 
 @router.get("/dashboard", response_model=DashboardStats)
 def get_dashboard_stats(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get admin dashboard statistics
@@ -114,8 +121,8 @@ def get_dashboard_stats(
 def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all users
@@ -129,8 +136,8 @@ def get_all_users(
 @router.get("/users/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get user by ID
@@ -149,7 +156,7 @@ def get_user(
 def update_user(
     user_id: int,
     user_data: UserAdminUpdate,
-    current_user: User = Depends(require_admin),
+    current_user: CurrentUser = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -164,7 +171,7 @@ def update_user(
 @router.delete("/users/{user_id}", response_model=MessageResponse)
 def delete_user(
     user_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: CurrentUser = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -179,7 +186,7 @@ def delete_user(
 @router.patch("/users/{user_id}/toggle-active", response_model=UserResponse)
 def toggle_user_active(
     user_id: int,
-    current_user: User = Depends(require_admin),
+    current_user: CurrentUser = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -198,6 +205,7 @@ def toggle_user_active(
     user.is_active = not user.is_active
     db.commit()
     db.refresh(user)
+    UserService.invalidate_principal(user_id)
     
     return user
 
@@ -208,8 +216,8 @@ def get_all_orders(
     page_size: int = Query(20, ge=1, le=100),
     status: str = Query(None),
     user_id: int = Query(None),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all orders with filtering
@@ -232,39 +240,211 @@ def get_all_orders(
     )
     
     skip = (page - 1) * page_size
-    orders, total = OrderService.get_all_orders(db, filters, skip, page_size)
+    orders, total = OrderService.get_order_rows(db, filters, skip, page_size)
     
     total_pages = math.ceil(total / page_size) if total > 0 else 0
     
-    return OrderListResponse(
-        items=orders,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return ORJSONResponse({
+        "items": orders,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+    })
 
 
 @router.get("/products", response_model=List[ProductResponse])
 def get_all_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all products (including inactive)
     
     Requires admin role
     """
-    products = db.query(Product).offset(skip).limit(limit).all()
-    return products
+    rows = db.query(*PRODUCT_RESPONSE_COLUMNS).offset(skip).limit(limit).all()
+    return ORJSONResponse([row._asdict() for row in rows])
+
+
+class EmailCampaignCreate(BaseModel):
+    """Bulk email campaign request"""
+    subject: str = Field(..., min_length=1, max_length=255)
+    html_content: str = Field(..., min_length=1)
+    text_content: Optional[str] = None
+    role: Optional[UserRole] = None  # Send only to users with this role
+
+
+class EmailCampaignResponse(BaseModel):
+    """Bulk email campaign progress"""
+    id: int
+    subject: str
+    role: Optional[UserRole] = None
+    status: CampaignStatus
+    last_user_id: int
+    sent_count: int
+    failed_count: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+@router.post("/email-campaigns", response_model=EmailCampaignResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_email_campaign(
+    campaign_data: EmailCampaignCreate,
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Send email to all active users (or users with a role)
+    
+    Delivery runs in the background; poll the campaign for progress.
+    
+    Requires admin role
+    """
+    from app.services.bulk_email_service import BulkEmailSender
+    
+    if not settings.SMTP_HOST:
+        raise BadRequestException(detail="SMTP is not configured")
+    
+    campaign = EmailCampaign(
+        subject=campaign_data.subject,
+        html_content=campaign_data.html_content,
+        text_content=campaign_data.text_content,
+        role=campaign_data.role,
+        status=CampaignStatus.PENDING,
+        created_by=current_user.id,
+    )
+    db.add(campaign)
+    db.commit()
+    db.refresh(campaign)
+    
+    BulkEmailSender().start_in_background(campaign.id)
+    
+    return campaign
+
+
+@router.get("/email-campaigns/{campaign_id}", response_model=EmailCampaignResponse)
+def get_email_campaign(
+    campaign_id: int,
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get bulk email campaign progress
+    
+    Requires admin role
+    """
+    campaign = db.query(EmailCampaign).filter(EmailCampaign.id == campaign_id).first()
+    
+    if not campaign:
+        raise NotFoundException(detail="Campaign not found")
+    
+    return campaign
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """
+    Get slowest statements grouped by fingerprint, with redacted
+    parameters and the query plan of the slowest execution
+    
+    Requires admin role and SLOW_QUERY_LOG_ENABLED
+    """
+    slow_query_recorder.explain_pending()
+    return {
+        "enabled": settings.SLOW_QUERY_LOG_ENABLED,
+        "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "queries": slow_query_recorder.top(limit),
+    }
+
+
+@router.delete("/slow-queries", response_model=MessageResponse)
+def clear_slow_queries(current_user: CurrentUser = Depends(require_admin)):
+    """
+    Reset the slow query log
+    
+    Requires admin role
+    """
+    slow_query_recorder.clear()
+    return MessageResponse(message="Slow query log cleared")
+
+
+class ProfileTokenResponse(BaseModel):
+    token: str
+    header: str
+    query_param: str
+    expires_at: int
+
+
+@router.post("/profiles/token", response_model=ProfileTokenResponse)
+def create_profiling_token(
+    ttl: int = Query(300, ge=1, le=settings.PROFILE_TOKEN_MAX_TTL),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """
+    Create a token that profiles any request carrying it
+    
+    Send it as the X-Profile header or the `_profile` query parameter;
+    the response then has an X-Profile-Id header. Requires admin role.
+    """
+    token, expires_at = create_profile_token(ttl)
+    return ProfileTokenResponse(
+        token=token, header=PROFILE_HEADER, query_param=PROFILE_QUERY_PARAM, expires_at=expires_at
+    )
+
+
+@router.get("/profiles")
+def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """
+    List stored request profiles, newest first
+    
+    Requires admin role
+    """
+    return {"profiles": profile_store.list(limit)}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """
+    Download a profile as a pstats dump (snakeviz, pstats) or a text table
+    
+    Requires admin role
+    """
+    from fastapi.responses import FileResponse, PlainTextResponse
+    
+    if format == "text":
+        text = profile_store.render_text(profile_id, sort=sort)
+        if text is None:
+            raise NotFoundException(detail="Profile not found")
+        return PlainTextResponse(text)
+    
+    path = profile_store.get_path(profile_id)
+    if path is None:
+        raise NotFoundException(detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
 
 
 @router.get("/export/pdf")
 def export_analytics_pdf(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Export comprehensive analytics data to PDF
@@ -335,8 +515,7 @@ def export_analytics_pdf(
     ).limit(10).all()
     
     # Get recent orders
-    orders_response = get_all_orders(1, 20, None, None, current_user, db)
-    orders = orders_response.items
+    orders, _ = OrderService.get_all_orders(db, OrderFilter(), 0, 20)
     
     # Get top products (sorted by rating)
     products = db.query(Product).filter(
@@ -5,12 +5,13 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timedelta
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.db.models import User, Product, Order, OrderItem
-from app.api.v1 import require_admin
+from app.api.v1 import CurrentUser, require_admin
+from app.core.profiling import ProfilingRoute
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class TopProduct(BaseModel):
@@ -38,8 +39,8 @@ class CategoryStats(BaseModel):
 
 @router.get("/dashboard")
 def get_analytics_dashboard(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get comprehensive analytics dashboard
@@ -91,8 +92,8 @@ def get_analytics_dashboard(
 @router.get("/top-products", response_model=List[TopProduct])
 def get_top_products(
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get top selling products
@@ -130,8 +131,8 @@ def get_top_products(
 @router.get("/revenue", response_model=List[RevenueByPeriod])
 def get_revenue_by_period(
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get revenue statistics by time period
@@ -181,8 +182,8 @@ def get_revenue_by_period(
 
 @router.get("/categories", response_model=List[CategoryStats])
 def get_category_statistics(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get statistics by product category
@@ -230,8 +231,8 @@ def get_category_statistics(
 @router.get("/sales", response_model=List[RevenueByPeriod])
 def get_sales_analytics(
     days: int = Query(30, ge=1, le=365),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """Alias for /revenue endpoint"""
     return get_revenue_by_period(days, current_user, db)
@@ -240,8 +241,8 @@ def get_sales_analytics(
 @router.get("/products", response_model=List[TopProduct])
 def get_product_analytics(
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """Alias for /top-products endpoint"""
     return get_top_products(limit, current_user, db)
@@ -251,8 +252,8 @@ from app.schemas.user import UserResponse
 
 @router.get("/users")
 def get_user_analytics(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_admin),
+    db: Session = Depends(get_read_db)
 ):
     """Get user analytics and statistics"""
     from app.core.constants import UserRole
@@ -2,21 +2,22 @@
 Authentication endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from typing import Optional
+from app.db.session import get_db, get_read_db, get_async_db
 from app.db.models import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.schemas.common import TokenResponse, MessageResponse
 from app.services.user_service import UserService
-from app.services.email_service import EmailService
-from app.core.security import create_access_token, create_refresh_token, verify_refresh_token
+from app.core.security import create_access_token, create_refresh_token, verify_refresh_token, revoke_token
 from app.core.exceptions import UnauthorizedException
-from app.api.v1 import get_current_user
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.api.v1 import get_current_db_user
+from app.core.rate_limit import limiter
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -33,31 +34,25 @@ def register(request: Request, user_data: UserCreate, db: Session = Depends(get_
     
     Rate limit: 3 registrations per hour
     """
-    # Create user
+    # Create user (also queues the welcome email)
     user = UserService.create_user(db, user_data)
     
-    # Send welcome email (don't fail registration if email fails)
-    try:
-        EmailService.send_welcome_email(user.email, user.first_name)
-    except Exception:
-        # Intentionally broad: email failures should never prevent registration
-        pass
-    
     return user
 
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("5/minute")
-def login(request: Request, login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password
     
-    Returns JWT access and refresh tokens
+    Returns JWT access and refresh tokens. Async, so logins waiting for a
+    bcrypt worker do not hold request threads.
     
     Rate limit: 5 login attempts per minute
     """
     # Authenticate user
-    user = UserService.authenticate_user(db, login_data.email, login_data.password)
+    user = await UserService.authenticate_user_async(db, login_data.email, login_data.password)
     
     if not user:
         raise UnauthorizedException(detail="Incorrect email or password")
@@ -74,7 +69,7 @@ def login(request: Request, login_data: UserLogin, db: Session = Depends(get_db)
 
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+def refresh_token(refresh_token: str, db: Session = Depends(get_read_db)):
     """
     Refresh access token using refresh token
     
@@ -115,7 +110,7 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+def get_current_user_profile(current_user: User = Depends(get_current_db_user)):
     """
     Get current user profile
     
@@ -125,11 +120,18 @@ def get_current_user_profile(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/logout", response_model=MessageResponse)
-def logout():
+def logout(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+):
     """
     Logout endpoint (client should delete tokens)
     
     Since JWT is stateless, logout is handled on the client side
-    by removing the tokens from storage
+    by removing the tokens from storage. A presented access token is
+    also dropped from the token cache and revoked in this process only:
+    with several workers, the others accept it until it expires.
     """
+    if credentials is not None:
+        revoke_token(credentials.credentials)
+    
     return MessageResponse(message="Logged out successfully. Please delete tokens from client storage.")
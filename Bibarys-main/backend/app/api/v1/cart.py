@@ -2,16 +2,19 @@
 Shopping cart endpoints
 """
 from fastapi import APIRouter, Depends, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
-from app.db.models import User, CartItem, Product
+from app.db.session import get_db, get_async_db
+from app.db.models import CartItem, Product
 from app.schemas.common import MessageResponse
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.api.v1 import get_current_user
+from app.core.profiling import ProfilingRoute
+from app.api.v1 import CurrentUser, get_current_user, get_current_user_async
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class CartItemAdd(BaseModel):
@@ -47,38 +50,40 @@ class CartResponse(BaseModel):
 
 
 @router.get("", response_model=CartResponse)
-def get_cart(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_cart(
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's shopping cart
     """
-    # Get cart items
-    cart_items = db.query(CartItem).filter(CartItem.user_id == current_user.id).all()
+    # Get cart items with their products in one query
+    result = await db.execute(
+        select(CartItem, Product)
+        .join(Product, Product.id == CartItem.product_id)
+        .where(CartItem.user_id == current_user.id)
+        .order_by(CartItem.id)
+    )
     
     # Build response
     items = []
     total_price = 0.0
     total_items = 0
     
-    for cart_item in cart_items:
-        product = db.query(Product).filter(Product.id == cart_item.product_id).first()
+    for cart_item, product in result:
+        subtotal = product.price * cart_item.quantity
+        total_price += subtotal
+        total_items += cart_item.quantity
         
-        if product:
-            subtotal = product.price * cart_item.quantity
-            total_price += subtotal
-            total_items += cart_item.quantity
-            
-            items.append(CartItemResponse(
-                id=cart_item.id,
-                product_id=product.id,
-                quantity=cart_item.quantity,
-                product_name=product.name,
-                product_price=product.price,
-                product_image=product.image_urls[0] if product.image_urls else "",
-                subtotal=subtotal
-            ))
+        items.append(CartItemResponse(
+            id=cart_item.id,
+            product_id=product.id,
+            quantity=cart_item.quantity,
+            product_name=product.name,
+            product_price=product.price,
+            product_image=product.image_urls[0] if product.image_urls else "",
+            subtotal=subtotal
+        ))
     
     return CartResponse(
         items=items,
@@ -90,7 +95,7 @@ def get_cart(
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 def add_to_cart(
     item_data: CartItemAdd,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -145,7 +150,7 @@ def add_to_cart(
 def update_cart_item(
     item_id: int,
     update_data: CartItemUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -182,7 +187,7 @@ def update_cart_item(
 @router.delete("/{item_id}", response_model=MessageResponse)
 def remove_from_cart(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -205,7 +210,7 @@ def remove_from_cart(
 
 @router.delete("", response_model=MessageResponse)
 def clear_cart(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
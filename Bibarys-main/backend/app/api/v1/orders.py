@@ -2,49 +2,51 @@
 Order endpoints
 """
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models import User
-from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderListResponse
+from app.db.session import get_db, get_read_db, get_async_db
+from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderListResponse, OrderFilter
 from app.schemas.common import MessageResponse
 from app.services.order_service import OrderService
 from app.core.constants import UserRole
 from app.core.exceptions import NotFoundException
-from app.api.v1 import get_current_user
+from app.core.profiling import ProfilingRoute
+from app.api.v1 import CurrentUser, get_current_user, get_current_user_async
 import math
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.get("", response_model=OrderListResponse)
-def get_my_orders(
+async def get_my_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's orders
     """
     skip = (page - 1) * page_size
-    orders, total = OrderService.get_user_orders(db, current_user.id, skip, page_size)
+    orders, total = await OrderService.get_order_rows_async(db, OrderFilter(user_id=current_user.id), skip, page_size)
     
     total_pages = math.ceil(total / page_size) if total > 0 else 0
     
-    return OrderListResponse(
-        items=orders,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return ORJSONResponse({
+        "items": orders,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+    })
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get order by ID
@@ -76,7 +78,7 @@ def get_order(
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 def create_order(
     order_data: OrderCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -84,19 +86,8 @@ def create_order(
     
     Clears cart after creating order
     """
-    order = OrderService.create_order_from_cart(db, order_data, current_user.id)
-    
-    # Send order confirmation email
-    from app.services.email_service import EmailService
-    try:
-        EmailService.send_order_confirmation(
-            current_user.email,
-            order.id,
-            order.total_price
-        )
-    except Exception:
-        # Intentionally broad: email failures should never prevent order creation
-        pass
+    # Queues the confirmation email in the order's transaction
+    order = OrderService.create_order_from_cart(db, order_data, current_user.id, email=current_user.email)
     
     return order
 
@@ -105,7 +96,7 @@ def create_order(
 async def update_order_status(
     order_id: int,
     order_data: OrderUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -133,25 +124,13 @@ async def update_order_status(
         # WebSocket errors should not prevent status updates
         pass
     
-    # Send status update email
-    from app.services.email_service import EmailService
-    try:
-        EmailService.send_order_status_update(
-            order.user.email,
-            order.id,
-            order.status.value
-        )
-    except Exception:
-        # Intentionally broad: email failures should never prevent status updates
-        pass
-    
     return order
 
 
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
 def cancel_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -3,20 +3,20 @@ Payment endpoints
 """
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models import User
+from app.db.session import get_db, get_read_db
 from app.schemas.payment import PaymentCreate, PaymentResponse
 from app.services.payment_service import PaymentService
 from app.core.exceptions import NotFoundException
-from app.api.v1 import get_current_user
+from app.core.profiling import ProfilingRoute
+from app.api.v1 import CurrentUser, get_current_user
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.post("", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
 def create_payment(
     payment_data: PaymentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -32,8 +32,8 @@ def create_payment(
 @router.get("/order/{order_id}", response_model=PaymentResponse)
 def get_payment_by_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get payment for an order
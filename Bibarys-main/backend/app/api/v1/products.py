@@ -1,36 +1,48 @@
 """
 Product endpoints
 """
-from fastapi import APIRouter, Depends, Query, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, Query, Request, status, File, UploadFile, Form
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from typing import Optional, List
 import logging
 import os
 import shutil
 from datetime import datetime
-from app.db.session import get_db
-from app.db.models import User, Product
+from app.db.session import get_db, get_read_db, get_async_read_db
+from app.db.models import Product
 from app.schemas.product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
     ProductListResponse,
+    ProductSearchResponse,
     ProductFilter
 )
 from app.schemas.common import MessageResponse
-from app.services.product_service import ProductService
+from app.services.product_service import ProductService, PRODUCT_RESPONSE_COLUMNS
 from app.core.constants import UserRole, ProductCategory
+from app.config import settings
 from app.core.exceptions import NotFoundException
-from app.api.v1 import get_current_user, require_seller_or_admin
+from app.core.http_cache import weak_etag
+from app.core.response_cache import response_cache, cached_response, list_tags
+from app.core.single_flight import SingleFlight
+from app.core.profiling import ProfilingRoute
+from app.api.v1 import CurrentUser, get_current_user, require_seller_or_admin
 import math
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 logger = logging.getLogger(__name__)
 
+# Cache misses for the same product or list query run once
+product_flight = SingleFlight("product")
+product_list_flight = SingleFlight("product_list")
+
 
 @router.get("", response_model=ProductListResponse)
-def get_products(
+async def get_products(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category: Optional[str] = Query(None, description="Product category"),
@@ -41,7 +53,7 @@ def get_products(
     is_active: Optional[bool] = True,
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get all products with filtering, search, and pagination
@@ -56,6 +68,11 @@ def get_products(
     - **sort_order**: Sort order (asc, desc)
     - **page**: Page number
     - **page_size**: Items per page
+    
+    Responses are cached until a product in the list's category (or any
+    product, for lists not filtered by category) changes. Concurrent misses
+    for the same query share one set of queries. Sends a weak ETag from the
+    catalog version; If-None-Match gets a 304.
     """
     # Convert category string to enum if provided
     category_enum = None
@@ -78,26 +95,18 @@ def get_products(
         sort_order=sort_order
     )
     
-    # Calculate skip
-    skip = (page - 1) * page_size
-    
-    # Get products
-    products, total = ProductService.get_products(db, filters, skip, page_size)
-    
-    # Calculate total pages
-    total_pages = math.ceil(total / page_size) if total > 0 else 0
-    
-    return ProductListResponse(
-        items=products,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    key = ProductService.product_list_cache_key(filters, page, page_size)
+    entry = await response_cache.get_async(key)
+    if entry is None:
+        entry = await product_list_flight.do_async(
+            key, lambda: ProductService.render_product_list_async(db, filters, page, page_size)
+        )
+    return cached_response(request, entry, settings.CACHE_CONTROL_PRODUCT_LIST)
 
 
-@router.get("/search", response_model=ProductListResponse)
+@router.get("/search", response_model=ProductSearchResponse)
 def search_products(
+    request: Request,
     q: str = Query(..., min_length=2, description="Search query"),
     category: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -105,7 +114,9 @@ def search_products(
     in_stock: Optional[bool] = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    facets: bool = Query(False, description="Include category, price, rating and stock counts"),
+    price_buckets: Optional[str] = Query(None, description="Price facet bounds, e.g. 10,25,50"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Advanced product search with filters.
@@ -117,70 +128,94 @@ def search_products(
     - **in_stock**: Filter by stock availability (true for in stock, false for out of stock)
     - **skip**: Number of items to skip for pagination
     - **limit**: Maximum number of items to return (max 100)
-    """
-    query = db.query(Product)
-    
-    # Full-text search
-    search_filter = or_(
-        Product.name.ilike(f"%{q}%"),
-        Product.description.ilike(f"%{q}%")
-    )
-    query = query.filter(search_filter)
+    - **facets**: Also return counts per category, price bucket, rating
+      ("N stars & up") and in stock. Category counts ignore the category
+      filter and the in-stock count the stock filter.
+    - **price_buckets**: Price facet bounds (default: SEARCH_PRICE_BUCKETS)
     
-    # Category filter
+    Responses are cached and coalesced like product lists.
+    """
+    category_enum = None
     if category:
         try:
             category_enum = ProductCategory(category)
-            query = query.filter(Product.category == category_enum)
         except ValueError:
             # Invalid category, skip filter and log warning
             logger.warning(f"Invalid category filter attempted: {category}")
     
-    # Price range
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    
-    # Stock filter
-    if in_stock is not None:
-        if in_stock:
-            query = query.filter(Product.quantity > 0)
-        else:
-            query = query.filter(Product.quantity == 0)
-    
-    total = query.count()
-    products = query.offset(skip).limit(limit).all()
-    
-    # Calculate pagination info
-    page = (skip // limit) + 1 if limit > 0 else 1
-    total_pages = math.ceil(total / limit) if limit > 0 and total > 0 else 0
-    
-    return ProductListResponse(
-        items=products,
-        total=total,
-        page=page,
-        page_size=limit,
-        total_pages=total_pages
-    )
+    price_bounds = ProductService.parse_price_buckets(price_buckets or settings.SEARCH_PRICE_BUCKETS) if facets else None
+    
+    key = response_cache.key("search", {
+        "q": q, "category": category_enum and category_enum.value, "min_price": min_price,
+        "max_price": max_price, "in_stock": in_stock, "skip": skip, "limit": limit,
+        "facets": price_bounds and ",".join(map(str, price_bounds)),
+    })
+    entry = response_cache.get(key)
+    if entry is not None:
+        return cached_response(request, entry, settings.CACHE_CONTROL_PRODUCT_LIST)
+    
+    def load():
+        # Category facets count every category, so they change with any product
+        tags = list_tags(None if price_bounds else category_enum)
+        versions = response_cache.versions(tags)
+        
+        # Full-text search and price range
+        query = db.query(*PRODUCT_RESPONSE_COLUMNS).filter(*ProductService.search_criteria(q, min_price, max_price))
+        
+        # Category filter
+        if category_enum:
+            query = query.filter(Product.category == category_enum)
+        
+        # Stock filter
+        if in_stock is not None:
+            if in_stock:
+                query = query.filter(Product.quantity > 0)
+            else:
+                query = query.filter(Product.quantity == 0)
+        
+        total = query.count()
+        products = query.offset(skip).limit(limit).all()
+        
+        # Calculate pagination info
+        page = (skip // limit) + 1 if limit > 0 else 1
+        total_pages = math.ceil(total / limit) if limit > 0 and total > 0 else 0
+        
+        content = {
+            "items": [row._asdict() for row in products],
+            "total": total,
+            "page": page,
+            "page_size": limit,
+            "total_pages": total_pages,
+        }
+        if price_bounds:
+            content["facets"] = ProductService.get_search_facets(
+                db, q, category_enum, min_price, max_price, in_stock, price_bounds
+            )
+        body = ORJSONResponse(content).body
+        return response_cache.set(key, body, weak_etag("search", body), tags, versions)
+    
+    entry = product_list_flight.do(key, load)
+    return cached_response(request, entry, settings.CACHE_CONTROL_PRODUCT_LIST)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Get product by ID
     
-    Increments view count
+    Increments view count. The body is cached until the product changes
+    (views do not count as changes); concurrent misses for one product share
+    one lookup. Sends a weak ETag from `updated_at`; If-None-Match gets a
+    304. Views are counted in every case.
     """
-    product = ProductService.get_product_by_id(db, product_id)
-    
-    if not product:
-        raise NotFoundException(detail="Product not found")
+    key = ProductService.product_cache_key(product_id)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = product_flight.do(product_id, lambda: ProductService.render_product(db, product_id))
     
     # Increment view count
     ProductService.increment_view_count(db, product_id)
-    
-    return product
+    return cached_response(request, entry, settings.CACHE_CONTROL_PRODUCT)
 
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
@@ -192,7 +227,7 @@ async def create_product(
     category: str = Form(...),
     image_urls: str = Form("[]"),
     images: List[UploadFile] = File(None),
-    current_user: User = Depends(require_seller_or_admin),
+    current_user: CurrentUser = Depends(require_seller_or_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -254,7 +289,7 @@ async def update_product(
     category: str = Form(None),
     image_urls: str = Form(None),
     images: List[UploadFile] = File(None),
-    current_user: User = Depends(require_seller_or_admin),
+    current_user: CurrentUser = Depends(require_seller_or_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -318,7 +353,7 @@ async def update_product(
 @router.patch("/{product_id}/toggle-active", response_model=ProductResponse)
 def toggle_product_active(
     product_id: int,
-    current_user: User = Depends(require_seller_or_admin),
+    current_user: CurrentUser = Depends(require_seller_or_admin),
     db: Session = Depends(get_db)
 ):
     """
@@ -342,6 +377,7 @@ def toggle_product_active(
     product.is_active = not product.is_active
     db.commit()
     db.refresh(product)
+    response_cache.invalidate_products([product.id], [product.category])
     
     return product
 
@@ -349,7 +385,7 @@ def toggle_product_active(
 @router.delete("/{product_id}", response_model=MessageResponse)
 def delete_product(
     product_id: int,
-    current_user: User = Depends(require_seller_or_admin),
+    current_user: CurrentUser = Depends(require_seller_or_admin),
     db: Session = Depends(get_db)
 ):
     """
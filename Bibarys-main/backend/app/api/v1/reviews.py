@@ -1,20 +1,25 @@
 """
 Product reviews endpoints
 """
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.db.models import User, Review, Product, Order, OrderItem
 from app.schemas.common import MessageResponse
+from app.config import settings
 from app.core.exceptions import NotFoundException, BadRequestException, ForbiddenException
-from app.api.v1 import get_current_user
+from app.core.http_cache import weak_etag, etag_matches, not_modified, set_cache_headers
+from app.core.response_cache import response_cache
+from app.core.profiling import ProfilingRoute
+from app.services.product_service import ProductService
+from app.api.v1 import CurrentUser, get_current_user
 from pydantic import BaseModel, Field
 from datetime import datetime
 from sqlalchemy import func
 import math
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class ReviewCreate(BaseModel):
@@ -53,17 +58,35 @@ class ReviewListResponse(BaseModel):
 @router.get("/product/{product_id}", response_model=ReviewListResponse)
 def get_product_reviews(
     product_id: int,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=50),
     rating_filter: Optional[int] = Query(None, ge=1, le=5),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get reviews for a product with pagination and filters"""
-    # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    """
+    Get reviews for a product with pagination and filters
+    
+    Sends a weak ETag from the product's review count and latest review
+    update; If-None-Match gets a 304.
+    """
+    # Check if product exists (deleted ids are answered from the negative cache)
+    product = ProductService.get_product_by_id(db, product_id)
     if not product:
         raise NotFoundException(detail="Product not found")
     
+    review_count, last_update = (
+        db.query(func.count(Review.id), func.max(Review.updated_at))
+        .filter(Review.product_id == product_id)
+        .one()
+    )
+    etag = weak_etag("reviews", product_id, review_count, last_update and last_update.isoformat(),
+                     page, page_size, rating_filter)
+    if etag_matches(request, etag):
+        return not_modified(etag, settings.CACHE_CONTROL_REVIEWS)
+    set_cache_headers(response, etag, settings.CACHE_CONTROL_REVIEWS)
+    
     # Build query
     query = db.query(Review).filter(Review.product_id == product_id)
     
@@ -113,12 +136,12 @@ def get_product_reviews(
 def create_review(
     product_id: int,
     review_data: ReviewCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new review for a product"""
-    # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # Check if product exists (deleted ids are answered from the negative cache)
+    product = ProductService.get_product_by_id(db, product_id)
     if not product:
         raise NotFoundException(detail="Product not found")
     
@@ -170,7 +193,9 @@ def create_review(
         product.rating = 0.0
         product.review_count = 0
     
+    category = product.category
     db.commit()
+    response_cache.invalidate_products([product_id], [category])
     db.refresh(review)
     
     return ReviewResponse(
@@ -192,7 +217,7 @@ def create_review(
 @router.delete("/{review_id}", response_model=MessageResponse)
 def delete_review(
     review_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a review (only by author or admin)"""
@@ -226,6 +251,8 @@ def delete_review(
         product.rating = 0.0
         product.review_count = 0
     
+    category = product.category
     db.commit()
+    response_cache.invalidate_products([product_id], [category])
     
     return MessageResponse(message="Review deleted successfully")
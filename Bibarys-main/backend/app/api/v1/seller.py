@@ -2,21 +2,24 @@
 Seller endpoints - Seller-specific functions
 """
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.db.models import User, Product, Order, OrderItem
 from app.schemas.product import ProductResponse
-from app.schemas.order import OrderResponse, OrderListResponse
-from app.api.v1 import require_seller_or_admin
+from app.schemas.order import OrderResponse, OrderListResponse, OrderFilter
+from app.services.order_service import OrderService
+from app.services.product_service import PRODUCT_RESPONSE_COLUMNS
+from app.api.v1 import CurrentUser, require_seller_or_admin
+from app.core.profiling import ProfilingRoute
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 from sqlalchemy import func
 import math
 import os
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class TopProduct(BaseModel):
@@ -46,8 +49,8 @@ class SellerAnalytics(BaseModel):
 
 @router.get("/analytics", response_model=SellerAnalytics)
 def get_seller_analytics(
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get seller analytics and statistics
@@ -118,8 +121,8 @@ def get_seller_analytics(
 
 @router.get("/stats", response_model=SellerStats)
 def get_seller_stats(
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get basic seller statistics (legacy endpoint)
@@ -174,51 +177,49 @@ def get_seller_stats(
 def get_seller_products(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get seller's products
     
     Requires seller or admin role
     """
-    products = (
-        db.query(Product)
+    rows = (
+        db.query(*PRODUCT_RESPONSE_COLUMNS)
         .filter(Product.seller_id == current_user.id)
         .offset(skip)
         .limit(limit)
         .all()
     )
     
-    return products
+    return ORJSONResponse([row._asdict() for row in rows])
 
 
 @router.get("/orders", response_model=OrderListResponse)
 def get_seller_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get orders containing seller's products
     
     Requires seller or admin role
     """
-    from app.services.order_service import OrderService
-    
     skip = (page - 1) * page_size
-    orders, total = OrderService.get_seller_orders(db, current_user.id, skip, page_size)
+    orders, total = OrderService.get_order_rows(db, OrderFilter(seller_id=current_user.id), skip, page_size)
     
     total_pages = math.ceil(total / page_size) if total > 0 else 0
     
-    return OrderListResponse(
-        items=orders,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return ORJSONResponse({
+        "items": orders,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+    })
 
 
 class TopCustomer(BaseModel):
@@ -233,8 +234,8 @@ class TopCustomer(BaseModel):
 @router.get("/top-customers", response_model=List[TopCustomer])
 def get_top_customers(
     limit: int = Query(5, ge=1, le=20),
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get top customers by total spending on seller's products
@@ -287,8 +288,8 @@ def get_top_customers(
 
 @router.get("/export-pdf")
 async def export_seller_pdf(
-    current_user: User = Depends(require_seller_or_admin),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(require_seller_or_admin),
+    db: Session = Depends(get_read_db)
 ):
     """
     Export seller analytics to PDF
@@ -306,7 +307,8 @@ async def export_seller_pdf(
             Product.seller_id == current_user.id,
             Product.is_active == True
         ).count(),
-        'total_balance': current_user.balance or 0,
+        # Not a principal field: read explicitly rather than lazy-loading the row
+        'total_balance': db.query(User.balance).filter(User.id == current_user.id).scalar() or 0,
     }
     
     # Get orders with seller's products
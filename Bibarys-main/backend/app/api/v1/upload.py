@@ -2,12 +2,12 @@
 Upload endpoints for product images
 """
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-from app.api.v1 import get_current_user, require_seller_or_admin
+from app.api.v1 import CurrentUser, get_current_user, require_seller_or_admin
 from app.core.image_handler import save_product_image, delete_image
-from app.db.models import User
+from app.core.profiling import ProfilingRoute
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class ImageUploadResponse(BaseModel):
@@ -27,7 +27,7 @@ class ImageDeleteResponse(BaseModel):
 @router.post("/product-image", response_model=ImageUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_product_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(require_seller_or_admin)
+    current_user: CurrentUser = Depends(require_seller_or_admin)
 ):
     """
     Загрузить фото товара (для продавцов)
@@ -70,7 +70,7 @@ async def upload_product_image(
 @router.delete("/image/{filename}")
 async def delete_image(
     filename: str,
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Delete an uploaded image.
@@ -3,7 +3,7 @@ Wallet endpoints - Virtual wallet functionality
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.db.models import User, Transaction
 from app.schemas.wallet import (
     WalletBalanceResponse, 
@@ -11,15 +11,16 @@ from app.schemas.wallet import (
     TransactionResponse,
     TransactionListResponse
 )
-from app.api.v1 import get_current_user
+from app.api.v1 import CurrentUser, get_current_user, get_current_db_user
+from app.core.profiling import ProfilingRoute
 from typing import List
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.get("/balance", response_model=WalletBalanceResponse)
 def get_balance(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -33,7 +34,7 @@ def get_balance(
 @router.post("/deposit", response_model=WalletBalanceResponse)
 def deposit(
     request: DepositRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -65,8 +66,8 @@ def deposit(
 def get_transactions(
     skip: int = 0,
     limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """
     Get transaction history
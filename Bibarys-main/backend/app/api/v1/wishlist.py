@@ -4,14 +4,15 @@ Wishlist endpoints
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
-from app.db.models import User, Wishlist, Product
+from app.db.session import get_db, get_read_db
+from app.db.models import Wishlist, Product
 from app.schemas.common import MessageResponse
 from app.core.exceptions import NotFoundException
-from app.api.v1 import get_current_user
+from app.core.profiling import ProfilingRoute
+from app.api.v1 import CurrentUser, get_current_user
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 class WishlistItemResponse(BaseModel):
@@ -29,8 +30,8 @@ class WishlistItemResponse(BaseModel):
 
 @router.get("", response_model=List[WishlistItemResponse])
 def get_wishlist(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get current user's wishlist"""
     items = db.query(Wishlist).filter(Wishlist.user_id == current_user.id).all()
@@ -55,7 +56,7 @@ def get_wishlist(
 @router.post("/{product_id}", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 def add_to_wishlist(
     product_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Add product to wishlist"""
@@ -87,7 +88,7 @@ def add_to_wishlist(
 @router.delete("/{product_id}", response_model=MessageResponse)
 def remove_from_wishlist(
     product_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Remove product from wishlist"""
@@ -107,7 +108,7 @@ def remove_from_wishlist(
 
 @router.delete("", response_model=MessageResponse)
 def clear_wishlist(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Clear all items from wishlist"""
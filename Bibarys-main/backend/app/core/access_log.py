@@ -0,0 +1,91 @@
+"""
+Access logging off the request path
+"""
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+import logging
+from starlette.datastructures import MutableHeaders
+
+access_logger = logging.getLogger("app.access")
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware that times requests and writes one access log line
+
+    Adds `X-Process-Time` (seconds until the response starts). Responses
+    with status >= 500 or slower than `slow_ms` are always logged; other
+    requests are logged with probability `sample_rate`.
+    """
+
+    def __init__(self, app, sample_rate: float = 1.0, slow_ms: Optional[float] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow = slow_ms / 1000 if slow_ms is not None else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        elapsed = 0.0
+
+        async def send_with_timing(message):
+            nonlocal status, elapsed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                MutableHeaders(scope=message).append("X-Process-Time", str(elapsed))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if not elapsed:
+                elapsed = time.perf_counter() - start
+            if (
+                status >= 500
+                or (self.slow is not None and elapsed >= self.slow)
+                or self.sample_rate >= 1
+                or random.random() < self.sample_rate
+            ):
+                client = scope.get("client")
+                # Lazy %-formatting: nothing is formatted when the logger is disabled
+                access_logger.info(
+                    '%s "%s %s" %d %.1fms', client[0] if client else "-",
+                    scope["method"], scope["path"], status, elapsed * 1000,
+                )
+
+
+def start_queue_logging(logger: Optional[logging.Logger] = None) -> QueueListener:
+    """
+    Move the logger's handlers behind a queue drained by a background thread
+
+    Log calls then only format the record and enqueue it; stream and file
+    writes happen on the listener thread.
+    """
+    logger = logger or logging.getLogger()
+    handlers: List[logging.Handler] = list(logger.handlers)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener: QueueListener, logger: Optional[logging.Logger] = None) -> None:
+    """Flush queued records and give the handlers back to the logger"""
+    logger = logger or logging.getLogger()
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            logger.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        logger.addHandler(handler)
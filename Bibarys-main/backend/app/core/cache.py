@@ -0,0 +1,189 @@
+"""
+In-process caches
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry
+
+    The least recently used entry is evicted when `maxsize` is reached.
+    Expired entries are dropped on access.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value if present and not expired"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for `ttl` seconds (cache default if not given)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit-rate statistics"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class ExpiringSet:
+    """
+    Thread-safe set whose members expire after their own TTL
+
+    Unlike TTLCache it has no size limit: a member is only dropped once it
+    expires, so it suits lists that must not forget entries early (revoked
+    tokens). Expired members are purged as new ones are added.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, key: Hashable, ttl: float) -> None:
+        """Add `key` for `ttl` seconds"""
+        now = time.monotonic()
+        expires_at = now + ttl
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, expired = heapq.heappop(self._heap)
+                if self._expiry.get(expired, expires_at) <= now:
+                    del self._expiry[expired]
+            if expires_at > self._expiry.get(key, now):
+                self._expiry[key] = expires_at
+                heapq.heappush(self._heap, (expires_at, key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expires_at = self._expiry.get(key)
+            found = expires_at is not None and expires_at > time.monotonic()
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+
+    def clear(self) -> None:
+        """Remove all members"""
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit-rate statistics (TTLCache-compatible)"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._expiry),
+            "maxsize": None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class NegativeCache(TTLCache):
+    """
+    Ids known not to exist, so lookups of deleted ids skip the database
+
+    Only ids below the highest existing id are remembered. Ids above it may
+    be created next, by any worker, while ids below it are not reused.
+    The highest id is itself kept for `max_id_ttl` seconds (and raised by
+    `created`), so misses above it do not each query it again.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, max_id_ttl: float = 5.0):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.max_id_ttl = max_id_ttl
+        self._max_id: Optional[int] = None
+        self._max_id_expires_at = 0.0
+
+    def is_missing(self, key: int) -> bool:
+        return self.get(key, False)
+
+    def known_max_id(self) -> Optional[int]:
+        """Highest id read within the last `max_id_ttl` seconds, or None (query it and pass it to `remember`)"""
+        with self._lock:
+            if self._max_id_expires_at <= time.monotonic():
+                return None
+            return self._max_id
+
+    def remember(self, key: int, max_id: Optional[int]) -> None:
+        """Remember `key` as missing, given the current highest id"""
+        if max_id is None:
+            return
+        with self._lock:
+            if self._max_id_expires_at <= time.monotonic():
+                self._max_id = max_id
+                self._max_id_expires_at = time.monotonic() + self.max_id_ttl
+        if key < max_id:
+            self.set(key, True)
+
+    def created(self, key: int) -> None:
+        """Forget `key` as missing and raise the known highest id to it"""
+        self.delete(key)
+        with self._lock:
+            if self._max_id is not None and key > self._max_id:
+                self._max_id = key
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._max_id = None
+            self._max_id_expires_at = 0.0
@@ -34,6 +34,22 @@ class PaymentStatus(str, Enum):
     FAILED = "failed"
 
 
+class EmailStatus(str, Enum):
+    """Email outbox message status types"""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class CampaignStatus(str, Enum):
+    """Bulk email campaign status types"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class DeliveryMethod(str, Enum):
     """Delivery method types"""
     STANDARD = "standard"
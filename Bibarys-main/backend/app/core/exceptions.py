@@ -56,3 +56,9 @@ class PaymentFailedException(BaseAPIException):
     """Payment processing failed exception"""
     def __init__(self, detail: str = "Payment failed"):
         super().__init__(detail=detail, status_code=status.HTTP_402_PAYMENT_REQUIRED)
+
+
+class ServiceUnavailableException(BaseAPIException):
+    """Service temporarily overloaded exception"""
+    def __init__(self, detail: str = "Service temporarily unavailable"):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
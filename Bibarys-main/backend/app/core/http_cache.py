@@ -0,0 +1,36 @@
+"""
+Conditional GET helpers: weak ETags, If-None-Match and Cache-Control
+"""
+import hashlib
+from typing import Any
+from fastapi import Request, Response
+
+
+def weak_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values the response body is derived from"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against `etag` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """304 response carrying the validators a 200 would have"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
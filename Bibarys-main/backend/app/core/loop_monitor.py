@@ -0,0 +1,101 @@
+"""
+Event loop lag monitoring
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+import logging
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+event_loop_lag_seconds = metrics.registry.register(metrics.Histogram(
+    "event_loop_lag_seconds", "Delay of event loop heartbeats past their schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+event_loop_blocked_total = metrics.registry.register(metrics.Counter(
+    "event_loop_blocked_total", "Event loop stalls past the lag threshold", ("route",)
+))
+
+
+def _find_route(frame) -> str:
+    """Get the request being handled from the nearest ASGI `scope` up the stack"""
+    while frame is not None:
+        if "scope" in frame.f_code.co_varnames:
+            scope = frame.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+                path = getattr(scope.get("route"), "path", None) or scope.get("path", "?")
+                return f"{scope.get('method', 'WS')} {path}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class LoopLagMonitor:
+    """
+    Detects code blocking the event loop
+
+    A heartbeat coroutine sleeps for `interval` and records how late it wakes
+    up. A watchdog thread notices when the heartbeat is overdue by more than
+    `threshold_ms` and, while the loop is still blocked, logs the loop
+    thread's stack and the route being handled.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, interval: float = 0.1):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stalled_route: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            start = self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - start - self.interval, 0.0)
+            event_loop_lag_seconds.observe(lag)
+            route, self._stalled_route = self._stalled_route, None
+            if route is not None:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms in {route}")
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue < self.threshold or self._stalled_route is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            route = _find_route(frame)
+            self._stalled_route = route
+            event_loop_blocked_total.inc((route,))
+            stack = "".join(traceback.format_stack(frame, limit=30)) if frame is not None else ""
+            logger.warning(f"Event loop blocked for over {overdue * 1000:.0f}ms in {route}, stack:\n{stack}")
+
+    def start(self) -> None:
+        """Start heartbeat on the running loop and the watchdog thread"""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop heartbeat and watchdog"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,334 @@
+"""
+Prometheus metrics
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class MetricFamily:
+    """Samples of one metric produced at scrape time by a collector"""
+
+    def __init__(self, name: str, type: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.type = type
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples: List[Tuple[tuple, float]] = []
+
+    def add(self, labels: tuple, value: float) -> "MetricFamily":
+        self.samples.append((labels, value))
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class _Metric:
+    """
+    Metric with one shard per thread
+
+    Each thread only writes to its own dict, so updates take no lock; shards
+    are summed when scraped. A lock is taken once per thread, on first use.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshot(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() is atomic under the GIL
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        """Get totals per label set"""
+        totals: Dict[tuple, float] = {}
+        for shard in self._snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        family = MetricFamily(self.name, self.type, self.documentation, self.labelnames)
+        for labels, value in sorted(self.values().items()):
+            family.add(labels, value)
+        return family.render()
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+
+    type = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative `le` buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> Dict[tuple, List[float]]:
+        """Get per-bucket counts (non-cumulative, +Inf last) and sum per label set"""
+        totals: Dict[tuple, List[float]] = {}
+        for shard in self._snapshot():
+            for labels, counts in shard.items():
+                counts = list(counts)
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = counts
+                else:
+                    for i, value in enumerate(counts):
+                        total[i] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        names = self.labelnames + ("le",)
+        for labels, counts in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                for family in collector():
+                    lines.extend(family.render())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ("method",)
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status",
+    ("method", "route", "status")
+))
+db_pool_checkout_seconds = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled database connection", ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, in-flight requests and latency
+
+    Requests are labelled by route template (`/products/{product_id}`), not
+    by path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        http_requests_in_progress.inc((method,))
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec((method,))
+            # Set by the router on the shared scope when a route matched
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (method, route, str(status))
+            http_requests_total.inc(labels)
+            http_request_duration_seconds.observe(time.perf_counter() - start, labels)
+
+
+_engines: Dict[str, Engine] = {}
+
+
+def _time_checkout(pool, name: str) -> None:
+    # Pools have no event before checkout, so the wait is timed around _do_get
+    do_get = pool._do_get
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - start, (name,))
+
+    pool._do_get = timed_do_get
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time pool checkouts and report pool usage (use `async_engine.sync_engine` for async engines)"""
+    if name in _engines:
+        return
+    _engines[name] = engine
+    _time_checkout(engine.pool, name)
+    # dispose() replaces the pool
+    event.listen(engine, "engine_disposed", lambda disposed: _time_checkout(disposed.pool, name))
+
+
+def _collect_db_pools() -> Iterable[MetricFamily]:
+    size = MetricFamily("db_pool_size", "gauge", "Configured pool size", ("pool",))
+    checked_out = MetricFamily("db_pool_checked_out", "gauge", "Connections in use", ("pool",))
+    overflow = MetricFamily("db_pool_overflow", "gauge", "Connections opened beyond the pool size", ("pool",))
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            size.add((name,), pool.size())
+            checked_out.add((name,), pool.checkedout())
+            overflow.add((name,), max(pool.overflow(), 0))
+    return [size, checked_out, overflow]
+
+
+def _collect_threadpool() -> Iterable[MetricFamily]:
+    import anyio.to_thread
+    # Only available inside the event loop; /metrics is an async endpoint
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return [
+        MetricFamily("threadpool_tokens_total", "gauge", "Worker threads available to sync endpoints")
+        .add((), limiter.total_tokens),
+        MetricFamily("threadpool_tokens_borrowed", "gauge", "Worker threads in use by sync endpoints")
+        .add((), limiter.borrowed_tokens),
+    ]
+
+
+registry.register_collector(_collect_db_pools)
+registry.register_collector(_collect_threadpool)
+
+
+def cache_collector(caches: Dict[str, Any]) -> Callable[[], Iterable[MetricFamily]]:
+    """Create a collector for objects with a TTLCache-style `stats()` method"""
+
+    def collect_caches() -> Iterable[MetricFamily]:
+        hits = MetricFamily("cache_hits_total", "counter", "Cache hits", ("cache",))
+        misses = MetricFamily("cache_misses_total", "counter", "Cache misses", ("cache",))
+        size = MetricFamily("cache_size", "gauge", "Cache entries", ("cache",))
+        ratio = MetricFamily("cache_hit_ratio", "gauge", "Cache hits over lookups since start", ("cache",))
+        for name, cache in caches.items():
+            stats = cache.stats()
+            hits.add((name,), stats["hits"])
+            misses.add((name,), stats["misses"])
+            size.add((name,), stats["size"])
+            ratio.add((name,), stats["hit_rate"])
+        return [hits, misses, size, ratio]
+
+    return collect_caches
+
+
+def gauge_collector(name: str, documentation: str, func: Callable[[], float]) -> Callable[[], Iterable[MetricFamily]]:
+    """Create a collector for a single gauge read at scrape time"""
+
+    def collect_gauge() -> Iterable[MetricFamily]:
+        return [MetricFamily(name, "gauge", documentation).add((), func())]
+
+    return collect_gauge
@@ -0,0 +1,257 @@
+"""
+On-demand request profiling
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "_profile"
+
+
+def create_profile_token(ttl_seconds: int) -> Tuple[str, int]:
+    """Create a signed token that enables profiling until it expires"""
+    expires_at = int(time.time()) + ttl_seconds
+    return f"{expires_at}.{_sign(expires_at)}", expires_at
+
+
+def verify_profile_token(token: str) -> bool:
+    """Check token signature and expiry"""
+    expires_at, _, signature = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires_at)))
+
+
+def _sign(expires_at: int) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"profile:{expires_at}".encode(), hashlib.sha256).hexdigest()
+
+
+def parse_sample_routes(value: str) -> Dict[str, int]:
+    """Parse "GET /api/v1/products:100,POST /api/v1/orders:10" into {route: N}"""
+    routes = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        route, _, every = item.rpartition(":")
+        routes[route.strip()] = int(every)
+    return routes
+
+
+class ProfileStore:
+    """
+    Profiles on disk, oldest removed first
+
+    Each profile is a pstats dump (`<id>.prof`) with its request metadata
+    (`<id>.json`). At most `max_profiles` are kept.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 100):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def save(self, stats: pstats.Stats, metadata: Dict[str, Any]) -> str:
+        """Write profile and metadata, and evict the oldest beyond the limit"""
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.directory, exist_ok=True)
+        stats.dump_stats(self._path(profile_id, ".prof"))
+        with open(self._path(profile_id, ".json"), "w") as f:
+            json.dump({"id": profile_id, **metadata}, f)
+        self._evict()
+        return profile_id
+
+    def _evict(self) -> None:
+        with self._lock:
+            ids = self._ids()
+            for profile_id in ids[:max(len(ids) - self.max_profiles, 0)]:
+                for suffix in (".prof", ".json"):
+                    try:
+                        os.remove(self._path(profile_id, suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def _ids(self) -> List[str]:
+        """Profile ids, oldest first (ids start with their timestamp)"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get metadata of the newest profiles"""
+        profiles = []
+        for profile_id in reversed(self._ids()[-limit:]):
+            try:
+                with open(self._path(profile_id, ".json")) as f:
+                    profiles.append(json.load(f))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+    def get_path(self, profile_id: str) -> Optional[str]:
+        """Get path of a stored pstats dump"""
+        if profile_id not in self._ids():
+            return None
+        return self._path(profile_id, ".prof")
+
+    def render_text(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """Get profile as a pstats table"""
+        path = self.get_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_STORED)
+sample_routes = parse_sample_routes(settings.PROFILE_SAMPLE_ROUTES)
+
+
+class _Session:
+    """Profilers of one request: one for the event loop, one per worker thread"""
+
+    def __init__(self, trigger: str):
+        self.trigger = trigger
+        self.loop_profiler = cProfile.Profile()
+        self.thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add_thread_profiler(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.thread_profilers.append(profiler)
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.loop_profiler)
+        for profiler in self.thread_profilers:
+            stats.add(profiler)
+        return stats
+
+
+_session: ContextVar[Optional[_Session]] = ContextVar("profile_session", default=None)
+
+
+class _ProfiledCoroutine:
+    """
+    Await a coroutine with the profiler enabled only while it runs
+
+    Other requests' steps on the same event loop are not profiled.
+    """
+
+    def __init__(self, coro, profiler: cProfile.Profile):
+        self.coro = coro
+        self.profiler = profiler
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.profiler.enable()
+            try:
+                yielded = self.coro.throw(error) if error is not None else self.coro.send(value)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+def _profile_in_thread(func: Callable) -> Callable:
+    """Wrap a sync endpoint so it is profiled on its worker thread"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _session.get()
+        if session is None:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        session.add_thread_profiler(profiler)
+        return profiler.runcall(func, *args, **kwargs)
+
+    return wrapper
+
+
+def _trigger(request: Request, route_key: str) -> Optional[str]:
+    token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    if token:
+        if verify_profile_token(token):
+            return "token"
+        logger.warning(f"Invalid or expired profile token for {route_key}")
+    every = sample_routes.get(route_key)
+    if every and random.randrange(every) == 0:
+        return "sample"
+    return None
+
+
+class ProfilingRoute(APIRoute):
+    """
+    Route that profiles a request when asked to
+
+    A request is profiled when it carries a token from
+    `POST /admin/profiles/token` (X-Profile header or `_profile` query
+    parameter), or at random for routes in PROFILE_SAMPLE_ROUTES. Sync
+    endpoints are profiled on their threadpool worker as well.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # FastAPI runs non-coroutine endpoints on the threadpool
+        if settings.PROFILING_ENABLED and not asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = _profile_in_thread(self.dependant.call)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not settings.PROFILING_ENABLED:
+            return handler
+
+        async def profiled_handler(request: Request):
+            route_key = f"{request.method} {self.path}"
+            trigger = _trigger(request, route_key)
+            if trigger is None:
+                return await handler(request)
+
+            session = _Session(trigger)
+            token = _session.set(session)
+            start = time.perf_counter()
+            try:
+                response = await _ProfiledCoroutine(handler(request), session.loop_profiler)
+            finally:
+                _session.reset(token)
+            duration = time.perf_counter() - start
+
+            profile_id = await run_in_threadpool(profile_store.save, session.stats(), {
+                "route": route_key,
+                "path": request.url.path,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "trigger": trigger,
+                "created_at": datetime.utcnow().isoformat(),
+            })
+            logger.info(f"Profiled {route_key} in {duration * 1000:.1f}ms: {profile_id}")
+            response.headers["X-Profile-Id"] = profile_id
+            return response
+
+        return profiled_handler
@@ -0,0 +1,191 @@
+"""
+Rate limiting shared by all routes and worker processes
+"""
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from typing import Optional, Tuple
+import logging
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Expired counters are deleted at most this often
+PURGE_INTERVAL_SECONDS = 60
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit counters in a SQLite file shared by all workers on a host
+
+    Used with `RATE_LIMIT_STORAGE_URI=sqlite:///path/to/ratelimit.db`.
+    The sliding window counter keeps two rows per key (previous and current
+    window), so each check is two primary key lookups and one upsert inside
+    a single write transaction. Expired rows are purged periodically, so
+    the table only holds keys seen in the last two windows.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        path = (uri or "sqlite://").split("://", 1)[1]
+        # Same convention as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute.db
+        self.path = path[1:] if path.startswith("/") else path
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._next_purge = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get connection for the current thread (reopened after fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path or ":memory:", timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write(self) -> sqlite3.Connection:
+        """Start a write transaction; other workers wait on the file lock"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _purge_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL_SECONDS
+            conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, key: str, now: float) -> int:
+        row = conn.execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _incr(conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        return conn.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now)
+        ).fetchone()[0]
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        conn = self._write()
+        try:
+            count = self._incr(conn, key, expiry, amount, now)
+            self._purge_expired(conn, now)
+            conn.execute("COMMIT")
+            return count
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str) -> int:
+        return self._get(self._connection(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        conn = self._write()
+        try:
+            previous_count, previous_ttl, current_count, _ = self._window(
+                conn, previous_key, current_key, expiry, now
+            )
+            # The write lock is held, so check-and-increment is atomic across workers
+            allowed = floor(previous_count * previous_ttl / expiry + current_count) + amount <= limit
+            if allowed:
+                self._incr(conn, current_key, 2 * expiry, amount, now)
+                self._purge_expired(conn, now)
+            conn.execute("COMMIT")
+            return allowed
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._window(self._connection(), previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._connection().execute(
+            "DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key)
+        )
+
+    def _window(
+        self, conn: sqlite3.Connection, previous_key: str, current_key: str, expiry: int, now: float
+    ) -> Tuple[int, float, int, float]:
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+
+def create_limiter() -> Limiter:
+    """
+    Create limiter from settings
+
+    Shared backends (sqlite://, redis://) fall back to per-process
+    memory counters if the store becomes unreachable.
+    """
+    shared = not settings.RATE_LIMIT_STORAGE_URI.startswith("memory://")
+    return Limiter(
+        key_func=get_remote_address,
+        default_limits=["200/minute"],
+        strategy=settings.RATE_LIMIT_STRATEGY,
+        storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+        in_memory_fallback_enabled=shared,
+    )
+
+
+limiter = create_limiter()
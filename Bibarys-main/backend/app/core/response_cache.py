@@ -0,0 +1,288 @@
+"""
+Response cache for public catalog reads with tag invalidation
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Tuple
+import logging
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.http_cache import etag_matches, not_modified, set_cache_headers
+
+logger = logging.getLogger(__name__)
+
+# The shared table is trimmed to maxsize at most this often
+PURGE_INTERVAL_SECONDS = 60
+
+# Tag of product lists not filtered by category; filtered ones are tagged by category
+CATALOG_TAG = "catalog"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category: Any) -> str:
+    return f"category:{getattr(category, 'value', category)}"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    tags: Tuple[str, ...]
+    versions: Tuple[int, ...]  # Tag versions when the body was read
+
+
+class MemoryBackend:
+    """Entries and tag versions in this process"""
+
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.entries.get(key)
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        self.entries.set(key, entry)
+
+    def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+        with self._lock:
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.entries.stats()
+
+
+class SQLiteBackend:
+    """
+    Entries and tag versions in a SQLite file shared by all workers on a host
+
+    Used with `RESPONSE_CACHE_URI=sqlite:///path/to/response_cache.db`.
+    An invalidation in one worker bumps the tag version every worker checks.
+    Every call is file I/O, so coroutines go through the `*_async` methods
+    of ResponseCache.
+    """
+
+    blocking = True
+
+    def __init__(self, uri: str, maxsize: int, ttl: float):
+        path = uri.split("://", 1)[1]
+        # Same convention as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute.db
+        self.path = path[1:] if path.startswith("/") else path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._next_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, entry BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_expires_at ON response_cache (expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get connection for the current thread (reopened after fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path or ":memory:", timeout=5.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        row = self._connection().execute(
+            "SELECT entry FROM response_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse(*pickle.loads(row[0]))
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, entry, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(tuple(entry)), now + self.ttl),
+        )
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL_SECONDS
+            # Expired rows, then the soonest to expire beyond maxsize
+            conn.execute(
+                "DELETE FROM response_cache WHERE expires_at <= ? OR key IN ("
+                "SELECT key FROM response_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (now, self.maxsize),
+            )
+
+    def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        tags = list(tags)
+        placeholders = ",".join("?" * len(tags))
+        found = dict(self._connection().execute(
+            f"SELECT tag, version FROM cache_tags WHERE tag IN ({placeholders})", tags
+        ).fetchall())
+        return tuple(found.get(tag, 0) for tag in tags)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        self._connection().executemany(
+            "INSERT INTO cache_tags (tag, version) VALUES (?, 1) "
+            "ON CONFLICT(tag) DO UPDATE SET version = version + 1",
+            [(tag,) for tag in tags],
+        )
+
+    def clear(self) -> None:
+        conn = self._connection()
+        conn.execute("DELETE FROM response_cache")
+        conn.execute("DELETE FROM cache_tags")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        size = self._connection().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        return {"size": size, "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+class ResponseCache:
+    """
+    Rendered JSON bodies keyed by route and normalized query parameters
+
+    Every entry carries tags (product ids, categories, the catalog) and the
+    tag versions read before its query ran. Invalidating a tag bumps its
+    version, so entries read earlier, including ones still being computed,
+    are treated as misses.
+
+    Async code uses `get_async`, `versions_async` and `set_async`, which run
+    a blocking backend (SQLite) on a worker thread instead of the event loop.
+    """
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    @staticmethod
+    def key(route: str, params: Mapping[str, Any]) -> str:
+        """Cache key with parameters sorted and unset ones dropped"""
+        items = sorted((name, str(value)) for name, value in params.items() if value is not None)
+        return route + "?" + "&".join(f"{name}={value}" for name, value in items)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        try:
+            entry = self.backend.get(key)
+            if entry is None or self.backend.versions(entry.tags) != entry.versions:
+                return None
+            return entry
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def versions(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        """Read tag versions; call before querying the data to be cached"""
+        if not self.enabled:
+            return ()
+        try:
+            return self.backend.versions(tags)
+        except sqlite3.Error:
+            return ()
+
+    def set(self, key: str, body: bytes, etag: str, tags: Tuple[str, ...],
+            versions: Tuple[int, ...]) -> CachedResponse:
+        """Store body with the tag versions read before it was queried"""
+        entry = CachedResponse(body, etag, tags, versions)
+        if not self.enabled or len(versions) != len(tags):
+            return entry
+        try:
+            self.backend.set(key, entry)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+        return entry
+
+    async def get_async(self, key: str) -> Optional[CachedResponse]:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.get, key)
+        return self.get(key)
+
+    async def versions_async(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.versions, tags)
+        return self.versions(tags)
+
+    async def set_async(self, key: str, body: bytes, etag: str, tags: Tuple[str, ...],
+                        versions: Tuple[int, ...]) -> CachedResponse:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.set, key, body, etag, tags, versions)
+        return self.set(key, body, etag, tags, versions)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of `tags`"""
+        if not self.enabled or not tags:
+            return
+        try:
+            self.backend.bump(set(tags))
+        except sqlite3.Error as e:
+            logger.error(f"Response cache invalidation failed: {e}")
+
+    def invalidate_products(self, product_ids: Iterable[int], categories: Iterable[Any]) -> None:
+        """Invalidate products, lists of their categories (old and new) and unfiltered lists"""
+        tags = {CATALOG_TAG}
+        tags.update(product_tag(product_id) for product_id in product_ids)
+        tags.update(category_tag(category) for category in categories)
+        self.invalidate(*tags)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+
+def list_tags(category: Any) -> Tuple[str, ...]:
+    """Tags of a product list"""
+    return (category_tag(category),) if category else (CATALOG_TAG,)
+
+
+def cached_response(request: Request, entry: CachedResponse, cache_control: str) -> Response:
+    """Serve a cache entry (304 when the client has it)"""
+    if etag_matches(request, entry.etag):
+        return not_modified(entry.etag, cache_control)
+    response = Response(entry.body, media_type="application/json")
+    set_cache_headers(response, entry.etag, cache_control)
+    return response
+
+
+def create_response_cache() -> ResponseCache:
+    """Create response cache from settings"""
+    uri = settings.RESPONSE_CACHE_URI
+    if uri.startswith("sqlite://"):
+        backend = SQLiteBackend(uri, settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL)
+    else:
+        backend = MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL)
+    return ResponseCache(backend, enabled=settings.RESPONSE_CACHE_ENABLED)
+
+
+response_cache = create_response_cache()
@@ -1,26 +1,149 @@
 """
 Security utilities: JWT tokens, password hashing
 """
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
+import hashlib
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
-from app.core.exceptions import UnauthorizedException
+from app.core.cache import ExpiringSet, TTLCache
+from app.core.exceptions import UnauthorizedException, ServiceUnavailableException
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context; hashes with different rounds are upgraded on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Token digest -> verified payload, kept until the token expires
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+# Digests of revoked tokens, kept until each token expires and never evicted
+# earlier (this process only)
+revoked_tokens = ExpiringSet()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, separately sized thread pool
+    
+    At most `workers + queue_limit` hashes are accepted at once; further
+    calls fail fast with 503. Async callers (login) wait without holding a
+    thread; each sync caller blocks a request-threadpool thread while it
+    waits, so `workers + queue_limit` must stay well below that pool's size.
+    """
+    
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self._stats = {
+            "count": 0,
+            "rejected": 0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+        }
+    
+    def _submit(self, func: Callable, *args) -> Future:
+        """Take a slot and submit hashing function to the executor; the slot is freed when it finishes"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise ServiceUnavailableException(detail="Too many authentication requests, please retry")
+        
+        submitted = time.perf_counter()
+        
+        def task():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+        
+        try:
+            future = self._executor.submit(task)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def run(self, func: Callable, *args):
+        """Run hashing function on the executor and wait for the result (blocks this thread)"""
+        return self._submit(func, *args).result()
+    
+    async def run_async(self, func: Callable, *args):
+        """Run hashing function on the executor without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(func, *args))
+    
+    def _record(self, queue_wait: float, duration: float) -> None:
+        with self._lock:
+            stats = self._stats
+            stats["count"] += 1
+            stats["hash_seconds_total"] += duration
+            stats["hash_seconds_max"] = max(stats["hash_seconds_max"], duration)
+            stats["queue_wait_seconds_total"] += queue_wait
+            stats["queue_wait_seconds_max"] = max(stats["queue_wait_seconds_max"], queue_wait)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hash latency and queue wait statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+        count = stats["count"]
+        stats["hash_seconds_avg"] = stats["hash_seconds_total"] / count if count else 0.0
+        stats["queue_wait_seconds_avg"] = stats["queue_wait_seconds_total"] / count if count else 0.0
+        stats["workers"] = self.workers
+        stats["queue_limit"] = self.queue_limit
+        return stats
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
 
 
 def hash_password(password: str) -> str:
     """Hash a plain text password"""
-    return pwd_context.hash(password)
+    return password_hasher.run(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain text password against a hashed password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify password and rehash it if it was hashed with other settings
+    
+    Returns:
+        Tuple of (verified, new hash or None)
+    """
+    return password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Async version of `verify_and_update_password`"""
+    return await password_hasher.run_async(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def get_password_hash_stats() -> Dict[str, Any]:
+    """Get password hashing executor statistics"""
+    return password_hasher.stats()
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -74,10 +197,22 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _seconds_until_expiry(payload: Dict[str, Any]) -> float:
+    exp = payload.get("exp")
+    return float(exp) - time.time() if exp is not None else 0.0
+
+
 def decode_token(token: str) -> Dict[str, Any]:
     """
     Decode and validate JWT token
     
+    Verified payloads are cached by token digest until the token's `exp`,
+    so repeated requests with the same token skip signature verification.
+    
     Args:
         token: JWT token string
     
@@ -85,13 +220,49 @@ def decode_token(token: str) -> Dict[str, Any]:
         Decoded token payload
     
     Raises:
-        UnauthorizedException: If token is invalid or expired
+        UnauthorizedException: If token is invalid, expired or revoked
     """
+    digest = _token_digest(token)
+    
+    if digest in revoked_tokens:
+        raise UnauthorizedException(detail="Token has been revoked")
+    
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError as e:
         raise UnauthorizedException(detail=f"Invalid token: {str(e)}")
+    
+    ttl = _seconds_until_expiry(payload)
+    if ttl > 0:
+        token_cache.set(digest, payload, ttl=ttl)
+    
+    return dict(payload)
+
+
+def revoke_token(token: str) -> None:
+    """
+    Revoke token until it expires
+    
+    Revocations are kept in this process only: other workers keep
+    accepting the token until it expires.
+    """
+    try:
+        payload = decode_token(token)
+    except UnauthorizedException:
+        return
+    
+    digest = _token_digest(token)
+    token_cache.delete(digest)
+    revoked_tokens.add(digest, ttl=_seconds_until_expiry(payload))
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Get decoded-token cache statistics"""
+    return {**token_cache.stats(), "revoked": len(revoked_tokens)}
 
 
 def verify_access_token(token: str) -> Dict[str, Any]:
@@ -0,0 +1,141 @@
+"""
+Single-flight: concurrent identical lookups share one call
+"""
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import logging
+from app.config import settings
+from app.core import metrics
+from app.core.exceptions import BaseAPIException
+
+logger = logging.getLogger(__name__)
+
+single_flight_requests_total = metrics.registry.register(metrics.Counter(
+    "single_flight_requests_total",
+    "Lookups by outcome: executed, shared (waited for another caller's result) or timeout (waited, then ran)",
+    ("flight", "result"),
+))
+
+
+class SingleFlightError(Exception):
+    """The shared call failed; raised to each waiting caller, chained to the original error"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Merges concurrent calls with the same key into one
+
+    The first caller for a key runs the lookup; callers arriving while it
+    runs wait up to SINGLE_FLIGHT_MAX_WAIT seconds for its result (or its
+    exception), then run the lookup themselves. Waiting callers never get
+    the first caller's exception object: API errors (404 and the like) are
+    copied, anything else becomes a SingleFlightError chained to it. Nothing is kept once the
+    call finishes, so results must be safe to share: rendered bodies or
+    plain rows, not ORM objects bound to the first caller's session.
+
+    `do` is for sync endpoints (threadpool), `do_async` for coroutines on
+    the event loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, result: str) -> None:
+        single_flight_requests_total.inc((self.name, result))
+
+    def _shared_error(self, key: Hashable, error: BaseException) -> BaseException:
+        """Exception for a caller that waited on a failed call"""
+        if isinstance(error, BaseAPIException):
+            # Same response, but an instance (and traceback) of its own
+            return copy.copy(error)
+        return SingleFlightError(f"Single-flight {self.name} call for {key!r} failed: {error!r}")
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run `func`, or wait for the run already in progress for `key`"""
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return func()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(settings.SINGLE_FLIGHT_MAX_WAIT):
+                self._count("timeout")
+                logger.warning(f"Single-flight {self.name} wait timed out for {key!r}")
+                return func()
+            self._count("shared")
+            if call.error is not None:
+                raise self._shared_error(key, call.error) from call.error
+            return call.result
+
+        self._count("executed")
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `func()`, or wait for the run already in progress for `key`"""
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await func()
+
+        future = self._futures.get(key)
+        if future is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), settings.SINGLE_FLIGHT_MAX_WAIT)
+            except asyncio.TimeoutError:
+                self._count("timeout")
+                logger.warning(f"Single-flight {self.name} wait timed out for {key!r}")
+                return await func()
+            except asyncio.CancelledError:
+                # The first caller was cancelled (client gone); run it here instead
+                if not future.cancelled():
+                    raise
+                self._count("timeout")
+                return await func()
+            except Exception as e:
+                self._count("shared")
+                raise self._shared_error(key, e) from e
+            self._count("shared")
+            return result
+
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        self._count("executed")
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here, so an exception nobody waited for is not logged
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[key]
@@ -0,0 +1,141 @@
+"""
+Pool of reusable SMTP connections
+"""
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Idle connections older than this are probed with NOOP before reuse
+IDLE_CHECK_SECONDS = 30
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of authenticated SMTP connections
+
+    STARTTLS and login happen once per connection instead of once per message.
+    At most `size` connections are open at the same time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: Optional[int] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        size: int = 2,
+        timeout: int = 30,
+    ):
+        self.host = host
+        self.port = port or 0
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnectionPool":
+        """Create pool from application settings"""
+        return cls(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            user=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_USE_TLS,
+            size=settings.SMTP_POOL_SIZE,
+            timeout=settings.SMTP_TIMEOUT,
+        )
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """
+        Borrow a connection from the pool
+
+        Connections that raise while borrowed are closed instead of being returned.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception:
+            if conn is not None:
+                self._close(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def close_all(self) -> None:
+        """Close all idle connections"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < IDLE_CHECK_SECONDS or self._is_alive(conn):
+                return conn
+            self._close(conn)
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                conn.starttls()
+            if self.user and self.password:
+                conn.login(self.user, self.password)
+        except Exception:
+            self._close(conn)
+            raise
+        logger.debug(f"Opened SMTP connection to {self.host}:{self.port}")
+        return conn
+
+    @staticmethod
+    def _is_alive(conn: smtplib.SMTP) -> bool:
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+_pool: Optional[SMTPConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get shared SMTP connection pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool.from_settings()
+    return _pool
@@ -1,10 +1,10 @@
 """
 SQLAlchemy ORM models for all database tables
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Text, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Text, JSON, DateTime, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
-from app.core.constants import UserRole, OrderStatus, PaymentMethod, PaymentStatus, ProductCategory
+from app.core.constants import UserRole, OrderStatus, PaymentMethod, PaymentStatus, ProductCategory, EmailStatus, CampaignStatus
 
 
 class User(BaseModel):
@@ -162,3 +162,36 @@ class Transaction(BaseModel):
     
     # Relationships
     user = relationship("User", back_populates="transactions")
+
+
+class EmailOutbox(BaseModel):
+    """Email outbox model - messages queued for the background sender"""
+    __tablename__ = "email_outbox"
+    
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    status = Column(SQLEnum(EmailStatus), default=EmailStatus.PENDING, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    claimed_by = Column(String(32), nullable=True, index=True)  # Worker token while sending
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class EmailCampaign(BaseModel):
+    """Bulk email campaign model - progress is checkpointed for resume"""
+    __tablename__ = "email_campaigns"
+    
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    role = Column(SQLEnum(UserRole), nullable=True)  # Audience filter, None = all users
+    status = Column(SQLEnum(CampaignStatus), default=CampaignStatus.PENDING, nullable=False, index=True)
+    last_user_id = Column(Integer, default=0, nullable=False)  # Checkpoint: all users up to this ID handled
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
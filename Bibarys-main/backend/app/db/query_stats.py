@@ -0,0 +1,107 @@
+"""
+Per-request SQL statement statistics
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Optional, Tuple
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statements executed while handling one request"""
+
+    __slots__ = ("count", "total_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        # Parameterized SQL text -> executions; per-row lookups share one shape
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> list:
+        """Get (statement, count) pairs executed more than `threshold` times"""
+        return [(statement, n) for statement, n in self.shapes.most_common() if n > threshold]
+
+    def warn_repeated(self, label: str, threshold: Optional[int] = None) -> None:
+        """Log a warning for each statement shape repeated past the threshold (likely N+1)"""
+        threshold = threshold if threshold is not None else settings.DB_N_PLUS_ONE_THRESHOLD
+        for statement, n in self.repeated(threshold):
+            logger.warning(f"Possible N+1 in {label}: statement ran {n} times: {' '.join(statement.split())[:300]}")
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def begin() -> Tuple[QueryStats, Token]:
+    """Start collecting statistics for the current request"""
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end(token: Token) -> None:
+    """Stop collecting statistics started by `begin()`"""
+    _current.reset(token)
+
+
+def current() -> Optional[QueryStats]:
+    """Get statistics of the current request, if collecting"""
+    return _current.get()
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware counting statements and DB time per request
+
+    Adds `X-DB-Queries` / `X-DB-Time` with DEBUG or DB_QUERY_HEADERS, and
+    warns about statement shapes repeated past DB_N_PLUS_ONE_THRESHOLD.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin()
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and (settings.DEBUG or settings.DB_QUERY_HEADERS):
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append("X-DB-Time", f"{stats.total_time * 1000:.1f}ms")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            end(token)
+        stats.warn_repeated(f"{scope['method']} {scope['path']}")
+
+
+# Registered on the Engine class so every engine (sync, async, replicas, tests) is covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_stats_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
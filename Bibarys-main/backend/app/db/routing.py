@@ -0,0 +1,158 @@
+"""
+Read replica routing
+"""
+import hashlib
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete, Insert, Update
+from app.config import settings
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Replica:
+    """One replica database with its sync and (optional) async engine"""
+    name: str
+    engine: Engine
+    async_engine: Optional[AsyncEngine] = None
+    healthy: bool = True
+    last_error: Optional[str] = field(default=None, repr=False)
+
+
+class ReplicaSet:
+    """
+    Replicas chosen round-robin among the healthy ones
+
+    Health is probed with `SELECT 1` from a background thread (or by calling
+    `check()`), never on the request path. When no replica is healthy,
+    reads fall back to the primary.
+    """
+
+    def __init__(self, replicas: List[Replica], check_interval: float = 10.0):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(range(len(replicas))) if replicas else None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def choose(self) -> Optional[Replica]:
+        """Get next healthy replica, or None to use the primary"""
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if replica.healthy:
+                    return replica
+        return None
+
+    def check(self) -> None:
+        """Probe every replica and update its health flag"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"Replica {replica.name} marked unhealthy: {e}")
+                replica.healthy = False
+                replica.last_error = str(e)
+            else:
+                if not replica.healthy:
+                    logger.info(f"Replica {replica.name} is healthy again")
+                replica.healthy = True
+                replica.last_error = None
+
+    def start(self) -> None:
+        """Start background health checks"""
+        if self._thread is None and self.replicas:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background health checks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_interval)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.check_interval)
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary
+
+    One replica is picked on first use and kept for the whole session, so a
+    request sees one consistent snapshot. Flushes and DML statements always
+    go to the primary, as does every statement once `use_primary()` is called
+    (read-your-writes).
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, use_async: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.use_async = use_async
+        self._replica: Optional[Replica] = None
+
+    def use_primary(self) -> None:
+        """Send all further statements in this session to the primary"""
+        self.info["use_primary"] = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if (
+            self.replicas is None
+            or self._flushing
+            or self.info.get("use_primary")
+            or isinstance(clause, (Insert, Update, Delete))
+        ):
+            return primary
+
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+            if self._replica is None:
+                return primary
+        if self.use_async:
+            if self._replica.async_engine is None:
+                return primary
+            return self._replica.async_engine.sync_engine
+        return self._replica.engine
+
+    @property
+    def bind_name(self) -> str:
+        """Name of the replica in use, or 'primary'"""
+        return self._replica.name if self._replica is not None else "primary"
+
+
+# Clients that wrote recently read from the primary until replicas catch up
+recent_writers = TTLCache(maxsize=100000, ttl=settings.REPLICA_READ_YOUR_WRITES_SECONDS)
+
+
+def client_key(authorization: Optional[str], host: Optional[str]) -> str:
+    """Identify a client by its bearer token, or by address when anonymous"""
+    source = authorization or f"host:{host}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def mark_recent_write(key: str) -> None:
+    """Route this client's reads to the primary for the read-your-writes window"""
+    recent_writers.set(key, time.monotonic())
+
+
+def wrote_recently(key: str) -> bool:
+    """Check if the client is inside its read-your-writes window"""
+    return recent_writers.get(key) is not None
@@ -1,25 +1,191 @@
 """
 Database session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Generator, List
+from fastapi import Request
 from app.config import settings
+from app.core import metrics
+from app.db.slow_query import SlowQueryRecorder
+from app.db.routing import (
+    Replica, ReplicaSet, RoutingSession, client_key, mark_recent_write, wrote_recently
+)
+
+
+# Async drivers for the sync DATABASE_URL dialects
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
 
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """PRAGMA statements run on every new SQLite connection"""
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+    ]
+    if settings.SQLITE_WAL:
+        # Persistent in the file; readers no longer block the writer and vice versa
+        pragmas.insert(0, "PRAGMA journal_mode=WAL")
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def configure_sqlite(engine, read_only: bool = False) -> None:
+    """Apply the SQLite profile to every connection the engine opens"""
+    pragmas = sqlite_pragmas(read_only)
+    
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+IS_SQLITE_FILE = _is_sqlite_file(settings.DATABASE_URL)
 
 # Create engine
+# SQLite allows one writer at a time, so writes queue on a single pooled
+# connection instead of failing with "database is locked"
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
     echo=settings.DEBUG,
     pool_pre_ping=True,
+    **({"pool_size": 1, "max_overflow": 0} if IS_SQLITE_FILE else {}),
 )
 
+# Read-only connections for routes that never write (SQLite only; otherwise the same engine)
+if IS_SQLITE_FILE:
+    configure_sqlite(engine)
+    read_engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    configure_sqlite(read_engine, read_only=True)
+else:
+    read_engine = engine
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that await the database instead of holding a worker thread
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    # aiosqlite defaults to NullPool, which opens a connection (and thread) per request
+    poolclass=AsyncAdaptedQueuePool if "sqlite" in ASYNC_DATABASE_URL else None,
+)
+if _is_sqlite_file(ASYNC_DATABASE_URL):
+    configure_sqlite(async_engine.sync_engine)
+
+# Objects stay usable after commit; lazy loads are not possible in async code
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def create_replica(url: str) -> Replica:
+    """Create sync and async engines for one read replica"""
+    is_sqlite = _is_sqlite_file(url)
+    replica_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+    )
+    replica_async_engine = create_async_engine(
+        get_async_database_url(url),
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        poolclass=AsyncAdaptedQueuePool if is_sqlite else None,
+    )
+    if is_sqlite:
+        configure_sqlite(replica_engine, read_only=True)
+        configure_sqlite(replica_async_engine.sync_engine, read_only=True)
+    return Replica(
+        name=make_url(url).render_as_string(hide_password=True),
+        engine=replica_engine,
+        async_engine=replica_async_engine,
+    )
+
+
+# Read-only routes are served by replicas when configured, else by the primary
+replica_set = (
+    ReplicaSet([create_replica(url) for url in settings.replica_urls_list], settings.REPLICA_HEALTH_CHECK_INTERVAL)
+    if settings.replica_urls_list else None
+)
+# Pool checkout wait and usage for /metrics
+metrics.instrument_engine(engine, "primary")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine, "read")
+metrics.instrument_engine(async_engine.sync_engine, "async")
+for _replica in (replica_set.replicas if replica_set is not None else []):
+    metrics.instrument_engine(_replica.engine, _replica.name)
+
+# Opt-in slow query log on every engine the app queries
+slow_query_recorder = SlowQueryRecorder(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_MAX_ENTRIES)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    # Plans are captured later on read connections (on SQLite, not the single writer)
+    for _engine in {engine, read_engine, async_engine.sync_engine}:
+        slow_query_recorder.install(_engine, explain_engine=read_engine)
+    for _replica in (replica_set.replicas if replica_set is not None else []):
+        slow_query_recorder.install(_replica.engine)
+        if _replica.async_engine is not None:
+            slow_query_recorder.install(_replica.async_engine.sync_engine, explain_engine=_replica.engine)
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, class_=RoutingSession, replicas=replica_set
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False,
+    sync_session_class=RoutingSession, replicas=replica_set, use_async=True
+)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flush(session, flush_context):
+    session.info["has_writes"] = True
+
 
-def get_db() -> Generator[Session, None, None]:
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+def _request_client_key(request: Request) -> str:
+    return client_key(request.headers.get("authorization"), request.client.host if request.client else None)
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Dependency for getting database session
     
@@ -27,12 +193,57 @@ def get_db() -> Generator[Session, None, None]:
         Database session
     """
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        if replica_set is not None and db.info.get("has_writes"):
+            mark_recent_write(_request_client_key(request))
+        db.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency for getting a read-only database session
+    
+    Use for routes that never write; writes raise on SQLite. Reads go to
+    a replica unless the client wrote within the read-your-writes window.
+    
+    Yields:
+        Database session
+    """
+    db = ReadSessionLocal()
+    if replica_set is not None and wrote_recently(_request_client_key(request)):
+        db.use_primary()
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting async database session
+    
+    Yields:
+        Async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting async read-only session (replica-routed like `get_read_db`)
+    
+    Yields:
+        Async database session
+    """
+    async with AsyncReadSessionLocal() as db:
+        if replica_set is not None and wrote_recently(_request_client_key(request)):
+            db.sync_session.use_primary()
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database (create all tables)
@@ -0,0 +1,200 @@
+"""
+Slow query recorder with EXPLAIN capture
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|(?<!:):\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize statement so executions differing only in values group together
+
+    Literals and driver placeholders become `?`, IN lists collapse to `(?+)`.
+    """
+    normalized = " ".join(statement.split())
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    return _IN_LIST.sub("(?+)", normalized)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Keep parameter shape and non-string values; hide text and binary values"""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    if isinstance(parameters, (datetime, date, Decimal)):
+        return str(parameters)
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(parameters)}>"
+    return f"<redacted:{len(str(parameters))}>"
+
+
+class SlowQueryRecorder:
+    """
+    Keeps the worst slow statements, grouped by fingerprint
+
+    At most `max_entries` fingerprints are kept; when full, the one with the
+    least total time is dropped. The plan of the slowest execution seen so
+    far is captured later, by `explain_pending` on a connection of its own:
+    EXPLAIN never runs inside the request's transaction or on its time.
+    """
+
+    def __init__(self, threshold_ms: float = 200.0, max_entries: int = 50):
+        self.threshold = threshold_ms / 1000
+        self.max_entries = max_entries
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Fingerprint -> (engine, statement, parameters) awaiting EXPLAIN
+        self._pending: Dict[str, Tuple[Engine, str, Any]] = {}
+        self._explain_engines: Dict[Engine, Engine] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def install(self, engine: Engine, explain_engine: Optional[Engine] = None) -> None:
+        """
+        Time every statement on the engine (use `async_engine.sync_engine` for async engines)
+
+        Plans are captured on `explain_engine`, which must be a sync engine
+        for the same database (defaults to `engine`).
+        """
+        self._explain_engines[engine] = explain_engine or engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_slow_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if elapsed >= self.threshold:
+            self.record(conn, statement, parameters, elapsed, executemany)
+
+    def record(self, conn, statement: str, parameters: Any, elapsed: float, executemany: bool = False) -> None:
+        """Add a slow execution, capturing its plan if it is the slowest of its kind"""
+        normalized = fingerprint(statement)
+        key = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": normalized,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "parameters": None,
+                    "plan": None,
+                    "last_seen": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed * 1000
+            entry["last_seen"] = datetime.utcnow().isoformat()
+            is_worst = elapsed * 1000 > entry["max_ms"]
+            if is_worst:
+                entry["max_ms"] = elapsed * 1000
+                entry["parameters"] = redact_parameters(parameters)
+            self._evict()
+
+            if is_worst and not executemany and statement.lstrip().lower().startswith(_EXPLAINABLE):
+                engine = self._explain_engines.get(conn.engine, conn.engine)
+                self._pending[key] = (engine, statement, parameters)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            least = min(self._entries.values(), key=lambda e: e["total_ms"])
+            del self._entries[least["fingerprint"]]
+            self._pending.pop(least["fingerprint"], None)
+
+    def explain_pending(self) -> None:
+        """Capture plans of the statements recorded since the last call (blocking)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for key, (engine, statement, parameters) in pending.items():
+            plan = self._explain(engine, statement, parameters)
+            if plan is not None:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries[key]["plan"] = plan
+
+    @staticmethod
+    def _explain(engine: Engine, statement: str, parameters: Any) -> Optional[List[str]]:
+        """Run EXPLAIN on a raw DBAPI cursor of a fresh checkout (bypasses engine events)"""
+        if engine.dialect.is_async:
+            return None
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect() as conn:
+                cursor = conn.connection.dbapi_connection.cursor()
+                try:
+                    cursor.execute(prefix + statement, parameters)
+                    return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed: {e}")
+            return None
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get worst fingerprints by total time"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e["total_ms"], reverse=True)[:limit]
+            return [dict(entry, avg_ms=entry["total_ms"] / entry["count"]) for entry in entries]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+
+    def log_summary(self, limit: int = 10) -> None:
+        """Log the worst fingerprints"""
+        for entry in self.top(limit):
+            logger.warning(
+                f"Slow query {entry['fingerprint']}: {entry['count']}x, total {entry['total_ms']:.0f}ms, "
+                f"max {entry['max_ms']:.0f}ms: {entry['statement'][:300]}"
+                + (f" | plan: {'; '.join(entry['plan'])}" if entry["plan"] else "")
+            )
+
+    async def run(self, interval: float) -> None:
+        """Log the summary every `interval` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.explain_pending)
+            self.log_summary()
+
+    def start(self, interval: float) -> None:
+        """Start periodic summary logging on the running event loop"""
+        if self._task is None and interval > 0:
+            self._task = asyncio.create_task(self.run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
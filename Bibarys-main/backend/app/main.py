@@ -2,19 +2,24 @@
 FastAPI E-Commerce Application
 Main entry point with all routes and middleware
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-import time
+from typing import Optional
+import hmac
 import logging
 
 from app.config import settings
-from app.db.session import init_db
-from app.core.exceptions import BaseAPIException
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from app.db.session import init_db, async_engine, replica_set, slow_query_recorder
+from app.db import query_stats
+from app.core import metrics
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.access_log import AccessLogMiddleware, start_queue_logging, stop_queue_logging
+from app.core.exceptions import BaseAPIException, NotFoundException, UnauthorizedException
+from app.core.rate_limit import limiter
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 # Configure logging
@@ -29,6 +34,8 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
+    # Handlers write from a background thread; request handlers only enqueue records
+    log_listener = start_queue_logging() if settings.LOG_QUEUE_ENABLED else None
     logger.info("Starting E-Commerce API...")
     logger.info("Initializing database...")
     try:
@@ -37,15 +44,67 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Database initialization skipped: {e}")
     
+    # Background email sender (request handlers only enqueue)
+    email_worker = None
+    if settings.SMTP_HOST and settings.EMAIL_OUTBOX_ENABLED:
+        from app.services.email_outbox import EmailOutboxWorker
+        email_worker = EmailOutboxWorker()
+        email_worker.start()
+    
+    # Resume bulk campaigns interrupted by a restart
+    if settings.SMTP_HOST:
+        from app.db.session import SessionLocal
+        from app.services.bulk_email_service import BulkEmailSender
+        db = SessionLocal()
+        try:
+            for campaign_id in BulkEmailSender.interrupted_campaign_ids(db):
+                logger.info(f"Resuming email campaign {campaign_id}")
+                BulkEmailSender().start_in_background(campaign_id)
+        except Exception as e:
+            logger.warning(f"Email campaign resume skipped: {e}")
+        finally:
+            db.close()
+    
+    if settings.SLOW_QUERY_LOG_ENABLED:
+        slow_query_recorder.start(settings.SLOW_QUERY_DUMP_INTERVAL)
+    
+    # Log stacks of handlers that block the event loop
+    loop_monitor = None
+    if settings.DEBUG or settings.LOOP_MONITOR_ENABLED:
+        loop_monitor = LoopLagMonitor(settings.LOOP_LAG_THRESHOLD_MS, settings.LOOP_MONITOR_INTERVAL)
+        loop_monitor.start()
+    
+    # Replica health checks (reads fall back to the primary while replicas are down)
+    if replica_set is not None:
+        replica_set.check()
+        replica_set.start()
+    
+    # Prefill the response cache; serving starts once it is done or the timeout passes
+    cache_warmer = None
+    if settings.CACHE_WARMUP_ENABLED:
+        from app.services.cache_warmup import CacheWarmer
+        cache_warmer = CacheWarmer()
+        await cache_warmer.start(settings.CACHE_WARMUP_READY_TIMEOUT)
+    
     yield
     
     # Shutdown
     logger.info("Shutting down E-Commerce API...")
+    if cache_warmer is not None:
+        await cache_warmer.stop()
+    if email_worker is not None:
+        await email_worker.stop()
+    if replica_set is not None:
+        replica_set.stop()
+    await slow_query_recorder.stop()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    # aiosqlite connections run on non-daemon threads
+    await async_engine.dispose()
+    if log_listener is not None:
+        stop_queue_logging(log_listener)
 
 
-# Create rate limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"])
-
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
@@ -54,6 +113,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -72,26 +132,22 @@ app.add_middleware(
 )
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url.path}")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate processing time
-    process_time = time.time() - start_time
-    logger.info(f"Response: {response.status_code} - {process_time:.3f}s")
-    
-    # Add custom header with processing time
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
+# Access log and X-Process-Time
+if settings.ACCESS_LOG_ENABLED:
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+        slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    )
+
+
+# Per-request SQL statistics
+app.add_middleware(query_stats.QueryStatsMiddleware)
+
+
+# Request count, in-flight and latency per route (outermost, so it times everything above)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 
 # Global exception handler
@@ -125,6 +181,41 @@ async def health_check():
     }
 
 
+# Prometheus metrics endpoint
+if settings.METRICS_ENABLED:
+    from app.core.security import token_cache, revoked_tokens
+    from app.core.websocket import manager as ws_manager
+    from app.db.routing import recent_writers
+    from app.services.user_service import principal_cache, missing_user_cache
+    from app.services.product_service import missing_product_cache
+    from app.core.response_cache import response_cache
+    
+    metrics.registry.register_collector(metrics.cache_collector({
+        "auth_principal": principal_cache,
+        "auth_token": token_cache,
+        "revoked_token": revoked_tokens,
+        "replica_recent_writer": recent_writers,
+        "response": response_cache,
+        "missing_product": missing_product_cache,
+        "missing_user": missing_user_cache,
+    }))
+    metrics.registry.register_collector(metrics.gauge_collector(
+        "websocket_connections", "Open websocket connections",
+        lambda: sum(len(sockets) for sockets in ws_manager.active_connections.values()),
+    ))
+    
+    @app.get("/metrics", tags=["System"], include_in_schema=False)
+    async def prometheus_metrics(authorization: Optional[str] = Header(None)):
+        """Metrics in Prometheus text format, for scrapers sending METRICS_TOKEN as a bearer token"""
+        # Not served until a token is configured
+        if not settings.METRICS_TOKEN:
+            raise NotFoundException(detail="Not found")
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        if not hmac.compare_digest((authorization or "").encode(), expected):
+            raise UnauthorizedException(detail="Invalid metrics token")
+        return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Root endpoint
 @app.get("/", tags=["System"])
 async def root():
@@ -57,6 +57,38 @@ class ProductListResponse(BaseModel):
     total_pages: int
 
 
+class CategoryCount(BaseModel):
+    """Products in one category"""
+    category: ProductCategory
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    """Products priced in [min, max); the last bucket has no max"""
+    min: float
+    max: Optional[float]
+    count: int
+
+
+class RatingCount(BaseModel):
+    """Products rated `min_rating` stars and up"""
+    min_rating: int
+    count: int
+
+
+class SearchFacets(BaseModel):
+    """Counts alongside search results"""
+    categories: List[CategoryCount]
+    price: List[PriceBucketCount]
+    rating: List[RatingCount]
+    in_stock: int
+
+
+class ProductSearchResponse(ProductListResponse):
+    """Schema for product search, with facets when requested"""
+    facets: Optional[SearchFacets] = None
+
+
 class ProductFilter(BaseModel):
     """Schema for product filtering"""
     category: Optional[ProductCategory] = None
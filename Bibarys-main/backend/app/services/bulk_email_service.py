@@ -0,0 +1,276 @@
+"""
+Bulk email service - campaign delivery to the customer base
+"""
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from email import policy
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import logging
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.constants import CampaignStatus
+from app.core.smtp_pool import SMTPConnectionPool
+from app.db.models import EmailCampaign, User
+from app.db.session import SessionLocal
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# A running campaign without a checkpoint for this long is considered crashed
+STALE_CAMPAIGN_SECONDS = 300
+MAX_RECONNECTS_PER_CHUNK = 3
+
+
+class BulkEmailSender:
+    """
+    Sends one rendered message to many recipients
+
+    Recipients are read from the database in ID order, one bounded page at
+    a time, and split into chunks. Each chunk is sent back-to-back over one
+    borrowed connection from a bounded pool, so at most `concurrency` SMTP
+    sessions are open. Campaign
+    progress is checkpointed as the highest user ID below which every chunk
+    has finished, so delivery is at-least-once after a crash.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        pool: Optional[SMTPConnectionPool] = None,
+        concurrency: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        fetch_size: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.BULK_EMAIL_CONCURRENCY
+        self.chunk_size = chunk_size or settings.BULK_EMAIL_CHUNK_SIZE
+        self.fetch_size = fetch_size or settings.BULK_EMAIL_FETCH_SIZE
+        self.pool = pool
+
+    @staticmethod
+    def render(subject: str, html_content: str, text_content: Optional[str] = None) -> bytes:
+        """Render message once; the To header is prepended per recipient"""
+        msg = EmailService.build_message("", subject, html_content, text_content)
+        del msg["To"]
+        return msg.as_bytes(policy=policy.SMTP)
+
+    def send_to_addresses(
+        self,
+        addresses: Iterable[str],
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Send message to a list of addresses
+
+        Returns:
+            Tuple of (sent, failed) counts
+        """
+        payload = self.render(subject, html_content, text_content)
+        chunks = ((None, chunk) for chunk in _chunked(addresses, self.chunk_size))
+
+        sent = failed = 0
+        for _, _, chunk_sent, chunk_failed in self._deliver(chunks, payload):
+            sent += chunk_sent
+            failed += chunk_failed
+        return sent, failed
+
+    def run_campaign(self, campaign_id: int) -> Optional[EmailCampaign]:
+        """
+        Deliver campaign, resuming from its last checkpoint
+
+        Returns:
+            Finished campaign, or None if another worker holds it
+        """
+        # The campaign row stays loaded across commits, so the writer connection
+        # is only held while a checkpoint is written
+        db = self.session_factory(expire_on_commit=False)
+        stream_db = self.session_factory()
+        try:
+            if not self._claim(db, campaign_id):
+                logger.info(f"Campaign {campaign_id} is already running or finished")
+                return None
+
+            campaign = db.get(EmailCampaign, campaign_id)
+            payload = self.render(campaign.subject, campaign.html_content, campaign.text_content)
+            db.commit()
+            chunks = self._recipient_chunks(stream_db, campaign)
+
+            # Chunks finish out of order; advance the checkpoint only over a contiguous prefix
+            finished = {}
+            next_seq = 0
+            try:
+                for seq, last_user_id, sent, failed in self._deliver(chunks, payload):
+                    campaign.sent_count += sent
+                    campaign.failed_count += failed
+                    finished[seq] = last_user_id
+                    while next_seq in finished:
+                        campaign.last_user_id = finished.pop(next_seq)
+                        next_seq += 1
+                    campaign.updated_at = datetime.utcnow()
+                    db.commit()
+            except Exception as e:
+                db.rollback()
+                campaign.status = CampaignStatus.FAILED
+                campaign.finished_at = datetime.utcnow()
+                db.commit()
+                logger.error(f"Campaign {campaign_id} failed: {e}", exc_info=True)
+                return campaign
+
+            campaign.status = CampaignStatus.COMPLETED
+            campaign.finished_at = datetime.utcnow()
+            db.commit()
+            db.refresh(campaign)
+            logger.info(
+                f"Campaign {campaign_id} completed: {campaign.sent_count} sent, "
+                f"{campaign.failed_count} failed"
+            )
+            return campaign
+        finally:
+            stream_db.close()
+            db.close()
+
+    def start_in_background(self, campaign_id: int) -> threading.Thread:
+        """Run campaign in a daemon thread"""
+        thread = threading.Thread(
+            target=self.run_campaign,
+            args=(campaign_id,),
+            name=f"email-campaign-{campaign_id}",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    @staticmethod
+    def interrupted_campaign_ids(db: Session) -> List[int]:
+        """Get campaigns left running by a crashed or restarted process"""
+        stale_before = datetime.utcnow() - timedelta(seconds=STALE_CAMPAIGN_SECONDS)
+        rows = db.query(EmailCampaign.id).filter(
+            EmailCampaign.status == CampaignStatus.RUNNING,
+            EmailCampaign.updated_at < stale_before
+        ).all()
+        return [row.id for row in rows]
+
+    @staticmethod
+    def _claim(db: Session, campaign_id: int) -> bool:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=STALE_CAMPAIGN_SECONDS)
+        claimed = db.query(EmailCampaign).filter(
+            EmailCampaign.id == campaign_id,
+            or_(
+                EmailCampaign.status == CampaignStatus.PENDING,
+                and_(EmailCampaign.status == CampaignStatus.RUNNING, EmailCampaign.updated_at < stale_before),
+            )
+        ).update(
+            {"status": CampaignStatus.RUNNING, "started_at": now, "updated_at": now},
+            synchronize_session=False
+        )
+        db.commit()
+        return claimed == 1
+
+    def _recipient_chunks(self, db: Session, campaign: EmailCampaign) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Stream (last user ID, addresses) chunks in keyset pages
+
+        Each page is read through a server-side cursor and its read transaction
+        is closed before the page is sent, so checkpoint commits are never
+        blocked by a long-running reader.
+        """
+        last_id = campaign.last_user_id
+        while True:
+            query = db.query(User.id, User.email).filter(
+                User.id > last_id,
+                User.is_active == True
+            )
+            if campaign.role:
+                query = query.filter(User.role == campaign.role)
+
+            page = query.order_by(User.id).limit(self.fetch_size).execution_options(
+                stream_results=True, yield_per=self.fetch_size
+            ).all()
+            db.rollback()
+            if not page:
+                return
+
+            for start in range(0, len(page), self.chunk_size):
+                chunk = page[start:start + self.chunk_size]
+                yield chunk[-1].id, [row.email for row in chunk]
+            last_id = page[-1].id
+
+    def _deliver(self, chunks: Iterable[Tuple[Optional[int], List[str]]], payload: bytes) -> Iterator[tuple]:
+        """
+        Send chunks concurrently, yielding (seq, key, sent, failed) as they finish
+
+        At most 2 * concurrency chunks are queued, so recipients are never
+        fully materialized in memory.
+        """
+        pool = self.pool or SMTPConnectionPool(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            user=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_USE_TLS,
+            size=self.concurrency,
+            timeout=settings.SMTP_TIMEOUT,
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-email") as executor:
+                in_flight = {}
+                for seq, (key, recipients) in enumerate(chunks):
+                    future = executor.submit(self._send_chunk, pool, payload, recipients)
+                    in_flight[future] = (seq, key)
+                    if len(in_flight) >= self.concurrency * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            seq_done, key_done = in_flight.pop(future)
+                            yield (seq_done, key_done, *future.result())
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        seq_done, key_done = in_flight.pop(future)
+                        yield (seq_done, key_done, *future.result())
+        finally:
+            if self.pool is None:
+                pool.close_all()
+
+    @staticmethod
+    def _send_chunk(pool: SMTPConnectionPool, payload: bytes, recipients: List[str]) -> Tuple[int, int]:
+        """Send to recipients over one connection, reconnecting on connection errors"""
+        sent = failed = 0
+        index = 0
+        reconnects = 0
+        while index < len(recipients):
+            try:
+                with pool.connection() as server:
+                    while index < len(recipients):
+                        to = recipients[index]
+                        try:
+                            server.sendmail(settings.SMTP_FROM, [to], b"To: " + to.encode() + b"\r\n" + payload)
+                            sent += 1
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                            logger.warning(f"Bulk email to {to} rejected: {e}")
+                            failed += 1
+                        index += 1
+            except (smtplib.SMTPException, OSError) as e:
+                reconnects += 1
+                if reconnects > MAX_RECONNECTS_PER_CHUNK:
+                    logger.error(f"Giving up on {len(recipients) - index} bulk recipients: {e}")
+                    failed += len(recipients) - index
+                    break
+        return sent, failed
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
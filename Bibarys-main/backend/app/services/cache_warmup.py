@@ -0,0 +1,129 @@
+"""
+Response cache warm-up after startup
+"""
+import asyncio
+import time
+from typing import Callable, List, Optional
+import logging
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.constants import ProductCategory
+from app.core.exceptions import NotFoundException
+from app.core.response_cache import response_cache
+from app.db.models import Product
+from app.db.session import AsyncReadSessionLocal, ReadSessionLocal
+from app.schemas.product import ProductFilter
+from app.services.product_service import ProductService
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """
+    Prefills the response cache so the first requests after a restart do not all hit the database
+
+    Renders the first page of the catalog and of each category, then the
+    top products by views and by rating, until `budget` seconds have passed.
+    Entries already cached (by another worker, with a shared backend) are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = ReadSessionLocal,
+        async_session_factory: async_sessionmaker = AsyncReadSessionLocal,
+        top_products: Optional[int] = None,
+        budget: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.top_products = top_products if top_products is not None else settings.CACHE_WARMUP_TOP_PRODUCTS
+        self.budget = budget if budget is not None else settings.CACHE_WARMUP_BUDGET
+        self.warmed = 0
+        self._deadline = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def _expired(self) -> bool:
+        return time.monotonic() >= self._deadline
+
+    async def _warm_lists(self, db: AsyncSession) -> None:
+        page_size = settings.DEFAULT_PAGE_SIZE
+        for category in (None, *ProductCategory):
+            if self._expired():
+                return
+            filters = ProductFilter(category=category)
+            if await response_cache.get_async(ProductService.product_list_cache_key(filters, 1, page_size)) is None:
+                await ProductService.render_product_list_async(db, filters, 1, page_size)
+                self.warmed += 1
+
+    async def _top_product_ids(self, db: AsyncSession) -> List[int]:
+        ids: List[int] = []
+        for column in (Product.view_count, Product.rating):
+            result = await db.scalars(
+                select(Product.id).where(Product.is_active.is_(True))
+                .order_by(column.desc()).limit(self.top_products)
+            )
+            ids.extend(product_id for product_id in result if product_id not in ids)
+        return ids
+
+    def _warm_products(self, product_ids: List[int]) -> None:
+        db = self.session_factory()
+        try:
+            for product_id in product_ids:
+                if self._expired():
+                    return
+                if response_cache.get(ProductService.product_cache_key(product_id)) is None:
+                    try:
+                        ProductService.render_product(db, product_id)
+                    except NotFoundException:
+                        # Deleted since the ids were read
+                        continue
+                    self.warmed += 1
+        finally:
+            db.close()
+
+    async def run(self) -> int:
+        """
+        Warm the cache within the time budget
+
+        Returns:
+            Number of responses rendered
+        """
+        start = time.monotonic()
+        self._deadline = start + self.budget
+        self.warmed = 0
+        if not response_cache.enabled:
+            return 0
+        try:
+            async with self.async_session_factory() as db:
+                await self._warm_lists(db)
+                product_ids = await self._top_product_ids(db) if not self._expired() else []
+            # Sync session, off the event loop
+            await asyncio.to_thread(self._warm_products, product_ids)
+        except Exception as e:
+            logger.warning(f"Cache warm-up stopped: {e}")
+        elapsed = time.monotonic() - start
+        status = "budget exhausted" if self._expired() else "done"
+        logger.info(f"Cache warm-up {status}: {self.warmed} responses in {elapsed:.2f}s")
+        return self.warmed
+
+    async def start(self, ready_timeout: float) -> None:
+        """Start warm-up in the background, waiting up to `ready_timeout` seconds for it"""
+        self._task = asyncio.create_task(self.run())
+        done, _ = await asyncio.wait({self._task}, timeout=ready_timeout)
+        if not done:
+            logger.info(f"Serving before cache warm-up finished (waited {ready_timeout}s)")
+
+    async def stop(self) -> None:
+        """Cancel warm-up if still running"""
+        # Also stops the product loop, which runs in a thread
+        self._deadline = 0.0
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
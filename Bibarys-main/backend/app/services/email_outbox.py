@@ -0,0 +1,202 @@
+"""
+Email outbox sender - delivers queued emails in the background
+"""
+import asyncio
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import logging
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.constants import EmailStatus
+from app.core.smtp_pool import SMTPConnectionPool, get_smtp_pool
+from app.db.models import EmailOutbox
+from app.db.session import SessionLocal
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# Messages stuck in "sending" longer than this are reclaimed (worker crashed mid-send)
+STALE_CLAIM_SECONDS = 300
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+class RateLimiter:
+    """Token bucket limiting sends per second"""
+
+    def __init__(self, rate_per_second: float):
+        self.rate = rate_per_second
+        self._tokens = rate_per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a send is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EmailOutboxWorker:
+    """
+    Background sender for the email outbox table
+
+    Rows are claimed with a per-batch token, so several workers (or several
+    app processes) never send the same message twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        pool: Optional[SMTPConnectionPool] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.pool = pool
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.EMAIL_RETRY_BASE_SECONDS
+        self.poll_interval = poll_interval if poll_interval is not None else settings.EMAIL_OUTBOX_POLL_INTERVAL
+        self.rate_limiter = RateLimiter(
+            rate_per_second if rate_per_second is not None else settings.EMAIL_RATE_LIMIT_PER_SECOND
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def process_batch(self) -> int:
+        """
+        Claim and send one batch of due messages
+
+        Returns:
+            Number of messages processed (sent, rescheduled or failed)
+        """
+        pool = self.pool or get_smtp_pool()
+        # Claimed rows stay loaded across commits, so no connection is held during SMTP sends
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            messages = self._claim_batch(db)
+            for message in messages:
+                self.rate_limiter.acquire()
+                self._send(db, pool, message)
+                db.commit()
+            return len(messages)
+        finally:
+            db.close()
+
+    def _claim_batch(self, db: Session) -> list:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=STALE_CLAIM_SECONDS)
+        due = or_(
+            and_(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == EmailStatus.SENDING, EmailOutbox.updated_at < stale_before),
+        )
+
+        ids = [
+            row.id for row in
+            db.query(EmailOutbox.id).filter(due).order_by(EmailOutbox.id).limit(self.batch_size).all()
+        ]
+        if not ids:
+            return []
+
+        token = uuid.uuid4().hex
+        db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids), due).update(
+            {"status": EmailStatus.SENDING, "claimed_by": token},
+            synchronize_session=False
+        )
+        db.commit()
+
+        messages = (
+            db.query(EmailOutbox)
+            .filter(EmailOutbox.claimed_by == token, EmailOutbox.status == EmailStatus.SENDING)
+            .order_by(EmailOutbox.id)
+            .all()
+        )
+        db.commit()
+        return messages
+
+    def _send(self, db: Session, pool: SMTPConnectionPool, message: EmailOutbox) -> None:
+        message.attempts += 1
+        msg = EmailService.build_message(
+            message.recipient, message.subject, message.html_content, message.text_content
+        )
+        try:
+            with pool.connection() as server:
+                server.send_message(msg)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+            self._fail(message, str(e))
+        except smtplib.SMTPResponseException as e:
+            if 500 <= e.smtp_code < 600:
+                self._fail(message, str(e))
+            else:
+                self._retry(message, str(e))
+        except (smtplib.SMTPException, OSError) as e:
+            self._retry(message, str(e))
+        else:
+            message.status = EmailStatus.SENT
+            message.sent_at = datetime.utcnow()
+            message.claimed_by = None
+            message.last_error = None
+            logger.info(f"Email {message.id} sent to {message.recipient}")
+
+    def _retry(self, message: EmailOutbox, error: str) -> None:
+        if message.attempts >= self.max_attempts:
+            self._fail(message, error)
+            return
+        delay = min(self.retry_base_seconds * 2 ** (message.attempts - 1), MAX_RETRY_DELAY_SECONDS)
+        message.status = EmailStatus.PENDING
+        message.claimed_by = None
+        message.last_error = error
+        message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning(f"Email {message.id} failed (attempt {message.attempts}), retry in {delay}s: {error}")
+
+    def _fail(self, message: EmailOutbox, error: str) -> None:
+        message.status = EmailStatus.FAILED
+        message.claimed_by = None
+        message.last_error = error
+        logger.error(f"Email {message.id} to {message.recipient} failed permanently: {error}")
+
+    async def run(self) -> None:
+        """Poll the outbox until cancelled"""
+        while True:
+            try:
+                processed = await asyncio.to_thread(self.process_batch)
+            except Exception as e:
+                logger.error(f"Email outbox batch failed: {e}", exc_info=True)
+                processed = 0
+            # Drain backlog without waiting, otherwise poll
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Start background sender task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            logger.info("Email outbox worker started")
+
+    async def stop(self) -> None:
+        """Stop background sender task and close idle SMTP connections"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        (self.pool or get_smtp_pool()).close_all()
+        logger.info("Email outbox worker stopped")
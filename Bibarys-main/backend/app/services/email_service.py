@@ -1,12 +1,15 @@
 """
 Email service for sending notifications
 """
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from datetime import datetime
 from typing import Optional, List
 import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from app.config import settings
+from app.core.constants import EmailStatus
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +22,29 @@ class EmailService:
         to: str,
         subject: str,
         html_content: str,
-        text_content: Optional[str] = None
+        text_content: Optional[str] = None,
+        db: Optional[Session] = None
     ) -> bool:
-        """Send HTML email via SMTP."""
+        """
+        Send HTML email
+        
+        With the outbox enabled the message is only queued; the background
+        sender delivers it. Pass `db` to queue it in the caller's transaction:
+        the caller commits it, and a failed insert fails that transaction
+        rather than losing the email. Without the outbox, an email sent
+        with `db` is delivered once the caller commits.
+        """
+        if db is not None and settings.SMTP_HOST and settings.SMTP_FROM:
+            if settings.EMAIL_OUTBOX_ENABLED:
+                EmailService.enqueue_email(to, subject, html_content, text_content, db=db)
+                return True
+            # Not over SMTP while the caller's transaction (and connection) is open
+            event.listen(
+                db, "after_commit",
+                lambda session: EmailService.send_email(to, subject, html_content, text_content),
+                once=True,
+            )
+            return True
         try:
             # If SMTP not configured, log only
             if not settings.SMTP_HOST or not settings.SMTP_FROM:
@@ -30,27 +53,11 @@ class EmailService:
                 logger.info(f"[EMAIL PLACEHOLDER] Body: {html_content[:100]}...")
                 return True
             
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = settings.SMTP_FROM
-            msg['To'] = to
-            
-            # Add text version
-            if text_content:
-                text_part = MIMEText(text_content, 'plain')
-                msg.attach(text_part)
-            
-            # Add HTML version
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                server.starttls()
-                if settings.SMTP_USER and settings.SMTP_PASSWORD:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                server.send_message(msg)
+            if settings.EMAIL_OUTBOX_ENABLED:
+                EmailService.enqueue_email(to, subject, html_content, text_content)
+                return True
             
+            EmailService.deliver_email(to, subject, html_content, text_content)
             logger.info(f"Email sent successfully to {to}")
             return True
         except Exception as e:
@@ -58,7 +65,81 @@ class EmailService:
             return False
     
     @staticmethod
-    def send_welcome_email(email: str, name: str) -> bool:
+    def enqueue_email(
+        to: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        db: Optional[Session] = None
+    ) -> int:
+        """
+        Queue email in the outbox table and return its ID
+        
+        With `db` the row is only flushed, so it commits (or rolls back)
+        together with the caller's changes; without it, it is committed in
+        a session of its own.
+        """
+        from app.db.models import EmailOutbox
+        from app.db.session import SessionLocal
+        
+        session = db if db is not None else SessionLocal()
+        try:
+            message = EmailOutbox(
+                recipient=to,
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content,
+                status=EmailStatus.PENDING,
+                next_attempt_at=datetime.utcnow(),
+            )
+            session.add(message)
+            if db is None:
+                session.commit()
+            else:
+                session.flush()
+            return message.id
+        finally:
+            if db is None:
+                session.close()
+    
+    @staticmethod
+    def build_message(
+        to: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> MIMEMultipart:
+        """Build MIME message with optional plain text alternative"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = settings.SMTP_FROM
+        msg['To'] = to
+        
+        # Add text version
+        if text_content:
+            msg.attach(MIMEText(text_content, 'plain'))
+        
+        # Add HTML version
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        return msg
+    
+    @staticmethod
+    def deliver_email(
+        to: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> None:
+        """Deliver email immediately over a pooled SMTP connection"""
+        from app.core.smtp_pool import get_smtp_pool
+        
+        msg = EmailService.build_message(to, subject, html_content, text_content)
+        with get_smtp_pool().connection() as server:
+            server.send_message(msg)
+    
+    @staticmethod
+    def send_welcome_email(email: str, name: str, db: Optional[Session] = None) -> bool:
         """Send welcome email to new user."""
         subject = "Добро пожаловать в Bibarys!"
         html = f"""
@@ -71,10 +152,10 @@ class EmailService:
           </body>
         </html>
         """
-        return EmailService.send_email(email, subject, html)
+        return EmailService.send_email(email, subject, html, db=db)
     
     @staticmethod
-    def send_order_confirmation(email: str, order_id: int, total: float) -> bool:
+    def send_order_confirmation(email: str, order_id: int, total: float, db: Optional[Session] = None) -> bool:
         """Send order confirmation email."""
         subject = f"Заказ №{order_id} оформлен"
         html = f"""
@@ -88,10 +169,10 @@ class EmailService:
           </body>
         </html>
         """
-        return EmailService.send_email(email, subject, html)
+        return EmailService.send_email(email, subject, html, db=db)
     
     @staticmethod
-    def send_order_status_update(email: str, order_id: int, status: str) -> bool:
+    def send_order_status_update(email: str, order_id: int, status: str, db: Optional[Session] = None) -> bool:
         """Send order status update email."""
         status_map = {
             'pending': 'Ожидает обработки',
@@ -111,10 +192,10 @@ class EmailService:
           </body>
         </html>
         """
-        return EmailService.send_email(email, subject, html)
+        return EmailService.send_email(email, subject, html, db=db)
     
     @staticmethod
-    def send_password_reset(email: str, reset_token: str) -> bool:
+    def send_password_reset(email: str, reset_token: str, db: Optional[Session] = None) -> bool:
         """Send password reset email."""
         reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
         subject = "Сброс пароля"
@@ -131,7 +212,7 @@ class EmailService:
           </body>
         </html>
         """
-        return EmailService.send_email(email, subject, html)
+        return EmailService.send_email(email, subject, html, db=db)
     
     @staticmethod
     def send_order_confirmation_email(email: str, order_id: int, tracking_number: str) -> bool:
@@ -165,8 +246,14 @@ class EmailService:
     @staticmethod
     def send_bulk_email(emails: List[str], subject: str, body: str) -> bool:
         """Send bulk email (admin feature)."""
-        logger.info(f"[EMAIL] Sending bulk email to {len(emails)} recipients")
-        logger.info(f"Subject: {subject}")
-        logger.info(f"Body preview: {body[:100]}...")
-        return True
-
+        if not settings.SMTP_HOST or not settings.SMTP_FROM:
+            logger.info(f"[EMAIL PLACEHOLDER] Bulk email to {len(emails)} recipients")
+            logger.info(f"[EMAIL PLACEHOLDER] Subject: {subject}")
+            logger.info(f"[EMAIL PLACEHOLDER] Body preview: {body[:100]}...")
+            return True
+        
+        from app.services.bulk_email_service import BulkEmailSender
+        
+        sent, failed = BulkEmailSender().send_to_addresses(emails, subject, body)
+        logger.info(f"[EMAIL] Bulk email sent to {sent} recipients, {failed} failed")
+        return failed == 0
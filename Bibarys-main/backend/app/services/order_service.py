@@ -1,14 +1,27 @@
 """
 Order service - Business logic for order operations
 """
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional, List, Tuple
 from datetime import datetime, timedelta
 import uuid
-from app.db.models import Order, OrderItem, CartItem, Product
-from app.schemas.order import OrderCreate, OrderUpdate, OrderFilter
+from app.db.models import Order, OrderItem, CartItem, Product, User
+from app.schemas.order import (
+    OrderCreate, OrderUpdate, OrderFilter, OrderResponse, OrderItemResponse, OrderUserInfo
+)
 from app.core.constants import OrderStatus, DELIVERY_COSTS
 from app.core.exceptions import NotFoundException, BadRequestException, InsufficientStockException, ForbiddenException
+from app.core.response_cache import response_cache
+from app.services.email_service import EmailService
+
+# OrderResponse fields as columns, for list endpoints that render rows
+# straight to JSON (see OrderService.get_order_rows)
+ORDER_RESPONSE_COLUMNS = tuple(
+    getattr(Order, name) for name in OrderResponse.model_fields if name not in ("user", "items")
+) + tuple(getattr(User, name).label(f"user__{name}") for name in OrderUserInfo.model_fields)
+ORDER_ITEM_RESPONSE_COLUMNS = tuple(getattr(OrderItem, name) for name in OrderItemResponse.model_fields)
 
 
 class OrderService:
@@ -20,8 +33,15 @@ class OrderService:
         return db.query(Order).filter(Order.id == order_id).first()
     
     @staticmethod
-    def create_order_from_cart(db: Session, order_data: OrderCreate, user_id: int) -> Order:
-        """Create order from user's cart"""
+    def create_order_from_cart(
+        db: Session, order_data: OrderCreate, user_id: int, email: Optional[str] = None
+    ) -> Order:
+        """
+        Create order from user's cart
+        
+        With `email`, the confirmation is queued in the same transaction as
+        the order, so one is never kept without the other.
+        """
         # Get user's cart items
         cart_items = db.query(CartItem).filter(CartItem.user_id == user_id).all()
         
@@ -31,6 +51,7 @@ class OrderService:
         # Calculate total price and validate stock
         total_price = 0.0
         order_items_data = []
+        categories = set()
         
         for cart_item in cart_items:
             product = db.query(Product).filter(Product.id == cart_item.product_id).first()
@@ -48,6 +69,7 @@ class OrderService:
             
             item_total = product.price * cart_item.quantity
             total_price += item_total
+            categories.add(product.category)
             
             order_items_data.append({
                 "product_id": product.id,
@@ -142,30 +164,16 @@ class OrderService:
         # Clear user's cart
         db.query(CartItem).filter(CartItem.user_id == user_id).delete()
         
+        if email:
+            EmailService.send_order_confirmation(email, order.id, order.total_price, db=db)
+        
         db.commit()
+        # Stock changed
+        response_cache.invalidate_products([item["product_id"] for item in order_items_data], categories)
         db.refresh(order)
         
         return order
     
-    @staticmethod
-    def get_user_orders(
-        db: Session,
-        user_id: int,
-        skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[Order], int]:
-        """Get user's orders"""
-        total = db.query(Order).filter(Order.user_id == user_id).count()
-        orders = (
-            db.query(Order)
-            .filter(Order.user_id == user_id)
-            .order_by(Order.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return orders, total
-    
     @staticmethod
     def get_all_orders(
         db: Session,
@@ -196,25 +204,76 @@ class OrderService:
         return orders, total
     
     @staticmethod
-    def get_seller_orders(
+    def _order_criteria(filters: OrderFilter) -> list:
+        criteria = []
+        if filters.status:
+            criteria.append(Order.status == filters.status)
+        if filters.user_id:
+            criteria.append(Order.user_id == filters.user_id)
+        if filters.seller_id:
+            criteria.append(Order.id.in_(
+                select(OrderItem.order_id).where(OrderItem.seller_id == filters.seller_id)
+            ))
+        return criteria
+    
+    @staticmethod
+    def _order_rows_select(criteria: list):
+        return (
+            select(*ORDER_RESPONSE_COLUMNS)
+            .outerjoin(User, User.id == Order.user_id)
+            .where(*criteria)
+            .order_by(Order.created_at.desc())
+        )
+    
+    @staticmethod
+    def _item_rows_select(order_ids: List[int]):
+        return select(*ORDER_ITEM_RESPONSE_COLUMNS).where(OrderItem.order_id.in_(order_ids)).order_by(OrderItem.id)
+    
+    @staticmethod
+    def _assemble_order_rows(order_rows, item_rows) -> List[dict]:
+        """Nest user and item rows into OrderResponse dicts"""
+        orders = {}
+        for row in order_rows:
+            order = row._asdict()
+            user = {name: order.pop(f"user__{name}") for name in OrderUserInfo.model_fields}
+            order["user"] = user if user["id"] is not None else None
+            order["items"] = []
+            orders[order["id"]] = order
+        for row in item_rows:
+            orders[row.order_id]["items"].append(row._asdict())
+        return list(orders.values())
+    
+    @staticmethod
+    def get_order_rows(
         db: Session,
-        seller_id: int,
+        filters: OrderFilter,
         skip: int = 0,
         limit: int = 20
-    ) -> Tuple[List[Order], int]:
-        """Get orders containing seller's products"""
-        # Get orders that have items from this seller
-        query = (
-            db.query(Order)
-            .join(OrderItem)
-            .filter(OrderItem.seller_id == seller_id)
-            .distinct()
-        )
-        
-        total = query.count()
-        orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
-        
-        return orders, total
+    ) -> Tuple[List[dict], int]:
+        """Get orders as OrderResponse dicts, with user and items, in three queries"""
+        criteria = OrderService._order_criteria(filters)
+        total = db.scalar(select(func.count(Order.id)).where(*criteria))
+        order_rows = db.execute(OrderService._order_rows_select(criteria).offset(skip).limit(limit)).all()
+        item_rows = []
+        if order_rows:
+            item_rows = db.execute(OrderService._item_rows_select([row.id for row in order_rows])).all()
+        return OrderService._assemble_order_rows(order_rows, item_rows), total
+    
+    @staticmethod
+    async def get_order_rows_async(
+        db: AsyncSession,
+        filters: OrderFilter,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[dict], int]:
+        """Get orders as OrderResponse dicts (async session)"""
+        criteria = OrderService._order_criteria(filters)
+        total = await db.scalar(select(func.count(Order.id)).where(*criteria))
+        order_rows = (await db.execute(OrderService._order_rows_select(criteria).offset(skip).limit(limit))).all()
+        item_rows = []
+        if order_rows:
+            item_rows = (await db.execute(OrderService._item_rows_select([row.id for row in order_rows]))).all()
+        return OrderService._assemble_order_rows(order_rows, item_rows), total
     
     @staticmethod
     def update_order_status(
@@ -325,6 +384,9 @@ class OrderService:
                         )
                         db.add(transaction)
         
+        # Queued with the status change, in one transaction
+        EmailService.send_order_status_update(order.user.email, order.id, order.status.value, db=db)
+        
         db.commit()
         db.refresh(order)
         
@@ -345,14 +407,17 @@ class OrderService:
             raise BadRequestException(detail="Only pending orders can be cancelled")
         
         # Restore product quantities
+        restocked = {}
         for item in order.items:
             product = db.query(Product).filter(Product.id == item.product_id).first()
             if product:
                 product.quantity += item.quantity
+                restocked[product.id] = product.category
         
         order.status = OrderStatus.CANCELLED
         
         db.commit()
+        response_cache.invalidate_products(restocked, restocked.values())
         db.refresh(order)
         
         return order
@@ -1,12 +1,34 @@
 """
 Product service - Business logic for product operations
 """
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc
+from sqlalchemy import or_, and_, desc, asc, case, func, select, update
 from typing import Optional, List, Tuple
+import math
+import orjson
+from fastapi.responses import ORJSONResponse
 from app.db.models import Product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductFilter
-from app.core.exceptions import NotFoundException, ForbiddenException
+from app.schemas.product import ProductCreate, ProductUpdate, ProductFilter, ProductResponse
+from app.config import settings
+from app.core.constants import ProductCategory
+from app.core.exceptions import NotFoundException, ForbiddenException, BadRequestException
+from app.core.cache import NegativeCache
+from app.core.http_cache import weak_etag
+from app.core.response_cache import CATALOG_TAG, CachedResponse, response_cache, list_tags, product_tag
+
+# ProductResponse fields as columns: list endpoints select these and render
+# the rows straight to JSON, skipping ORM objects and Pydantic validation
+PRODUCT_RESPONSE_COLUMNS = tuple(getattr(Product, name) for name in ProductResponse.model_fields)
+
+# Search facets: "N stars & up" thresholds and the most price buckets a request may ask for
+RATING_FACETS = (4, 3, 2, 1)
+MAX_PRICE_BUCKETS = 20
+
+# Deleted product ids that crawlers and stale clients keep requesting
+missing_product_cache = NegativeCache(
+    maxsize=settings.NEGATIVE_CACHE_SIZE, ttl=settings.NEGATIVE_CACHE_TTL, max_id_ttl=settings.NEGATIVE_CACHE_MAX_ID_TTL
+)
 
 
 class ProductService:
@@ -14,8 +36,16 @@ class ProductService:
     
     @staticmethod
     def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
-        """Get product by ID"""
-        return db.query(Product).filter(Product.id == product_id).first()
+        """Get product by ID (deleted ids are answered from the negative cache)"""
+        if missing_product_cache.is_missing(product_id):
+            return None
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if product is None:
+            max_id = missing_product_cache.known_max_id()
+            if max_id is None:
+                max_id = db.query(func.max(Product.id)).scalar()
+            missing_product_cache.remember(product_id, max_id)
+        return product
     
     @staticmethod
     def create_product(db: Session, product_data: ProductCreate, seller_id: int) -> Product:
@@ -33,6 +63,8 @@ class ProductService:
         db.add(product)
         db.commit()
         db.refresh(product)
+        missing_product_cache.created(product.id)
+        response_cache.invalidate_products([product.id], [product.category])
         
         return product
     
@@ -55,12 +87,14 @@ class ProductService:
             raise ForbiddenException(detail="You don't have permission to update this product")
         
         # Update fields
+        old_category = product.category
         update_data = product_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(product, field, value)
         
         db.commit()
         db.refresh(product)
+        response_cache.invalidate_products([product_id], [old_category, product.category])
         
         return product
     
@@ -76,20 +110,14 @@ class ProductService:
         if not is_admin and product.seller_id != user_id:
             raise ForbiddenException(detail="You don't have permission to delete this product")
         
+        category = product.category
         db.delete(product)
         db.commit()
+        response_cache.invalidate_products([product_id], [category])
     
     @staticmethod
-    def get_products(
-        db: Session,
-        filters: ProductFilter,
-        skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[Product], int]:
-        """Get products with filtering and pagination"""
-        query = db.query(Product)
-        
-        # Apply filters
+    def _apply_filters(query, filters: ProductFilter):
+        """Apply product filters to a Query or Select"""
         if filters.category:
             query = query.filter(Product.category == filters.category)
         
@@ -114,29 +142,256 @@ class ProductService:
                 )
             )
         
-        # Count total before pagination
-        total = query.count()
-        
-        # Apply sorting
+        return query
+    
+    @staticmethod
+    def _apply_sorting(query, filters: ProductFilter):
+        """Apply product sort order to a Query or Select"""
         sort_column = getattr(Product, filters.sort_by, Product.created_at)
         if filters.sort_order == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
+            return query.order_by(asc(sort_column))
+        return query.order_by(desc(sort_column))
+    
+    @staticmethod
+    def get_products(
+        db: Session,
+        filters: ProductFilter,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Product], int]:
+        """Get products with filtering and pagination"""
+        query = ProductService._apply_filters(db.query(Product), filters)
         
-        # Apply pagination
+        # Count total before pagination
+        total = query.count()
+        
+        # Apply sorting and pagination
+        query = ProductService._apply_sorting(query, filters)
         products = query.offset(skip).limit(limit).all()
         
         return products, total
     
+    @staticmethod
+    async def get_products_async(
+        db: AsyncSession,
+        filters: ProductFilter,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Product], int]:
+        """Get products with filtering and pagination (async session)"""
+        query = ProductService._apply_filters(select(Product), filters)
+        
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        
+        query = ProductService._apply_sorting(query, filters)
+        result = await db.scalars(query.offset(skip).limit(limit))
+        
+        return list(result), total
+    
+    @staticmethod
+    async def get_product_rows_async(
+        db: AsyncSession,
+        filters: ProductFilter,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[dict], int]:
+        """Get products as ProductResponse dicts (async session)"""
+        query = ProductService._apply_filters(select(*PRODUCT_RESPONSE_COLUMNS), filters)
+        
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        
+        query = ProductService._apply_sorting(query, filters)
+        result = await db.execute(query.offset(skip).limit(limit))
+        
+        return [row._asdict() for row in result], total
+    
     @staticmethod
     def increment_view_count(db: Session, product_id: int) -> None:
-        """Increment product view count"""
+        """
+        Increment product view count
+        
+        Single UPDATE that keeps `updated_at`, so views do not change the
+        product's ETag or the catalog version.
+        """
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(view_count=Product.view_count + 1, updated_at=Product.updated_at),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+    
+    @staticmethod
+    async def get_catalog_version_async(db: AsyncSession) -> Tuple[int, Optional[str]]:
+        """
+        Version of the whole catalog for list ETags
+        
+        Product count and latest `updated_at`: any create, delete or edit
+        changes one of them.
+        """
+        count, last_update = (await db.execute(
+            select(func.count(Product.id), func.max(Product.updated_at))
+        )).one()
+        return count, last_update.isoformat() if last_update else None
+    
+    @staticmethod
+    def search_criteria(q: str, min_price: Optional[float] = None, max_price: Optional[float] = None) -> list:
+        """Filters of `GET /products/search` shared by results and facets"""
+        criteria = [or_(Product.name.ilike(f"%{q}%"), Product.description.ilike(f"%{q}%"))]
+        if min_price is not None:
+            criteria.append(Product.price >= min_price)
+        if max_price is not None:
+            criteria.append(Product.price <= max_price)
+        return criteria
+    
+    @staticmethod
+    def parse_price_buckets(value: str) -> Tuple[float, ...]:
+        """
+        Parse comma-separated price bucket bounds ("10,25,50")
+        
+        Raises:
+            BadRequestException: If bounds are not increasing, finite positive numbers
+        """
+        try:
+            bounds = tuple(float(bound) for bound in value.split(","))
+        except ValueError:
+            raise BadRequestException(detail="price_buckets must be comma-separated numbers")
+        # float() accepts "nan" and "inf", which no comparison below rejects
+        if not all(math.isfinite(bound) for bound in bounds):
+            raise BadRequestException(detail="price_buckets must be finite numbers")
+        if not 0 < len(bounds) <= MAX_PRICE_BUCKETS or bounds[0] <= 0 or any(
+            low >= high for low, high in zip(bounds, bounds[1:])
+        ):
+            raise BadRequestException(
+                detail=f"price_buckets must be 1 to {MAX_PRICE_BUCKETS} increasing positive numbers"
+            )
+        return bounds
+    
+    @staticmethod
+    def get_search_facets(
+        db: Session,
+        q: str,
+        category: Optional[ProductCategory],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        in_stock: Optional[bool],
+        price_bounds: Tuple[float, ...]
+    ) -> dict:
+        """
+        Category, price bucket, rating and in-stock counts for a search
+        
+        One grouped query over products matching `q` and the price range,
+        cached until any product changes, so paging and toggling filters
+        reuse it. Category counts ignore the category filter and the
+        in-stock count ignores the stock filter, so the other choices stay
+        visible; price and rating counts apply both.
+        """
+        key = response_cache.key("search_facets", {
+            "q": q, "min_price": min_price, "max_price": max_price,
+            "price_buckets": ",".join(map(str, price_bounds)),
+        })
+        entry = response_cache.get(key)
+        if entry is not None:
+            rows = orjson.loads(entry.body)
+        else:
+            tags = (CATALOG_TAG,)
+            versions = response_cache.versions(tags)
+            price_bucket = case(
+                *((Product.price < bound, i) for i, bound in enumerate(price_bounds)), else_=len(price_bounds)
+            )
+            rating_bucket = case(*((Product.rating >= stars, stars) for stars in RATING_FACETS), else_=0)
+            stocked = case((Product.quantity > 0, 1), else_=0)
+            rows = [
+                [row_category.value, price, rating, row_stocked, count]
+                for row_category, price, rating, row_stocked, count in (
+                    db.query(Product.category, price_bucket, rating_bucket, stocked, func.count())
+                    .filter(*ProductService.search_criteria(q, min_price, max_price))
+                    .group_by(Product.category, price_bucket, rating_bucket, stocked)
+                )
+            ]
+            response_cache.set(key, orjson.dumps(rows), "", tags, versions)
+        
+        category_counts = {value.value: 0 for value in ProductCategory}
+        price_counts = [0] * (len(price_bounds) + 1)
+        rating_counts = dict.fromkeys(RATING_FACETS, 0)
+        in_stock_count = 0
+        for row_category, price, rating, row_stocked, count in rows:
+            stock_match = in_stock is None or bool(row_stocked) == in_stock
+            category_match = category is None or row_category == category.value
+            if stock_match:
+                category_counts[row_category] += count
+            if category_match and row_stocked:
+                in_stock_count += count
+            if stock_match and category_match:
+                price_counts[price] += count
+                for stars in RATING_FACETS:
+                    if rating >= stars:
+                        rating_counts[stars] += count
+        
+        lower_bounds = (0.0,) + price_bounds
+        upper_bounds = price_bounds + (None,)
+        return {
+            "categories": [{"category": value, "count": count} for value, count in category_counts.items()],
+            "price": [
+                {"min": low, "max": high, "count": count}
+                for low, high, count in zip(lower_bounds, upper_bounds, price_counts)
+            ],
+            "rating": [{"min_rating": stars, "count": count} for stars, count in rating_counts.items()],
+            "in_stock": in_stock_count,
+        }
+    
+    @staticmethod
+    def product_cache_key(product_id: int) -> str:
+        return response_cache.key(f"product/{product_id}", {})
+    
+    @staticmethod
+    def product_list_cache_key(filters: ProductFilter, page: int, page_size: int) -> str:
+        return response_cache.key("products", {**filters.model_dump(mode="json"), "page": page, "page_size": page_size})
+    
+    @staticmethod
+    def render_product(db: Session, product_id: int) -> CachedResponse:
+        """
+        Render `GET /products/{id}` into the response cache
+        
+        Raises:
+            NotFoundException: If product not found
+        """
+        tags = (product_tag(product_id),)
+        versions = response_cache.versions(tags)
         product = ProductService.get_product_by_id(db, product_id)
+        if not product:
+            raise NotFoundException(detail="Product not found")
         
-        if product:
-            product.view_count += 1
-            db.commit()
+        etag = weak_etag("product", product.id, product.updated_at.isoformat())
+        body = ProductResponse.model_validate(product).model_dump_json().encode()
+        return response_cache.set(ProductService.product_cache_key(product_id), body, etag, tags, versions)
+    
+    @staticmethod
+    async def render_product_list_async(
+        db: AsyncSession,
+        filters: ProductFilter,
+        page: int,
+        page_size: int
+    ) -> CachedResponse:
+        """Render a `GET /products` page into the response cache"""
+        tags = list_tags(filters.category)
+        versions = await response_cache.versions_async(tags)
+        params = {**filters.model_dump(mode="json"), "page": page, "page_size": page_size}
+        version = await ProductService.get_catalog_version_async(db)
+        etag = weak_etag("products", version, params)
+        
+        # ProductResponse rows, rendered without re-validation
+        products, total = await ProductService.get_product_rows_async(db, filters, (page - 1) * page_size, page_size)
+        body = ORJSONResponse({
+            "items": products,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total / page_size) if total > 0 else 0,
+        }).body
+        return await response_cache.set_async(
+            ProductService.product_list_cache_key(filters, page, page_size), body, etag, tags, versions
+        )
     
     @staticmethod
     def update_product_rating(db: Session, product_id: int) -> None:
@@ -158,4 +413,6 @@ class ProductService:
             product.rating = 0.0
             product.review_count = 0
         
+        category = product.category
         db.commit()
+        response_cache.invalidate_products([product_id], [category])
@@ -1,17 +1,99 @@
 """
 User service - Business logic for user operations
 """
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from dataclasses import dataclass
 from typing import Optional, List
+from app.config import settings
 from app.db.models import User
 from app.schemas.user import UserCreate, UserUpdate, UserAdminUpdate
-from app.core.security import hash_password, verify_password
+from app.core.security import (
+    hash_password, verify_password, verify_and_update_password, verify_and_update_password_async,
+)
 from app.core.exceptions import NotFoundException, ConflictException, BadRequestException
+from app.core.cache import NegativeCache, TTLCache
+from app.core.constants import UserRole
+from app.services.email_service import EmailService
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Minimal user data needed to authorize a request"""
+    id: int
+    email: str
+    role: UserRole
+    first_name: str
+    last_name: str
+    is_active: bool
+
+
+# user_id -> UserPrincipal, shared by all requests in this process
+principal_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+# Deleted user ids (tokens outliving their user)
+missing_user_cache = NegativeCache(
+    maxsize=settings.NEGATIVE_CACHE_SIZE, ttl=settings.NEGATIVE_CACHE_TTL, max_id_ttl=settings.NEGATIVE_CACHE_MAX_ID_TTL
+)
 
 
 class UserService:
     """Service for user-related operations"""
     
+    @staticmethod
+    def get_principal(db: Session, user_id: int) -> Optional[UserPrincipal]:
+        """Get cached principal, loading only the needed columns on a miss"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        if missing_user_cache.is_missing(user_id):
+            return None
+        
+        row = (
+            db.query(User.id, User.email, User.role, User.first_name, User.last_name, User.is_active)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row is None:
+            max_id = missing_user_cache.known_max_id()
+            if max_id is None:
+                max_id = db.query(func.max(User.id)).scalar()
+            missing_user_cache.remember(user_id, max_id)
+            return None
+        
+        principal = UserPrincipal(**row._asdict())
+        principal_cache.set(user_id, principal)
+        return principal
+    
+    @staticmethod
+    async def get_principal_async(db: AsyncSession, user_id: int) -> Optional[UserPrincipal]:
+        """Get cached principal (async session)"""
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+        if missing_user_cache.is_missing(user_id):
+            return None
+        
+        row = (await db.execute(
+            select(User.id, User.email, User.role, User.first_name, User.last_name, User.is_active)
+            .where(User.id == user_id)
+        )).first()
+        if row is None:
+            max_id = missing_user_cache.known_max_id()
+            if max_id is None:
+                max_id = await db.scalar(select(func.max(User.id)))
+            missing_user_cache.remember(user_id, max_id)
+            return None
+        
+        principal = UserPrincipal(**row._asdict())
+        principal_cache.set(user_id, principal)
+        return principal
+    
+    @staticmethod
+    def invalidate_principal(user_id: int) -> None:
+        """Drop cached principal after the user row changes"""
+        principal_cache.delete(user_id)
+    
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID"""
@@ -24,15 +106,16 @@ class UserService:
     
     @staticmethod
     def create_user(db: Session, user_data: UserCreate) -> User:
-        """Create a new user"""
+        """Create a new user and queue their welcome email"""
+        # Hash before the first query, so the connection (on SQLite, the only
+        # writer) is not held while bcrypt runs
+        hashed_password = hash_password(user_data.password)
+        
         # Check if user with this email already exists
         existing_user = UserService.get_user_by_email(db, user_data.email)
         if existing_user:
             raise ConflictException(detail="User with this email already exists")
         
-        # Hash password
-        hashed_password = hash_password(user_data.password)
-        
         # Create user
         user = User(
             email=user_data.email,
@@ -44,8 +127,12 @@ class UserService:
         )
         
         db.add(user)
+        db.flush()
+        # Welcome email queued in the same transaction as the user
+        EmailService.send_welcome_email(user.email, user.first_name, db=db)
         db.commit()
         db.refresh(user)
+        missing_user_cache.created(user.id)
         
         return user
     
@@ -57,12 +144,47 @@ class UserService:
         if not user:
             return None
         
-        if not verify_password(password, user.password_hash):
+        # End the transaction before bcrypt runs: on SQLite the session holds
+        # the only writer connection, which every login and write would queue on
+        db.expunge(user)
+        db.rollback()
+        
+        verified, new_hash = verify_and_update_password(password, user.password_hash)
+        if not verified:
             return None
         
         if not user.is_active:
             return None
         
+        # Transparently upgrade hashes made with different BCRYPT_ROUNDS
+        if new_hash:
+            db.add(user)
+            user.password_hash = new_hash
+            db.commit()
+        
+        return user
+    
+    @staticmethod
+    async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Authenticate user (async session; bcrypt runs without holding a request thread)"""
+        user = await db.scalar(select(User).where(User.email == email))
+        
+        if not user:
+            return None
+        
+        # No connection held while bcrypt runs, as in `authenticate_user`
+        db.expunge(user)
+        await db.rollback()
+        
+        verified, new_hash = await verify_and_update_password_async(password, user.password_hash)
+        if not verified or not user.is_active:
+            return None
+        
+        if new_hash:
+            db.add(user)
+            user.password_hash = new_hash
+            await db.commit()
+        
         return user
     
     @staticmethod
@@ -80,6 +202,7 @@ class UserService:
         
         db.commit()
         db.refresh(user)
+        UserService.invalidate_principal(user_id)
         
         return user
     
@@ -98,6 +221,7 @@ class UserService:
         
         db.commit()
         db.refresh(user)
+        UserService.invalidate_principal(user_id)
         
         return user
     
@@ -109,8 +233,12 @@ class UserService:
         if not user:
             raise NotFoundException(detail="User not found")
         
+        # Release the connection (on SQLite, the only writer) while bcrypt runs
+        password_hash = user.password_hash
+        db.rollback()
+        
         # Verify old password
-        if not verify_password(old_password, user.password_hash):
+        if not verify_password(old_password, password_hash):
             raise BadRequestException(detail="Old password is incorrect")
         
         # Hash and set new password
@@ -138,3 +266,4 @@ class UserService:
         
         db.delete(user)
         db.commit()
+        UserService.invalidate_principal(user_id)
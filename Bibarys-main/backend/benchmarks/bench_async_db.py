@@ -0,0 +1,144 @@
+"""
+Product listing throughput: sync session (threadpool) vs async session
+
+Both endpoints run the same ProductService query against the same SQLite
+file; only the session type differs. Sync routes each hold one AnyIO worker
+thread for the whole request, async routes only hold the event loop while
+they are not waiting on the database.
+
+Against a local SQLite file the query itself is CPU-bound, so both modes
+land within ~10% of each other (async pays for the driver thread hop).
+The async mode pays off when queries wait on network round trips
+(PostgreSQL via asyncpg) and concurrency exceeds the threadpool size.
+
+Usage:
+    python benchmarks/bench_async_db.py --products 2000 --requests 2000 --concurrency 1,16,64
+    python benchmarks/bench_async_db.py --threads 8   # smaller threadpool, as on a small container
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anyio
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.constants import ProductCategory, UserRole
+from app.db.base import Base
+from app.db.models import Product, User
+from app.schemas.product import ProductFilter, ProductListResponse
+from app.services.product_service import ProductService
+
+
+def build_app(path: str, pool_size: int) -> FastAPI:
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool,
+                                       pool_size=pool_size, max_overflow=0)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.state.engines = (engine, async_engine)
+    filters = ProductFilter(category=ProductCategory.DAIRY, is_active=True)
+
+    @app.get("/sync", response_model=ProductListResponse)
+    def list_sync(db: Session = Depends(get_db)):
+        products, total = ProductService.get_products(db, filters, 0, 20)
+        return ProductListResponse(items=products, total=total, page=1, page_size=20, total_pages=1)
+
+    @app.get("/async", response_model=ProductListResponse)
+    async def list_async(db: AsyncSession = Depends(get_async_db)):
+        products, total = await ProductService.get_products_async(db, filters, 0, 20)
+        return ProductListResponse(items=products, total=total, page=1, page_size=20, total_pages=1)
+
+    return app
+
+
+def seed(path: str, count: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    categories = list(ProductCategory)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "email": "seller@example.com", "password_hash": "x", "first_name": "Bench",
+            "last_name": "Seller", "role": UserRole.SELLER,
+        }])
+        conn.execute(insert(Product), [{
+            "name": f"Product {i}", "description": "Benchmark product", "price": 1 + i % 100,
+            "quantity": 10, "category": categories[i % len(categories)], "seller_id": 1, "image_urls": [],
+        } for i in range(count)])
+    engine.dispose()
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def run(args) -> None:
+    if args.threads:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, args.products)
+        app = build_app(path, pool_size=max(levels))
+
+        threads = anyio.to_thread.current_default_thread_limiter().total_tokens
+        print(f"{args.products} products, {args.requests} requests per run, threadpool={threads:.0f}")
+        print(f"{'concurrency':>11} {'sync req/s':>11} {'async req/s':>12}")
+        for concurrency in levels:
+            await load(app, "/sync", 50, concurrency)  # warm up pools
+            await load(app, "/async", 50, concurrency)
+            sync_rps = await load(app, "/sync", args.requests, concurrency)
+            async_rps = await load(app, "/async", args.requests, concurrency)
+            print(f"{concurrency:>11} {sync_rps:>11.0f} {async_rps:>12.0f}")
+
+        engine, async_engine = app.state.engines
+        engine.dispose()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--threads", type=int, default=0, help="AnyIO threadpool size (default: 40)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Bulk email throughput benchmark against a local SMTP sink
+
+Usage:
+    python benchmarks/bench_bulk_email.py --users 5000 --concurrency 1,2,4,8
+
+Requires aiosmtpd (see requirements-dev.txt).
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.constants import UserRole, CampaignStatus
+from app.core.smtp_pool import SMTPConnectionPool
+from app.db.base import Base
+from app.db.models import User, EmailCampaign
+from app.services.bulk_email_service import BulkEmailSender
+
+
+class SinkHandler:
+    """Accept and discard every message"""
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_users(session_factory, count: int) -> None:
+    db = session_factory()
+    rows = [
+        {
+            "email": f"user{i}@example.com",
+            "password_hash": "x",
+            "role": UserRole.CUSTOMER,
+            "first_name": "Bench",
+            "last_name": str(i),
+            "is_active": True,
+            "is_verified": True,
+            "balance": 0.0,
+        }
+        for i in range(count)
+    ]
+    db.execute(insert(User), rows)
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated pool sizes")
+    parser.add_argument("--chunk-size", type=int, default=settings.BULK_EMAIL_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    settings.SMTP_HOST = "127.0.0.1"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        seed_users(session_factory, args.users)
+
+        handler = SinkHandler()
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        try:
+            print(f"{'concurrency':>12} {'sent':>8} {'seconds':>9} {'msg/s':>9}")
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                db = session_factory()
+                campaign = EmailCampaign(subject="Benchmark", html_content="<p>Hello</p>", status=CampaignStatus.PENDING)
+                db.add(campaign)
+                db.commit()
+                campaign_id = campaign.id
+                db.close()
+
+                pool = SMTPConnectionPool("127.0.0.1", controller.port, use_tls=False, size=concurrency)
+                sender = BulkEmailSender(
+                    session_factory=session_factory,
+                    pool=pool,
+                    concurrency=concurrency,
+                    chunk_size=args.chunk_size,
+                )
+                start = time.perf_counter()
+                result = sender.run_campaign(campaign_id)
+                elapsed = time.perf_counter() - start
+                pool.close_all()
+
+                print(f"{concurrency:>12} {result.sent_count:>8} {elapsed:>9.2f} {result.sent_count / elapsed:>9.0f}")
+        finally:
+            controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+List response cost: ORM objects + Pydantic + json vs column rows + orjson
+
+before: query(Product) ORM objects, ProductListResponse(items=...) built
+        from attributes, then FastAPI's response_model validation and
+        serialization, rendered by JSONResponse (stdlib json)
+after:  select() of the ProductResponse columns, rows as dicts rendered
+        by ORJSONResponse
+
+Times cover query, serialization and rendering of one page against a
+seed_data.py database (a temporary one unless --database-url is given).
+Orders are timed the same way, with their user and items.
+
+Usage:
+    python benchmarks/bench_list_serialization.py --rows 1000 --repeat 20
+    python benchmarks/bench_list_serialization.py --database-url sqlite:////tmp/load.db
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import Session, joinedload
+
+import seed_data
+from app.db.models import Order, Product
+from app.schemas.order import OrderFilter, OrderListResponse
+from app.schemas.product import ProductListResponse
+from app.services.order_service import OrderService
+from app.services.product_service import PRODUCT_RESPONSE_COLUMNS
+
+
+def page(items, total, rows) -> dict:
+    return {"items": items, "total": total, "page": 1, "page_size": rows, "total_pages": 1}
+
+
+def render_before(model, content: dict) -> bytes:
+    field = create_response_field(name="response", type_=model)
+    # serialize_response never suspends for coroutine endpoints; run it without a loop
+    coro = serialize_response(field=field, response_content=model(**content))
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return JSONResponse(e.value).body
+
+
+def products_before(db: Session, rows: int) -> bytes:
+    products = db.query(Product).order_by(Product.id).limit(rows).all()
+    return render_before(ProductListResponse, page(products, len(products), rows))
+
+
+def products_after(db: Session, rows: int) -> bytes:
+    products = [row._asdict() for row in db.query(*PRODUCT_RESPONSE_COLUMNS).order_by(Product.id).limit(rows)]
+    return ORJSONResponse(page(products, len(products), rows)).body
+
+
+def orders_before(db: Session, rows: int) -> bytes:
+    orders = db.query(Order).options(joinedload(Order.user)).order_by(Order.created_at.desc()).limit(rows).all()
+    return render_before(OrderListResponse, page(orders, len(orders), rows))
+
+
+def orders_after(db: Session, rows: int) -> bytes:
+    orders, total = OrderService.get_order_rows(db, OrderFilter(), 0, rows)
+    return ORJSONResponse(page(orders, total, rows)).body
+
+
+def timed(func, engine, rows: int, repeat: int):
+    times = []
+    for _ in range(repeat):
+        # Fresh session each time, as in a request (no identity map reuse)
+        with Session(engine) as db:
+            start = time.perf_counter()
+            body = func(db, rows)
+            times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2], len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Seeded database (default: seed a temporary one)")
+    parser.add_argument("--rows", type=int, default=1000, help="Products per page (orders use a tenth)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url
+        if url is None:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            engine = seed_data.create_seed_engine(url)
+            seed_data.Seeder(engine, 1, date(2025, 12, 31), 365, 5000, 1.1).run(
+                users=200, products=max(args.rows, 2000), order_items=5000, reviews=0,
+                cart_items=0, wishlist_items=0, transactions=0, sellers=10,
+            )
+            engine.dispose()
+        engine = seed_data.create_seed_engine(url)
+
+        print(f"median of {args.repeat} runs")
+        print(f"{'list':<16} {'rows':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8} {'us/row after':>13}")
+        for name, before, after, rows in (
+            ("products", products_before, products_after, args.rows),
+            ("orders", orders_before, orders_after, max(args.rows // 10, 1)),
+        ):
+            before_time, before_size = timed(before, engine, rows, args.repeat)
+            after_time, after_size = timed(after, engine, rows, args.repeat)
+            assert abs(before_size - after_size) <= 1, (name, before_size, after_size)
+            print(f"{name:<16} {rows:>6} {before_time * 1000:>10.2f} {after_time * 1000:>9.2f} "
+                  f"{before_time / after_time:>7.1f}x {after_time / rows * 1e6:>13.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
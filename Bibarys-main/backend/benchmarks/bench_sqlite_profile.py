@@ -0,0 +1,138 @@
+"""
+Mixed read/write load on SQLite: default connection setup vs the app profile
+
+default: one shared pool, rollback journal, pysqlite defaults
+profile: WAL + pragmas, one writer connection, read-only reader pool
+
+Readers list a page of products; writers bump a product's view count and
+commit, like GET /products/{id}. Each mode runs on its own database file.
+
+Usage:
+    python benchmarks/bench_sqlite_profile.py --threads 16 --seconds 5 --write-ratio 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.constants import ProductCategory, UserRole
+from app.db.base import Base
+from app.db.models import Product, User
+from app.db.session import configure_sqlite
+
+
+def seed(url: str, count: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    categories = list(ProductCategory)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{
+            "email": "seller@example.com", "password_hash": "x", "first_name": "Bench",
+            "last_name": "Seller", "role": UserRole.SELLER,
+        }])
+        conn.execute(insert(Product), [{
+            "name": f"Product {i}", "description": "Benchmark product", "price": 1 + i % 100,
+            "quantity": 10, "category": categories[i % len(categories)], "seller_id": 1, "image_urls": [],
+        } for i in range(count)])
+    engine.dispose()
+
+
+def factories(url: str, profile: bool, threads: int):
+    connect_args = {"check_same_thread": False}
+    if not profile:
+        engine = create_engine(url, connect_args=connect_args, pool_size=threads, max_overflow=0)
+        factory = sessionmaker(bind=engine)
+        return factory, factory, [engine]
+
+    writer = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0)
+    reader = create_engine(url, connect_args=connect_args, pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0)
+    configure_sqlite(writer)
+    configure_sqlite(reader, read_only=True)
+    return sessionmaker(bind=reader), sessionmaker(bind=writer), [writer, reader]
+
+
+def run(url: str, profile: bool, args) -> dict:
+    read_factory, write_factory, engines = factories(url, profile, args.threads)
+    stats = {"reads": 0, "writes": 0, "errors": 0, "write_latency": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(seed_value: int):
+        rng = random.Random(seed_value)
+        reads = writes = errors = 0
+        latencies = []
+        while time.perf_counter() < deadline:
+            is_write = rng.random() < args.write_ratio
+            start = time.perf_counter()
+            try:
+                if is_write:
+                    with write_factory() as db:
+                        db.execute(
+                            update(Product)
+                            .where(Product.id == rng.randint(1, args.products))
+                            .values(view_count=Product.view_count + 1)
+                        )
+                        db.commit()
+                    writes += 1
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    with read_factory() as db:
+                        db.scalars(
+                            select(Product).where(Product.is_active == True)
+                            .order_by(Product.created_at.desc()).limit(20)
+                        ).all()
+                    reads += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            stats["reads"] += reads
+            stats["writes"] += writes
+            stats["errors"] += errors
+            stats["write_latency"].extend(latencies)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    for engine in engines:
+        engine.dispose()
+
+    latencies = sorted(stats["write_latency"]) or [0.0]
+    stats["p99_write_ms"] = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds}s, {args.write_ratio:.0%} writes")
+    print(f"{'mode':<8} {'reads/s':>9} {'writes/s':>9} {'errors':>7} {'p99 write ms':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("default", "profile"):
+            url = f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            seed(url, args.products)
+            stats = run(url, mode == "profile", args)
+            print(
+                f"{mode:<8} {stats['reads'] / args.seconds:>9.0f} {stats['writes'] / args.seconds:>9.0f} "
+                f"{stats['errors']:>7} {stats['p99_write_ms']:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-request auth overhead: JWT decode with and without the token cache
+
+Usage:
+    python benchmarks/bench_token_decode.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jose import jwt
+
+from app.config import settings
+from app.core.security import create_access_token, verify_access_token, token_cache, get_token_cache_stats
+
+
+def uncached_verify(token: str) -> dict:
+    """Previous behavior: full HMAC verification and JSON parse every time"""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("type") != "access":
+        raise ValueError("Invalid token type")
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct tokens presented in rotation")
+    args = parser.parse_args()
+
+    tokens = [create_access_token(data={"sub": str(i), "role": "customer"}) for i in range(args.tokens)]
+
+    def run(verify):
+        for i in range(args.iterations):
+            verify(tokens[i % len(tokens)])
+
+    token_cache.clear()
+    before = timeit.timeit(lambda: run(uncached_verify), number=1)
+    after = timeit.timeit(lambda: run(verify_access_token), number=1)
+
+    print(f"{'':<10} {'total s':>9} {'us/request':>11}")
+    print(f"{'uncached':<10} {before:>9.3f} {before / args.iterations * 1e6:>11.1f}")
+    print(f"{'cached':<10} {after:>9.3f} {after / args.iterations * 1e6:>11.1f}")
+    print(f"speedup: {before / after:.1f}x")
+    print(f"cache: {get_token_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
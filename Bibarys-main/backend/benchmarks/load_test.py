@@ -0,0 +1,418 @@
+"""
+End-to-end HTTP load test with scripted user scenarios
+
+Scenarios (virtual users per scenario with --users):
+  browse     anonymous product listing, product pages and search
+  shopper    login, add to cart, view cart, checkout
+  seller     login, poll seller stats, orders and products
+  admin      login, poll analytics dashboard, revenue, top products, categories
+  websocket  login, hold a notification websocket open and count messages
+
+By default the app runs in-process over httpx's ASGITransport (with its
+lifespan, and the login rate limit disabled so virtual users can log in).
+With --base-url the same scenarios hit a running server (uvicorn app.main:app);
+--database-url must then point at the server's database, which is only read
+to pick seeded accounts and products.
+
+Seed data first, e.g. python seed_data.py --profile small
+(accounts: <role><id>@seed.example.com / password123).
+
+Reports per-endpoint throughput, p50/p95/p99 latency and error rate, and
+writes a JSON result (with the git commit) that --compare can diff.
+
+Usage:
+    python benchmarks/load_test.py --seconds 30 --users browse=20,shopper=5,seller=2,admin=1,websocket=10
+    python benchmarks/load_test.py --base-url http://localhost:8000 --output results/run.json
+    python benchmarks/load_test.py --compare results/before.json --output results/after.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+SCENARIOS = ("browse", "shopper", "seller", "admin", "websocket")
+SEARCH_TERMS = ["milk", "bread", "juice", "cheese", "rice", "chocolate", "apples", "coffee", "fish", "pasta"]
+PASSWORD = "password123"
+
+
+class Results:
+    """Latencies and errors per endpoint label"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.messages = 0
+
+    def record(self, label: str, latency: float, status: str, ok: bool) -> None:
+        self.latencies[label].append(latency)
+        self.statuses[label][status] += 1
+        if not ok:
+            self.errors[label] += 1
+
+    def summary(self, seconds: float) -> Dict[str, dict]:
+        endpoints = {}
+        for label in sorted(self.latencies):
+            latencies = sorted(self.latencies[label])
+            count = len(latencies)
+            endpoints[label] = {
+                "count": count,
+                "rps": count / seconds,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "error_rate": self.errors[label] / count,
+                "statuses": dict(self.statuses[label]),
+            }
+        return endpoints
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+class Context:
+    """Shared state of one run"""
+
+    def __init__(self, client: httpx.AsyncClient, results: Results, deadline: float, args, fixtures: dict,
+                 websocket_factory):
+        self.client = client
+        self.results = results
+        self.deadline = deadline
+        self.args = args
+        self.fixtures = fixtures
+        self.websocket_factory = websocket_factory
+
+    @property
+    def running(self) -> bool:
+        return time.monotonic() < self.deadline
+
+    async def request(self, label: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.results.record(label, time.perf_counter() - start, type(e).__name__, False)
+            return None
+        self.results.record(label, time.perf_counter() - start, str(response.status_code),
+                            response.status_code in expected)
+        return response
+
+    async def login(self, email: str) -> Optional[dict]:
+        response = await self.request("POST /auth/login", "POST", "/api/v1/auth/login",
+                                      json={"email": email, "password": PASSWORD})
+        if response is None or response.status_code != 200:
+            return None
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def think(self) -> None:
+        await asyncio.sleep(random.uniform(0, self.args.think_time * 2))
+
+
+async def browse(ctx: Context, rng: random.Random) -> None:
+    product_ids = ctx.fixtures["product_ids"]
+    while ctx.running:
+        page = rng.randint(1, 20)
+        await ctx.request("GET /products", "GET", "/api/v1/products", params={"page": page, "page_size": 20})
+        await ctx.request("GET /products/{id}", "GET", f"/api/v1/products/{rng.choice(product_ids)}")
+        await ctx.request("GET /products/search", "GET", "/api/v1/products/search",
+                          params={"q": rng.choice(SEARCH_TERMS)})
+        await ctx.think()
+
+
+async def shopper(ctx: Context, rng: random.Random) -> None:
+    headers = await ctx.login(rng.choice(ctx.fixtures["customers"]))
+    if headers is None:
+        return
+    product_ids = ctx.fixtures["in_stock_ids"]
+    while ctx.running:
+        for product_id in rng.sample(product_ids, k=min(rng.randint(1, 3), len(product_ids))):
+            await ctx.request("POST /cart", "POST", "/api/v1/cart", expected=(201,), headers=headers,
+                              json={"product_id": product_id, "quantity": 1})
+        await ctx.request("GET /cart", "GET", "/api/v1/cart", headers=headers)
+        await ctx.request("POST /orders", "POST", "/api/v1/orders", expected=(201,), headers=headers, json={
+            "delivery_method": "standard", "delivery_address": "Almaty, load test street 1",
+            "phone": "+77010000000", "payment_method": "cash",
+        })
+        await ctx.think()
+
+
+async def seller(ctx: Context, rng: random.Random) -> None:
+    headers = await ctx.login(rng.choice(ctx.fixtures["sellers"]))
+    if headers is None:
+        return
+    while ctx.running:
+        await ctx.request("GET /seller/stats", "GET", "/api/v1/seller/stats", headers=headers)
+        await ctx.request("GET /seller/orders", "GET", "/api/v1/seller/orders", headers=headers)
+        await ctx.request("GET /seller/products", "GET", "/api/v1/seller/products", headers=headers)
+        await asyncio.sleep(ctx.args.poll_interval)
+
+
+async def admin(ctx: Context, rng: random.Random) -> None:
+    headers = await ctx.login(rng.choice(ctx.fixtures["admins"]))
+    if headers is None:
+        return
+    while ctx.running:
+        await ctx.request("GET /analytics/dashboard", "GET", "/api/v1/analytics/dashboard", headers=headers)
+        await ctx.request("GET /analytics/revenue", "GET", "/api/v1/analytics/revenue",
+                          params={"days": 30}, headers=headers)
+        await ctx.request("GET /analytics/top-products", "GET", "/api/v1/analytics/top-products", headers=headers)
+        await ctx.request("GET /analytics/categories", "GET", "/api/v1/analytics/categories", headers=headers)
+        await asyncio.sleep(ctx.args.poll_interval)
+
+
+async def websocket(ctx: Context, rng: random.Random) -> None:
+    headers = await ctx.login(rng.choice(ctx.fixtures["customers"]))
+    if headers is None:
+        return
+    token = headers["Authorization"].split()[1]
+    start = time.perf_counter()
+    try:
+        socket = await ctx.websocket_factory(f"/api/v1/ws/{token}")
+    except Exception as e:
+        ctx.results.record("WS connect", time.perf_counter() - start, type(e).__name__, False)
+        return
+    ctx.results.record("WS connect", time.perf_counter() - start, "101", True)
+    try:
+        while ctx.running:
+            try:
+                await asyncio.wait_for(socket.receive(), timeout=max(ctx.deadline - time.monotonic(), 0.01))
+                ctx.results.messages += 1
+            except asyncio.TimeoutError:
+                break
+    finally:
+        await socket.close()
+
+
+class ASGIWebSocket:
+    """Minimal in-process websocket client speaking ASGI to the app"""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self.to_app: asyncio.Queue = asyncio.Queue()
+        self.from_app: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> "ASGIWebSocket":
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": self.path,
+            "raw_path": self.path.encode(), "root_path": "", "query_string": b"", "headers": [],
+            "client": ("127.0.0.1", 0), "server": ("loadtest", 80), "subprotocols": [],
+        }
+        self.task = asyncio.create_task(self.app(scope, self.to_app.get, self.from_app.put))
+        await self.to_app.put({"type": "websocket.connect"})
+        message = await self.from_app.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"Websocket rejected: {message}")
+        return self
+
+    async def receive(self) -> dict:
+        message = await self.from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError("Websocket closed by server")
+        return message
+
+    async def close(self) -> None:
+        await self.to_app.put({"type": "websocket.disconnect", "code": 1000})
+        if self.task is not None:
+            await asyncio.wait([self.task], timeout=5)
+
+
+class RemoteWebSocket:
+    """Websocket to a running server"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.socket = None
+
+    async def connect(self) -> "RemoteWebSocket":
+        import websockets
+        self.socket = await websockets.connect(self.url)
+        return self
+
+    async def receive(self):
+        return await self.socket.recv()
+
+    async def close(self) -> None:
+        await self.socket.close()
+
+
+def load_fixtures(database_url: str) -> dict:
+    """Pick seeded accounts and products from the database"""
+    from sqlalchemy import create_engine, select
+    from app.core.constants import UserRole
+    from app.db.models import Product, User
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            def emails(role):
+                return list(conn.execute(
+                    select(User.email).where(User.role == role, User.is_active == True).limit(1000)
+                ).scalars())
+
+            fixtures = {
+                "customers": emails(UserRole.CUSTOMER),
+                "sellers": emails(UserRole.SELLER),
+                "admins": emails(UserRole.ADMIN),
+                "product_ids": list(conn.execute(
+                    select(Product.id).where(Product.is_active == True).limit(10000)
+                ).scalars()),
+                "in_stock_ids": list(conn.execute(
+                    select(Product.id).where(Product.is_active == True, Product.quantity > 100).limit(1000)
+                ).scalars()),
+            }
+    finally:
+        engine.dispose()
+    missing = [name for name, values in fixtures.items() if not values]
+    if missing:
+        raise SystemExit(f"No {', '.join(missing)} in {database_url}; run seed_data.py first")
+    return fixtures
+
+
+def parse_users(value: str) -> Dict[str, int]:
+    users = {}
+    for item in filter(None, value.split(",")):
+        name, _, count = item.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        users[name] = int(count)
+    return users
+
+
+async def run(args, fixtures: dict) -> dict:
+    scenarios = {"browse": browse, "shopper": shopper, "seller": seller, "admin": admin, "websocket": websocket}
+    results = Results()
+    limits = httpx.Limits(max_connections=args.connections)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+        ws_base = args.base_url.replace("http", "ws", 1)
+
+        async def websocket_factory(path):
+            return await RemoteWebSocket(ws_base + path).connect()
+        lifespan = None
+    else:
+        from app.main import app
+        from app.core.rate_limit import limiter
+        limiter.enabled = False
+        # Per-request app logging would dominate the console and the timings
+        logging.getLogger().setLevel(logging.WARNING)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout)
+
+        async def websocket_factory(path):
+            return await ASGIWebSocket(app, path).connect()
+        lifespan = app.router.lifespan_context(app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            start = time.monotonic()
+            ctx = Context(client, results, start + args.seconds, args, fixtures, websocket_factory)
+            tasks = [
+                scenarios[name](ctx, random.Random(f"{args.seed}:{name}:{i}"))
+                for name, count in args.users.items() for i in range(count)
+            ]
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - start
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    endpoints = results.summary(elapsed)
+    total = sum(e["count"] for e in endpoints.values())
+    errors = sum(results.errors.values())
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "target": args.base_url or "in-process",
+        "config": {"seconds": args.seconds, "users": args.users, "think_time": args.think_time,
+                   "poll_interval": args.poll_interval, "seed": args.seed},
+        "total": {"count": total, "rps": total / elapsed, "error_rate": errors / total if total else 0.0,
+                  "websocket_messages": results.messages},
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: dict, baseline: Optional[dict] = None) -> None:
+    print(f"\ncommit {result['commit']}, {result['target']}, {result['config']['seconds']}s, "
+          f"users {result['config']['users']}")
+    header = f"{'endpoint':<26} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    if baseline:
+        header += f" {'p95 vs base':>12} {'req/s vs base':>14}"
+    print(header)
+    for label, e in result["endpoints"].items():
+        line = (f"{label:<26} {e['count']:>7} {e['rps']:>8.1f} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+                f"{e['p99_ms']:>8.1f} {e['error_rate']:>7.1%}")
+        base = (baseline or {}).get("endpoints", {}).get(label)
+        if base:
+            line += f" {change(e['p95_ms'], base['p95_ms']):>12} {change(e['rps'], base['rps']):>14}"
+        print(line)
+    total = result["total"]
+    print(f"{'total':<26} {total['count']:>7} {total['rps']:>8.1f} {'':>8} {'':>8} {'':>8} {total['error_rate']:>7.1%}")
+    if total["websocket_messages"]:
+        print(f"websocket messages received: {total['websocket_messages']}")
+
+
+def change(value: float, base: float) -> str:
+    return f"{(value - base) / base:+.0%}" if base else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="Database to pick accounts and products from (default: app setting)")
+    parser.add_argument("--users", type=parse_users, default="browse=20,shopper=5,seller=2,admin=1,websocket=10")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--think-time", type=float, default=0.1, help="Mean pause between iterations")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seller/admin polling interval")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write JSON result to this path")
+    parser.add_argument("--compare", help="JSON result of a previous run to compare with")
+    args = parser.parse_args()
+
+    from app.config import settings
+    fixtures = load_fixtures(args.database_url or settings.DATABASE_URL)
+    result = asyncio.run(run(args, fixtures))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResult written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Token and response serialization benchmarks
+"""
+import pytest
+from sqlalchemy.orm import selectinload
+
+from app.core.security import create_access_token, decode_token, token_cache, verify_access_token
+from app.db.models import Order
+from app.schemas.order import OrderListResponse
+from app.schemas.product import ProductFilter, ProductListResponse
+from app.services.product_service import ProductService
+
+
+def test_create_access_token(benchmark):
+    token = benchmark(create_access_token, {"sub": "1", "role": "customer"})
+
+    assert token.count(".") == 2
+
+
+def test_verify_access_token_cached(benchmark):
+    token = create_access_token(data={"sub": "1", "role": "customer"})
+    verify_access_token(token)
+
+    payload = benchmark(verify_access_token, token)
+
+    assert payload["sub"] == "1"
+
+
+def test_decode_token_uncached(benchmark):
+    token = create_access_token(data={"sub": "1", "role": "customer"})
+
+    def decode():
+        token_cache.clear()
+        return decode_token(token)
+
+    payload = benchmark(decode)
+
+    assert payload["sub"] == "1"
+
+
+@pytest.mark.parametrize("page_size", [20, 100])
+def test_product_list_response(benchmark, db, page_size):
+    products, total = ProductService.get_products(db, ProductFilter(), 0, page_size)
+
+    def serialize():
+        return ProductListResponse(
+            items=products, total=total, page=1, page_size=page_size, total_pages=-(-total // page_size)
+        ).model_dump_json()
+
+    assert len(benchmark(serialize)) > 100
+
+
+@pytest.mark.parametrize("page_size", [20, 100])
+def test_order_list_response(benchmark, db, sample, page_size):
+    orders = (
+        db.query(Order)
+        .options(selectinload(Order.items), selectinload(Order.user))
+        .order_by(Order.created_at.desc())
+        .limit(page_size)
+        .all()
+    )
+
+    def serialize():
+        return OrderListResponse(
+            items=orders, total=len(orders), page=1, page_size=page_size, total_pages=1
+        ).model_dump_json()
+
+    assert len(benchmark(serialize)) > 100
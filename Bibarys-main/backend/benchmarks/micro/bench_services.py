@@ -0,0 +1,102 @@
+"""
+Service-layer benchmarks against the seeded database
+"""
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+
+from app.api.v1.cart import get_cart
+from app.api.v1.wishlist import get_wishlist
+from app.core.constants import OrderStatus, ProductCategory
+from app.db.models import CartItem, Order, Product
+from app.schemas.order import OrderCreate, OrderUpdate
+from app.schemas.product import ProductFilter
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
+from app.services.review_service import ReviewService
+
+PRODUCT_FILTERS = {
+    "default": {},
+    "category": {"category": ProductCategory.DAIRY},
+    "price_range": {"min_price": 2, "max_price": 10},
+    "search": {"search": "milk"},
+    "seller": {"seller_id": "seller"},
+    "all_filters": {"category": ProductCategory.DAIRY, "min_price": 1, "search": "fresh"},
+    "sort_price_asc": {"sort_by": "price", "sort_order": "asc"},
+    "sort_rating": {"sort_by": "rating"},
+    "sort_views": {"sort_by": "view_count"},
+    "sort_name_asc": {"sort_by": "name", "sort_order": "asc"},
+}
+
+
+@pytest.mark.parametrize("case", PRODUCT_FILTERS)
+def test_get_products(benchmark, db, sample, case):
+    params = dict(PRODUCT_FILTERS[case])
+    if params.get("seller_id") == "seller":
+        params["seller_id"] = sample["seller_id"]
+    filters = ProductFilter(**params)
+
+    products, total = benchmark(ProductService.get_products, db, filters, 0, 20)
+
+    assert total > 0 and products
+
+
+def test_get_products_deep_page(benchmark, db):
+    products, total = benchmark(ProductService.get_products, db, ProductFilter(), 5000, 20)
+
+    assert total > 5000 and products
+
+
+def test_get_product_reviews(benchmark, db, sample):
+    reviews, total, average = benchmark(ReviewService.get_product_reviews, db, sample["reviewed_product_id"])
+
+    assert total > 0 and 1 <= average <= 5
+
+
+def test_create_order_from_cart(benchmark, db, sample):
+    product_ids = sample["active_product_ids"][:3]
+    db.execute(update(Product).where(Product.id.in_(product_ids)).values(quantity=10_000_000))
+    db.commit()
+    user_id = sample["order_user_id"]
+    order_data = OrderCreate(delivery_method="standard", delivery_address="Almaty, benchmark street 1",
+                             phone="+77010000000", payment_method="cash")
+
+    def fill_cart():
+        db.add_all(CartItem(user_id=user_id, product_id=product_id, quantity=1) for product_id in product_ids)
+        db.commit()
+        return (db, order_data, user_id), {}
+
+    order = benchmark.pedantic(OrderService.create_order_from_cart, setup=fill_cart, rounds=200)
+
+    assert len(order.items) == len(product_ids)
+
+
+def test_update_order_status(benchmark, db, sample):
+    order_id = db.query(Order.id).filter(Order.status == OrderStatus.PROCESSING).order_by(Order.id).first()[0]
+    updates = itertools.cycle([OrderUpdate(status=OrderStatus.SHIPPED), OrderUpdate(status=OrderStatus.PROCESSING)])
+
+    def update_status():
+        return OrderService.update_order_status(db, order_id, next(updates), sample["admin_id"], is_admin=True)
+
+    order = benchmark(update_status)
+
+    assert order.status in (OrderStatus.SHIPPED, OrderStatus.PROCESSING)
+
+
+def test_get_cart(benchmark, async_db, sample):
+    session, loop = async_db
+    user = SimpleNamespace(id=sample["cart_user_id"])
+
+    cart = benchmark(lambda: loop.run_until_complete(get_cart(current_user=user, db=session)))
+
+    assert cart.items
+
+
+def test_get_wishlist(benchmark, db, sample):
+    user = SimpleNamespace(id=sample["wishlist_user_id"])
+
+    items = benchmark(get_wishlist, current_user=user, db=db)
+
+    assert items
@@ -0,0 +1,116 @@
+"""
+Microbenchmarks for service-layer hot paths (pytest-benchmark)
+
+Benchmarks run against a database generated by seed_data.py (the small
+profile by default) in a temporary directory, or an existing one with
+--seed-db.
+
+Usage:
+    python -m pytest benchmarks/micro
+    python -m pytest benchmarks/micro --seed-profile medium --seed-db /tmp/bench.db
+    python -m pytest benchmarks/micro -k get_products
+
+Regression mode: save a baseline, then fail any benchmark whose median is
+more than N% slower than the latest saved run:
+    python -m pytest benchmarks/micro --benchmark-autosave
+    python -m pytest benchmarks/micro --regression-threshold 10
+"""
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import seed_data
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("microbenchmarks")
+    group.addoption("--seed-profile", choices=sorted(seed_data.PROFILES), default="small",
+                    help="seed_data.py profile of the benchmark database")
+    group.addoption("--seed-db", help="Use (and seed if missing) this SQLite file instead of a temporary one")
+    group.addoption("--regression-threshold", type=float, metavar="PERCENT",
+                    help="Compare with the latest saved run and fail benchmarks slower by more than PERCENT")
+    group.addoption("--regression-stat", default="median", choices=["min", "max", "mean", "median"],
+                    help="Statistic compared by --regression-threshold")
+
+
+def pytest_configure(config):
+    # Options are missing when a run from the backend root only passes by this directory
+    threshold = config.getoption("regression_threshold", None)
+    if threshold is not None:
+        from pytest_benchmark.utils import parse_compare_fail
+        config.option.benchmark_compare = config.option.benchmark_compare or True
+        config.option.benchmark_compare_fail = (config.option.benchmark_compare_fail or []) + [
+            parse_compare_fail(f"{config.getoption('regression_stat')}:{threshold:g}%")
+        ]
+
+
+@pytest.fixture(scope="session")
+def seeded_path(request, tmp_path_factory):
+    """SQLite file with seed_data.py volumes"""
+    path = request.config.getoption("seed_db") or str(tmp_path_factory.mktemp("bench") / "bench.db")
+    if not os.path.exists(path):
+        engine = seed_data.create_seed_engine(f"sqlite:///{path}")
+        try:
+            volumes = seed_data.PROFILES[request.config.getoption("seed_profile")]
+            seed_data.Seeder(engine, 1, date(2025, 12, 31), 365, 5000, 1.1).run(
+                sellers=max(volumes["users"] // 50, 1), **volumes
+            )
+        finally:
+            engine.dispose()
+    return path
+
+
+@pytest.fixture(scope="session")
+def engine(seeded_path):
+    engine = seed_data.create_seed_engine(f"sqlite:///{seeded_path}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def async_db(seeded_path):
+    """AsyncSession and an event loop to drive it from sync benchmarks"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{seeded_path}")
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    loop = asyncio.new_event_loop()
+    yield session, loop
+    loop.run_until_complete(session.close())
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def sample(engine):
+    """Ids of representative rows: busiest customer, seller and product"""
+    with engine.connect() as conn:
+        def scalar(sql):
+            return conn.execute(text(sql)).scalar()
+
+        return {
+            "admin_id": scalar("SELECT id FROM users WHERE role = 'ADMIN' ORDER BY id LIMIT 1"),
+            "seller_id": scalar("SELECT seller_id FROM products GROUP BY seller_id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "cart_user_id": scalar("SELECT user_id FROM cart_items GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "wishlist_user_id": scalar("SELECT user_id FROM wishlist GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "order_user_id": scalar("SELECT user_id FROM orders GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1"),
+            "reviewed_product_id": scalar(
+                "SELECT product_id FROM reviews GROUP BY product_id ORDER BY COUNT(*) DESC LIMIT 1"
+            ),
+            "active_product_ids": [row[0] for row in conn.execute(text(
+                "SELECT id FROM products WHERE is_active ORDER BY id LIMIT 50"
+            ))],
+        }
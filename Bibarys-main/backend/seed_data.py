@@ -0,0 +1,490 @@
+"""
+Generate a large synthetic dataset for load tests and benchmarks
+
+Non-interactive and deterministic: the same --seed and volumes produce the
+same rows (dates are relative to --end-date, so pin it for identical runs).
+
+- Product popularity is Zipfian: a few products get most orders, reviews,
+  carts and wishlists
+- Order dates follow a yearly season (December peak, late-summer low),
+  busier weekends and evening hours
+- Rows are written with bulk insert() in executemany batches; ids are
+  assigned here, so new rows are appended after existing ones
+
+Every account's password is "password123"; the first new user is an admin.
+
+Usage:
+    python seed_data.py --profile small
+    python seed_data.py --profile large --database-url sqlite:///./load.db
+    python seed_data.py --users 5000 --products 20000 --order-items 200000 --seed 7
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.constants import (
+    DELIVERY_COSTS, DeliveryMethod, OrderStatus, PaymentMethod, PaymentStatus, ProductCategory, UserRole
+)
+from app.core.security import hash_password
+from app.db.base import Base
+from app.db.models import (
+    CartItem, Order, OrderItem, Payment, Product, Review, Transaction, User, Wishlist
+)
+from app.db.session import _is_sqlite_file, configure_sqlite
+
+PROFILES = {
+    "small": dict(users=1_000, products=10_000, order_items=100_000, reviews=20_000,
+                  cart_items=3_000, wishlist_items=5_000, transactions=10_000),
+    "medium": dict(users=10_000, products=100_000, order_items=1_000_000, reviews=200_000,
+                   cart_items=30_000, wishlist_items=50_000, transactions=100_000),
+    "large": dict(users=100_000, products=1_000_000, order_items=10_000_000, reviews=2_000_000,
+                  cart_items=300_000, wishlist_items=500_000, transactions=1_000_000),
+}
+
+# Base price range and name words per category
+CATALOG = {
+    ProductCategory.DAIRY: ((0.8, 12), ["Milk", "Kefir", "Yogurt", "Cheese", "Butter", "Cream"]),
+    ProductCategory.BAKERY: ((0.5, 8), ["Bread", "Baguette", "Croissant", "Bun", "Cake", "Pie"]),
+    ProductCategory.BEVERAGES: ((0.6, 25), ["Juice", "Water", "Tea", "Coffee", "Lemonade", "Kompot"]),
+    ProductCategory.MEAT: ((3, 40), ["Beef", "Chicken", "Sausage", "Ham", "Lamb", "Turkey"]),
+    ProductCategory.FRUITS_VEGETABLES: ((0.4, 10), ["Apples", "Tomatoes", "Potatoes", "Bananas", "Carrots", "Onions"]),
+    ProductCategory.FROZEN: ((1.5, 20), ["Dumplings", "Pizza", "Ice Cream", "Berries", "Fish", "Vegetables"]),
+    ProductCategory.GROCERY: ((0.7, 15), ["Rice", "Buckwheat", "Pasta", "Flour", "Sugar", "Oil"]),
+    ProductCategory.SWEETS: ((0.5, 18), ["Chocolate", "Cookies", "Candy", "Chips", "Wafers", "Marshmallow"]),
+    ProductCategory.CANNED: ((0.9, 12), ["Beans", "Corn", "Tuna", "Peas", "Stew", "Olives"]),
+    ProductCategory.OTHER: ((0.5, 30), ["Napkins", "Soap", "Batteries", "Candles", "Bags", "Foil"]),
+}
+ADJECTIVES = ["Fresh", "Organic", "Classic", "Farm", "Premium", "Homemade", "Daily", "Family", "Select", "Natural"]
+CITIES = ["Almaty", "Astana", "Shymkent", "Karaganda", "Aktobe", "Taraz", "Pavlodar", "Oskemen"]
+FIRST_NAMES = ["Aigerim", "Almas", "Dana", "Arman", "Madina", "Nursultan", "Aruzhan", "Yerlan", "Zarina", "Timur"]
+LAST_NAMES = ["Akhmetov", "Bekova", "Nurlanov", "Sadykova", "Omarov", "Zhumabayeva", "Kassymov", "Iskakova"]
+# Orders per hour of day (relative)
+HOUR_WEIGHTS = [1, 0.5, 0.3, 0.2, 0.2, 0.4, 1, 2, 3, 4, 4.5, 5, 5.5, 5, 4.5, 4.5, 5, 6, 7.5, 8.5, 8, 6.5, 4, 2]
+RATING_WEIGHTS = [10, 8, 12, 25, 45]  # 1..5 stars
+PASSWORD = "password123"
+
+
+def rng_for(seed: int, stream: str) -> random.Random:
+    """Independent generator per table, so changing one volume does not reshuffle the others"""
+    return random.Random(f"{seed}:{stream}")
+
+
+class Zipf:
+    """Draw items with probability proportional to 1 / rank**s; ranks are shuffled over the items"""
+
+    def __init__(self, items: List[int], s: float, rng: random.Random):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(itertools.accumulate(1 / (rank ** s) for rank in range(1, len(self.items) + 1)))
+        self.rng = rng
+
+    def sample(self, k: int) -> List[int]:
+        return self.rng.choices(self.items, cum_weights=self.cum_weights, k=k)
+
+
+class SeasonalDates:
+    """Timestamps over the last `days` days with yearly, weekly and daily seasonality plus growth"""
+
+    def __init__(self, end: date, days: int, rng: random.Random):
+        self.start = datetime.combine(end - timedelta(days=days - 1), datetime.min.time())
+        weights = []
+        for offset in range(days):
+            day = self.start + timedelta(days=offset)
+            yearly = 1 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 355) / 365)
+            weekly = 1.25 if day.weekday() >= 5 else 1.0
+            growth = 0.6 + 0.4 * offset / max(days - 1, 1)
+            weights.append(yearly * weekly * growth)
+        self.days = list(range(days))
+        self.day_weights = list(itertools.accumulate(weights))
+        self.hours = list(range(24))
+        self.hour_weights = list(itertools.accumulate(HOUR_WEIGHTS))
+        self.rng = rng
+
+    def sample(self, k: int) -> List[datetime]:
+        days = self.rng.choices(self.days, cum_weights=self.day_weights, k=k)
+        hours = self.rng.choices(self.hours, cum_weights=self.hour_weights, k=k)
+        return sorted(
+            self.start + timedelta(days=day, hours=hour, seconds=self.rng.randrange(3600))
+            for day, hour in zip(days, hours)
+        )
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def bulk_insert(engine: Engine, model, rows: Iterable[dict], batch_size: int) -> int:
+    """Insert rows with executemany, one transaction per batch"""
+    start = time.perf_counter()
+    total = 0
+    for batch in batched(rows, batch_size):
+        with engine.begin() as conn:
+            conn.execute(insert(model), batch)
+        total += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"  {model.__tablename__:<15} {total:>11,} rows {elapsed:>8.1f}s {total / elapsed if elapsed else 0:>10,.0f} rows/s")
+    return total
+
+
+def next_id(engine: Engine, model) -> int:
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+class Seeder:
+    """Generates all tables from one seed"""
+
+    def __init__(self, engine: Engine, seed: int, end_date: date, days: int, batch_size: int, zipf_s: float):
+        self.engine = engine
+        self.seed = seed
+        self.end_date = end_date
+        self.days = days
+        self.batch_size = batch_size
+        self.zipf_s = zipf_s
+        self.now = datetime.combine(end_date, datetime.min.time()) + timedelta(hours=23)
+
+    def insert(self, model, rows: Iterable[dict]) -> int:
+        return bulk_insert(self.engine, model, rows, self.batch_size)
+
+    def run(self, users: int, products: int, order_items: int, reviews: int,
+            cart_items: int, wishlist_items: int, transactions: int, sellers: int) -> Dict[str, int]:
+        if users < 3:
+            raise ValueError("At least 3 users are needed (admin, seller, customer)")
+        counts = {}
+        counts["users"] = self.insert(User, self.users(users, sellers))
+        counts["products"] = self.insert(Product, self.products(products))
+        popularity = Zipf(self.product_ids, self.zipf_s, rng_for(self.seed, "popularity"))
+
+        counts.update(self.insert_orders(order_items, popularity))
+        counts["reviews"] = self.insert(Review, self.reviews(reviews, popularity))
+        counts["cart_items"] = self.insert(CartItem, self.pairs(CartItem, cart_items, popularity, "cart"))
+        counts["wishlist"] = self.insert(Wishlist, self.pairs(Wishlist, wishlist_items, popularity, "wishlist"))
+        counts["transactions"] = self.insert(Transaction, self.transactions(transactions))
+        self.update_aggregates()
+        return counts
+
+    def users(self, count: int, sellers: int) -> Iterator[dict]:
+        rng = rng_for(self.seed, "users")
+        first_id = next_id(self.engine, User)
+        password_hash = hash_password(PASSWORD)
+        sellers = min(max(sellers, 1), max(count - 1, 1))
+        self.seller_ids = list(range(first_id + 1, first_id + 1 + sellers))
+        self.customer_ids = list(range(first_id + 1 + sellers, first_id + count)) or self.seller_ids
+        joined = SeasonalDates(self.end_date, self.days, rng).sample(count)
+        for i, created_at in zip(range(count), joined):
+            user_id = first_id + i
+            role = UserRole.ADMIN if i == 0 else UserRole.SELLER if i <= sellers else UserRole.CUSTOMER
+            yield {
+                "id": user_id,
+                "email": f"{role.value}{user_id}@seed.example.com",
+                "password_hash": password_hash,
+                "role": role,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "phone": f"+7700{rng.randrange(10 ** 7):07d}",
+                "is_active": rng.random() > 0.01,
+                "is_verified": rng.random() > 0.1,
+                "balance": 0.0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def products(self, count: int) -> Iterator[dict]:
+        rng = rng_for(self.seed, "products")
+        first_id = next_id(self.engine, Product)
+        categories = list(CATALOG)
+        # Some categories have far more products than others
+        category_weights = list(itertools.accumulate(1 / (rank ** 0.7) for rank in range(1, len(categories) + 1)))
+        seller_picker = Zipf(self.seller_ids, 1.0, rng_for(self.seed, "sellers"))
+        self.product_ids = list(range(first_id, first_id + count))
+        # Indexed by product id - first id
+        self.product_prices: List[float] = []
+        self.product_sellers: List[int] = []
+        sellers = seller_picker.sample(count)
+        for product_id, seller_id in zip(self.product_ids, sellers):
+            category = rng.choices(categories, cum_weights=category_weights)[0]
+            (low, high), words = CATALOG[category]
+            # Log-uniform: cheap items are more common than expensive ones
+            price = round(math.exp(rng.uniform(math.log(low), math.log(high))), 2)
+            created_at = self.now - timedelta(days=rng.randrange(self.days * 2), seconds=rng.randrange(86400))
+            self.product_prices.append(price)
+            self.product_sellers.append(seller_id)
+            yield {
+                "id": product_id,
+                "name": f"{rng.choice(ADJECTIVES)} {rng.choice(words)} {product_id}",
+                "description": f"{category.value.replace('_', ' ').title()} item from seller {seller_id}",
+                "price": price,
+                "quantity": 0 if rng.random() < 0.05 else rng.randrange(1, 500),
+                "category": category,
+                "seller_id": seller_id,
+                "image_urls": [],
+                "rating": 0.0,
+                "review_count": 0,
+                "is_active": rng.random() > 0.03,
+                "view_count": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def insert_orders(self, item_count: int, popularity: Zipf) -> Dict[str, int]:
+        """Insert orders with their items and payments, one transaction per batch"""
+        start = time.perf_counter()
+        counts = {"orders": 0, "order_items": 0, "payments": 0}
+        for orders, items, payments in self.order_batches(item_count, popularity):
+            with self.engine.begin() as conn:
+                conn.execute(insert(Order), orders)
+                conn.execute(insert(OrderItem), items)
+                conn.execute(insert(Payment), payments)
+            counts["orders"] += len(orders)
+            counts["order_items"] += len(items)
+            counts["payments"] += len(payments)
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        print(
+            f"  {'orders':<15} {total:>11,} rows {elapsed:>8.1f}s {total / elapsed if elapsed else 0:>10,.0f} rows/s "
+            f"({counts['orders']:,} orders, {counts['order_items']:,} items, {counts['payments']:,} payments)"
+        )
+        return counts
+
+    def order_batches(self, item_count: int, popularity: Zipf) -> Iterator[Tuple[List[dict], List[dict], List[dict]]]:
+        """Yield (orders, order items, payments) in batches of about `batch_size` items"""
+        rng = rng_for(self.seed, "orders")
+        order_id = next_id(self.engine, Order)
+        item_id = next_id(self.engine, OrderItem)
+        payment_id = next_id(self.engine, Payment)
+        buyers = Zipf(self.customer_ids, 0.8, rng_for(self.seed, "buyers"))
+        methods = list(DeliveryMethod)
+        # Items per order: 1..8, mean about 3
+        sizes = [1, 2, 3, 4, 5, 6, 7, 8]
+        size_weights = list(itertools.accumulate([22, 22, 18, 13, 10, 7, 5, 3]))
+        order_sizes = []
+        remaining = item_count
+        while remaining > 0:
+            size = min(rng.choices(sizes, cum_weights=size_weights)[0], remaining)
+            order_sizes.append(size)
+            remaining -= size
+        dates = SeasonalDates(self.end_date, self.days, rng).sample(len(order_sizes))
+        user_ids = buyers.sample(len(order_sizes))
+
+        order_rows: List[dict] = []
+        item_rows: List[dict] = []
+        payment_rows: List[dict] = []
+        for size, created_at, user_id in zip(order_sizes, dates, user_ids):
+            product_ids = popularity.sample(size)
+            subtotal = 0.0
+            for product_id in product_ids:
+                quantity = rng.choices([1, 2, 3, 4], cum_weights=[70, 88, 96, 100])[0]
+                price = self.product_prices[product_id - self.product_ids[0]]
+                subtotal += price * quantity
+                item_rows.append({
+                    "id": item_id,
+                    "order_id": order_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "price_at_purchase": price,
+                    "seller_id": self.product_sellers[product_id - self.product_ids[0]],
+                    "is_delivered": (self.now - created_at).days > 7,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+                item_id += 1
+
+            status = self._order_status(rng, (self.now - created_at).days)
+            method = rng.choices(methods, cum_weights=[70, 85, 100])[0]
+            delivery_cost = DELIVERY_COSTS[method]
+            total = round(subtotal + delivery_cost, 2)
+            order_rows.append({
+                "id": order_id,
+                "user_id": user_id,
+                "status": status,
+                "total_price": total,
+                "delivery_method": method.value,
+                "delivery_cost": delivery_cost,
+                "delivery_address": f"{rng.choice(CITIES)}, street {rng.randrange(1, 300)}, {rng.randrange(1, 200)}",
+                "phone": f"+7701{rng.randrange(10 ** 7):07d}",
+                "notes": None,
+                "tracking_number": f"TRK-SEED{order_id:010d}",
+                "estimated_delivery": (created_at + timedelta(days=5 if method != DeliveryMethod.EXPRESS else 2)).strftime("%Y-%m-%d"),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            payment_rows.append({
+                "id": payment_id,
+                "order_id": order_id,
+                "amount": total,
+                "method": rng.choices(list(PaymentMethod), cum_weights=[60, 80, 100])[0],
+                "status": (PaymentStatus.FAILED if status == OrderStatus.CANCELLED
+                           else PaymentStatus.PENDING if status == OrderStatus.PENDING
+                           else PaymentStatus.SUCCESS),
+                "transaction_id": f"seed_{payment_id}",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            order_id += 1
+            payment_id += 1
+            if len(item_rows) >= self.batch_size:
+                yield order_rows, item_rows, payment_rows
+                order_rows, item_rows, payment_rows = [], [], []
+        if order_rows:
+            yield order_rows, item_rows, payment_rows
+
+    @staticmethod
+    def _order_status(rng: random.Random, age_days: int) -> OrderStatus:
+        if rng.random() < 0.05:
+            return OrderStatus.CANCELLED
+        if age_days > 10:
+            return OrderStatus.DELIVERED
+        if age_days > 3:
+            return rng.choice([OrderStatus.SHIPPED, OrderStatus.DELIVERED])
+        return rng.choice([OrderStatus.PENDING, OrderStatus.PROCESSING, OrderStatus.SHIPPED])
+
+    def reviews(self, count: int, popularity: Zipf) -> Iterator[dict]:
+        rng = rng_for(self.seed, "reviews")
+        first_id = next_id(self.engine, Review)
+        dates = SeasonalDates(self.end_date, self.days, rng).sample(count)
+        product_ids = popularity.sample(count)
+        for i, (product_id, created_at) in enumerate(zip(product_ids, dates)):
+            rating = rng.choices([1, 2, 3, 4, 5], cum_weights=list(itertools.accumulate(RATING_WEIGHTS)))[0]
+            yield {
+                "id": first_id + i,
+                "product_id": product_id,
+                "user_id": rng.choice(self.customer_ids),
+                "rating": rating,
+                "title": ["Terrible", "Poor", "Okay", "Good", "Excellent"][rating - 1],
+                "text": None if rng.random() < 0.4 else f"Review of product {product_id}: {rating} stars",
+                "images": [],
+                "helpful_count": int(rng.paretovariate(2)) - 1,
+                "verified_purchase": rng.random() < 0.7,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def pairs(self, model, count: int, popularity: Zipf, stream: str) -> Iterator[dict]:
+        """Cart or wishlist rows: unique (user, product) pairs"""
+        rng = rng_for(self.seed, stream)
+        first_id = next_id(self.engine, model)
+        seen = set()
+        # Duplicate pairs are redrawn; give up on tiny catalogs that cannot fit `count`
+        for _ in range(count * 3):
+            if len(seen) >= count:
+                break
+            product_id = popularity.sample(1)[0]
+            user_id = rng.choice(self.customer_ids)
+            if (user_id, product_id) in seen:
+                continue
+            seen.add((user_id, product_id))
+            created_at = self.now - timedelta(days=rng.randrange(60), seconds=rng.randrange(86400))
+            row = {
+                "id": first_id + len(seen) - 1,
+                "user_id": user_id,
+                "product_id": product_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            if model is CartItem:
+                row["quantity"] = rng.choices([1, 2, 3], cum_weights=[75, 93, 100])[0]
+            yield row
+
+    def transactions(self, count: int) -> Iterator[dict]:
+        """Deposits and purchases with a running balance per user"""
+        rng = rng_for(self.seed, "transactions")
+        first_id = next_id(self.engine, Transaction)
+        balances: Dict[int, float] = {}
+        dates = SeasonalDates(self.end_date, self.days, rng).sample(count)
+        for i, created_at in enumerate(dates):
+            user_id = rng.choice(self.customer_ids)
+            balance = balances.get(user_id, 0.0)
+            if balance < 20 or rng.random() < 0.35:
+                amount = float(rng.choice([10, 20, 50, 100, 200]))
+                kind, description = "deposit", "Wallet top-up"
+            else:
+                amount = -round(rng.uniform(1, balance), 2)
+                kind, description = "purchase", "Order payment"
+            balance = round(balance + amount, 2)
+            balances[user_id] = balance
+            yield {
+                "id": first_id + i,
+                "user_id": user_id,
+                "amount": amount,
+                "type": kind,
+                "description": description,
+                "balance_after": balance,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def update_aggregates(self) -> None:
+        """Set product rating / review count and user balances from the inserted rows"""
+        start = time.perf_counter()
+        # UPDATE ... FROM a grouped subquery: one pass per table instead of a lookup per row
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE products SET rating = r.rating, review_count = r.review_count FROM ("
+                "SELECT product_id, ROUND(AVG(rating), 2) AS rating, COUNT(*) AS review_count "
+                "FROM reviews GROUP BY product_id) AS r WHERE r.product_id = products.id"
+            ))
+            conn.execute(text(
+                "UPDATE products SET view_count = o.views FROM ("
+                "SELECT product_id, COUNT(*) * 7 AS views FROM order_items GROUP BY product_id"
+                ") AS o WHERE o.product_id = products.id"
+            ))
+            conn.execute(text(
+                "UPDATE users SET balance = t.balance_after FROM ("
+                "SELECT user_id, balance_after FROM transactions "
+                "WHERE id IN (SELECT MAX(id) FROM transactions GROUP BY user_id)"
+                ") AS t WHERE t.user_id = users.id"
+            ))
+        print(f"  {'aggregates':<15} {'':>11} {'':>4} {time.perf_counter() - start:>8.1f}s")
+
+
+def create_seed_engine(url: str) -> Engine:
+    engine = create_engine(url, connect_args={"check_same_thread": False} if "sqlite" in url else {})
+    if _is_sqlite_file(url):
+        configure_sqlite(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    for name in PROFILES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"Override {name} volume of the profile")
+    parser.add_argument("--sellers", type=int, help="Seller accounts (default 2%% of users)")
+    parser.add_argument("--days", type=int, default=365, help="Days of order history")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Last day of history, YYYY-MM-DD (pin for reproducible runs)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of product popularity")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    volumes = {name: getattr(args, name) or default for name, default in PROFILES[args.profile].items()}
+    sellers = args.sellers or max(volumes["users"] // 50, 1)
+    print(f"Seeding {args.database_url} (seed {args.seed}, profile {args.profile})")
+    engine = create_seed_engine(args.database_url)
+    start = time.perf_counter()
+    try:
+        Seeder(engine, args.seed, args.end_date, args.days, args.batch_size, args.zipf).run(sellers=sellers, **volumes)
+    finally:
+        engine.dispose()
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
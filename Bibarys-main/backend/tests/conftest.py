@@ -3,15 +3,21 @@ Test configuration and fixtures
 """
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.config import settings
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, get_async_db, get_async_read_db
 from app.db.models import User, Product
 from app.core.security import hash_password
 from app.core.constants import UserRole, ProductCategory
+from app.services.user_service import principal_cache, missing_user_cache
+from app.services.product_service import missing_product_cache
+from app.core.response_cache import response_cache
 
 
 # Test database setup
@@ -19,11 +25,20 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same file for async routes; TestClient may run each request on a new event loop, so no pooling
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="function")
 def test_db():
     """Create test database and tables"""
     Base.metadata.create_all(bind=engine)
+    # User IDs are reused between tests, so cached principals must not survive
+    principal_cache.clear()
+    missing_user_cache.clear()
+    missing_product_cache.clear()
+    response_cache.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -45,7 +60,14 @@ def client(test_db):
     original_enabled = app.state.limiter.enabled
     app.state.limiter.enabled = False
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     
     test_client = TestClient(app)
     yield test_client
@@ -56,6 +78,26 @@ def client(test_db):
     app.state.limiter.enabled = original_enabled
 
 
+@pytest.fixture
+def query_budget(monkeypatch):
+    """
+    Assert the number of SQL statements a request ran
+    
+    Usage: query_budget(client.get(...), 3)
+    """
+    monkeypatch.setattr(settings, "DB_QUERY_HEADERS", True)
+    
+    def check(response, max_queries: int):
+        queries = int(response.headers["X-DB-Queries"])
+        assert queries <= max_queries, (
+            f"{response.request.method} {response.request.url.path} ran {queries} queries "
+            f"(budget {max_queries}, {response.headers['X-DB-Time']})"
+        )
+        return queries
+    
+    return check
+
+
 @pytest.fixture
 def test_user(test_db):
     """Create test user"""
@@ -0,0 +1,86 @@
+"""
+Tests for the access log middleware and queued logging
+"""
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi.responses import StreamingResponse
+
+from app.core.access_log import AccessLogMiddleware, start_queue_logging, stop_queue_logging
+
+
+def make_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, **options)
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    @app.get("/fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]))
+
+    return app
+
+
+def test_logs_one_line_and_sets_process_time(client, caplog):
+    """Test the app's access log line and X-Process-Time header"""
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        response = client.get("/health")
+
+    assert float(response.headers["X-Process-Time"]) > 0
+    records = [r for r in caplog.records if r.name == "app.access"]
+    assert len(records) == 1
+    assert '"GET /health" 200' in records[0].getMessage()
+
+
+def test_sampling_keeps_errors_and_slow_requests(caplog):
+    """Test that sampled-out requests are skipped unless failed or slow"""
+    client = TestClient(make_app(sample_rate=0.0, slow_ms=None), raise_server_exceptions=False)
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        client.get("/ok")
+        client.get("/fail")
+    messages = [r.getMessage() for r in caplog.records if r.name == "app.access"]
+    assert len(messages) == 1 and '"GET /fail" 500' in messages[0]
+
+    caplog.clear()
+    client = TestClient(make_app(sample_rate=0.0, slow_ms=0))
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        client.get("/ok")
+    assert any('"GET /ok" 200' in r.getMessage() for r in caplog.records)
+
+
+def test_streaming_response_passes_through():
+    """Test that streamed bodies are not buffered or broken"""
+    response = TestClient(make_app()).get("/stream")
+    assert response.content == b"abc"
+    assert "X-Process-Time" in response.headers
+
+
+def test_queue_logging_delivers_records_on_stop():
+    """Test that records reach the original handlers through the queue"""
+    logger = logging.getLogger("tests.queued")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    handler = ListHandler()
+    logger.addHandler(handler)
+    listener = start_queue_logging(logger)
+    assert handler not in logger.handlers
+    logger.info("queued %d", 1)
+    stop_queue_logging(listener, logger)
+
+    assert records == ["queued 1"]
+    assert logger.handlers == [handler]
+    logger.removeHandler(handler)
@@ -0,0 +1,82 @@
+"""
+Tests for routes served from the async database session
+"""
+import pytest
+
+from app.core.constants import ProductCategory, UserRole
+from app.core.security import create_access_token
+from app.db.models import CartItem, Order, OrderItem, Product
+from app.db.session import get_async_database_url
+
+
+def auth_headers(user_id):
+    token = create_access_token(data={"sub": str(user_id), "role": UserRole.CUSTOMER.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def products(test_db, test_seller):
+    """Create a few active products"""
+    items = [
+        Product(name=f"Milk {i}", description="Fresh milk", price=1.5 + i, quantity=10,
+                category=ProductCategory.DAIRY, seller_id=test_seller.id, image_urls=[f"/img/{i}.jpg"])
+        for i in range(3)
+    ]
+    test_db.add_all(items)
+    test_db.commit()
+    return [p.id for p in items]
+
+
+def test_async_database_url_mapping():
+    """Test that sync URLs map to their async drivers"""
+    assert get_async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert get_async_database_url("postgresql://u:p@db:5432/shop") == "postgresql+asyncpg://u:p@db:5432/shop"
+    with pytest.raises(ValueError):
+        get_async_database_url("mysql://u:p@db/shop")
+
+
+def test_get_products_async(client, products):
+    """Test product listing with filters and pagination"""
+    response = client.get("/api/v1/products", params={"sort_by": "price", "sort_order": "asc", "page_size": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["total_pages"] == 2
+    assert [item["name"] for item in data["items"]] == ["Milk 0", "Milk 1"]
+
+    response = client.get("/api/v1/products", params={"min_price": 2})
+    assert response.json()["total"] == 2
+
+
+def test_get_cart_async(client, test_db, test_user, products):
+    """Test cart totals computed from the joined cart query"""
+    user_id = test_user.id
+    test_db.add_all([
+        CartItem(user_id=user_id, product_id=products[0], quantity=2),
+        CartItem(user_id=user_id, product_id=products[2], quantity=1),
+    ])
+    test_db.commit()
+
+    response = client.get("/api/v1/cart", headers=auth_headers(user_id))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_items"] == 3
+    assert data["total_price"] == pytest.approx(2 * 1.5 + 3.5)
+    assert data["items"][0]["product_image"] == "/img/0.jpg"
+
+
+def test_get_orders_async(client, test_db, test_user, test_seller, products):
+    """Test order list includes eagerly loaded items and user"""
+    user_id = test_user.id
+    order = Order(user_id=user_id, total_price=5.0, delivery_method="pickup", delivery_cost=0.0,
+                  delivery_address="Main street 1", phone="12345")
+    order.items = [OrderItem(product_id=products[0], quantity=2, price_at_purchase=1.5, seller_id=test_seller.id)]
+    test_db.add(order)
+    test_db.commit()
+
+    response = client.get("/api/v1/orders", headers=auth_headers(user_id))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["user"]["email"] == "test@example.com"
+    assert data["items"][0]["items"][0]["quantity"] == 2
@@ -0,0 +1,140 @@
+"""
+Tests for the authenticated-user principal cache
+"""
+import time
+
+import pytest
+
+from app.api.v1 import CurrentUser
+from app.core.cache import ExpiringSet
+from app.core.constants import UserRole
+from app.core.security import create_access_token, hash_password
+from app.db.models import User
+from app.services.user_service import UserPrincipal, principal_cache
+
+
+def auth_headers(user):
+    token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_admin(test_db):
+    """Create test admin"""
+    admin = User(
+        email="admin@example.com",
+        password_hash=hash_password("adminpassword"),
+        first_name="Test",
+        last_name="Admin",
+        role=UserRole.ADMIN,
+        is_active=True,
+        is_verified=True
+    )
+    test_db.add(admin)
+    test_db.commit()
+    test_db.refresh(admin)
+    return admin
+
+
+def test_principal_is_cached(client, test_user):
+    """Test that repeated requests reuse the cached principal"""
+    headers = auth_headers(test_user)
+
+    assert client.get("/api/v1/cart", headers=headers).status_code == 200
+    hits = principal_cache.hits
+    assert client.get("/api/v1/cart", headers=headers).status_code == 200
+    assert principal_cache.hits == hits + 1
+
+
+def test_profile_loads_full_user(client, test_user):
+    """Test that endpoints needing the full row still get it"""
+    response = client.get("/api/v1/auth/me", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["email"] == test_user.email
+    assert data["is_verified"] is True
+
+
+def test_principal_has_no_lazy_columns(client, test_seller):
+    """Test that non-principal columns are never loaded behind an attribute read"""
+    current = CurrentUser(UserPrincipal(
+        id=test_seller.id, email=test_seller.email, role=test_seller.role,
+        first_name=test_seller.first_name, last_name=test_seller.last_name, is_active=True,
+    ), None)
+    with pytest.raises(AttributeError):
+        current.balance
+
+    # The seller report reads the balance itself
+    response = client.get("/api/v1/seller/export-pdf", headers=auth_headers(test_seller))
+    assert response.status_code == 200
+
+
+def test_toggle_active_invalidates_principal(client, test_user, test_admin):
+    """Test that deactivating a user takes effect immediately"""
+    headers = auth_headers(test_user)
+    assert client.get("/api/v1/cart", headers=headers).status_code == 200
+
+    response = client.patch(
+        f"/api/v1/admin/users/{test_user.id}/toggle-active",
+        headers=auth_headers(test_admin)
+    )
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+
+    assert client.get("/api/v1/cart", headers=headers).status_code == 401
+
+
+def test_admin_update_invalidates_principal(client, test_user, test_admin):
+    """Test that role changes by an admin are visible on the next request"""
+    headers = auth_headers(test_user)
+    assert client.get("/api/v1/admin/users", headers=headers).status_code == 403
+
+    response = client.put(
+        f"/api/v1/admin/users/{test_user.id}",
+        json={"role": "admin"},
+        headers=auth_headers(test_admin)
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/v1/admin/users", headers=headers).status_code == 200
+
+
+def test_decoded_token_is_cached_until_expiry():
+    """Test that verified tokens are reused and dropped at their exp"""
+    import time
+    from datetime import timedelta
+    from app.core.exceptions import UnauthorizedException
+    from app.core.security import verify_access_token, token_cache
+
+    token = create_access_token(data={"sub": "1"}, expires_delta=timedelta(seconds=1))
+    verify_access_token(token)
+    hits = token_cache.hits
+    assert verify_access_token(token)["sub"] == "1"
+    assert token_cache.hits == hits + 1
+
+    time.sleep(2.1)
+    with pytest.raises(UnauthorizedException):
+        verify_access_token(token)
+
+
+def test_logout_revokes_token(client, test_user):
+    """Test that a logged-out token is rejected even though it is cached"""
+    headers = auth_headers(test_user)
+    assert client.get("/api/v1/cart", headers=headers).status_code == 200
+
+    assert client.get("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/cart", headers=headers).status_code == 401
+
+
+def test_revocations_are_not_evicted_by_size():
+    """Test that revoked tokens are only forgotten once they expire, however many there are"""
+    revoked = ExpiringSet()
+    revoked.add("oldest", ttl=60)
+    for i in range(20000):
+        revoked.add(f"token-{i}", ttl=0.05)
+    assert "oldest" in revoked
+
+    time.sleep(0.1)
+    revoked.add("newest", ttl=60)
+    assert len(revoked) == 2
+    assert "token-0" not in revoked and "oldest" in revoked
@@ -0,0 +1,52 @@
+"""
+Tests for response cache warm-up
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.constants import ProductCategory
+from app.core.response_cache import response_cache
+from app.db.models import Product
+from app.services.cache_warmup import CacheWarmer
+
+
+@pytest.fixture
+def make_warmer(test_db):
+    """Create warmers reading the test database"""
+    session_factory = sessionmaker(bind=test_db.get_bind())
+    async_session_factory = async_sessionmaker(create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool))
+    return lambda **kwargs: CacheWarmer(session_factory, async_session_factory, **kwargs)
+
+
+def test_warmup_serves_first_requests_from_cache(client, test_db, test_seller, query_budget, make_warmer):
+    """Test category pages and top products are cached before the first request"""
+    products = [
+        Product(name=f"Item {i}", price=1.0 + i, quantity=5, category=category, seller_id=test_seller.id,
+                view_count=i, rating=5.0 - i, image_urls=[])
+        for i, category in enumerate([ProductCategory.DAIRY, ProductCategory.BAKERY, ProductCategory.DAIRY])
+    ]
+    test_db.add_all(products)
+    test_db.commit()
+    most_viewed, least_viewed = products[2].id, products[0].id
+
+    warmer = make_warmer(top_products=1, budget=10)
+    # Catalog and every category, then the top product by views and the top by rating
+    assert asyncio.run(warmer.run()) == 1 + len(ProductCategory) + 2
+
+    query_budget(client.get("/api/v1/products"), 0)
+    dairy = client.get("/api/v1/products?category=dairy")
+    query_budget(dairy, 0)
+    assert dairy.json()["total"] == 2
+    # Only the view count update
+    query_budget(client.get(f"/api/v1/products/{most_viewed}"), 1)
+    assert asyncio.run(warmer.run()) == 0
+
+    # Top by rating
+    query_budget(client.get(f"/api/v1/products/{least_viewed}"), 1)
+
+    response_cache.clear()
+    assert asyncio.run(make_warmer(budget=0).run()) == 0
@@ -0,0 +1,211 @@
+"""
+Tests for the email outbox and background sender
+"""
+import socket
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.core.constants import EmailStatus
+from app.core.smtp_pool import SMTPConnectionPool
+from app.db.models import EmailOutbox, User
+from app.schemas.user import UserCreate
+from app.services.email_service import EmailService
+from app.services.email_outbox import EmailOutboxWorker
+from app.services.user_service import UserService
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class CollectingHandler:
+    """aiosmtpd handler that keeps received messages in memory"""
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Local SMTP stand-in"""
+    handler = CollectingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def smtp_settings(monkeypatch):
+    """Pretend SMTP is configured so emails go to the outbox"""
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_ENABLED", True)
+
+
+def make_worker(test_db, pool, **kwargs):
+    session_factory = sessionmaker(bind=test_db.get_bind(), autocommit=False, autoflush=False)
+    return EmailOutboxWorker(session_factory=session_factory, pool=pool, rate_per_second=0, **kwargs)
+
+
+def test_send_email_only_enqueues(test_db, smtp_settings):
+    """Test that send_email writes to the outbox instead of talking to SMTP"""
+    assert EmailService.send_welcome_email("new@example.com", "New", db=test_db)
+
+    message = test_db.query(EmailOutbox).one()
+    assert message.recipient == "new@example.com"
+    assert message.status == EmailStatus.PENDING
+    assert message.attempts == 0
+
+
+def test_enqueue_joins_caller_transaction(test_db, smtp_settings):
+    """Test that a queued email commits or rolls back with the caller's changes"""
+    EmailService.send_email("dropped@example.com", "Hello", "<p>Hi</p>", db=test_db)
+    test_db.rollback()
+    assert test_db.query(EmailOutbox).count() == 0
+
+    EmailService.send_email("kept@example.com", "Hello", "<p>Hi</p>", db=test_db)
+    test_db.commit()
+    assert test_db.query(EmailOutbox.recipient).scalar() == "kept@example.com"
+
+    # A failed insert fails the caller's transaction instead of dropping the email
+    with pytest.raises(Exception):
+        EmailService.send_email("broken@example.com", None, "<p>Hi</p>", db=test_db)
+    test_db.rollback()
+    assert test_db.query(EmailOutbox).count() == 1
+
+
+def test_direct_delivery_waits_for_commit(test_db, smtp_settings, monkeypatch):
+    """Test that without the outbox an email sent with a session goes out after its commit"""
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_ENABLED", False)
+    sent = []
+    monkeypatch.setattr(EmailService, "deliver_email", lambda to, *args: sent.append(to))
+
+    assert EmailService.send_email("later@example.com", "Hello", "<p>Hi</p>", db=test_db)
+    assert sent == []
+    test_db.commit()
+    test_db.commit()
+    assert sent == ["later@example.com"]
+
+
+def test_user_and_welcome_email_commit_together(test_db, smtp_settings, monkeypatch):
+    """Test that the welcome email is queued in the transaction that creates the user"""
+    user_data = UserCreate(email="atomic@example.com", password="secret123", first_name="A", last_name="B")
+
+    def failing_commit():
+        raise RuntimeError("crashed before commit")
+
+    monkeypatch.setattr(test_db, "commit", failing_commit)
+    with pytest.raises(RuntimeError):
+        UserService.create_user(test_db, user_data)
+    test_db.rollback()
+    assert test_db.query(User).count() == 0
+    assert test_db.query(EmailOutbox).count() == 0
+
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_ENABLED", True)
+    UserService.create_user(test_db, user_data)
+    test_db.rollback()
+    assert test_db.query(EmailOutbox.recipient).scalar() == "atomic@example.com"
+
+
+def test_worker_sends_batch_over_one_connection(test_db, smtp_settings, smtp_server):
+    """Test that queued emails are delivered reusing a pooled connection"""
+    controller, handler = smtp_server
+    for i in range(3):
+        EmailService.send_email(f"user{i}@example.com", "Hello", "<p>Hi</p>", db=test_db)
+    test_db.commit()
+
+    pool = SMTPConnectionPool("127.0.0.1", controller.port, use_tls=False, size=1)
+    worker = make_worker(test_db, pool)
+    assert worker.process_batch() == 3
+    pool.close_all()
+
+    assert sorted(e.rcpt_tos[0] for e in handler.messages) == [
+        "user0@example.com", "user1@example.com", "user2@example.com"
+    ]
+    assert handler.connections == 1
+
+    test_db.expire_all()
+    assert all(m.status == EmailStatus.SENT for m in test_db.query(EmailOutbox).all())
+    assert worker.process_batch() == 0
+
+
+def test_worker_retries_with_backoff(test_db, smtp_settings):
+    """Test that connection failures reschedule the message"""
+    EmailService.send_email("retry@example.com", "Hello", "<p>Hi</p>", db=test_db)
+    test_db.commit()
+
+    pool = SMTPConnectionPool("127.0.0.1", free_port(), use_tls=False, size=1, timeout=1)
+    worker = make_worker(test_db, pool, max_attempts=2, retry_base_seconds=60)
+    assert worker.process_batch() == 1
+
+    test_db.expire_all()
+    message = test_db.query(EmailOutbox).one()
+    assert message.status == EmailStatus.PENDING
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow()
+    assert message.last_error
+
+    # Not due yet
+    assert worker.process_batch() == 0
+
+    # Last attempt marks the message as failed
+    message.next_attempt_at = datetime.utcnow()
+    test_db.commit()
+    assert worker.process_batch() == 1
+    test_db.expire_all()
+    assert test_db.query(EmailOutbox).one().status == EmailStatus.FAILED
+
+
+def test_bulk_campaign_resumes_from_checkpoint(test_db, smtp_settings, smtp_server):
+    """Test that a campaign only mails users after its checkpoint"""
+    from app.core.constants import CampaignStatus, UserRole
+    from app.db.models import EmailCampaign, User
+    from app.services.bulk_email_service import BulkEmailSender
+
+    controller, handler = smtp_server
+    users = [
+        User(email=f"bulk{i}@example.com", password_hash="x", first_name="Bulk", last_name=str(i),
+             role=UserRole.CUSTOMER)
+        for i in range(5)
+    ]
+    test_db.add_all(users)
+    test_db.commit()
+
+    # Simulate a crash after the first two users were handled
+    campaign = EmailCampaign(subject="News", html_content="<p>News</p>", status=CampaignStatus.PENDING,
+                             last_user_id=users[1].id)
+    test_db.add(campaign)
+    test_db.commit()
+
+    pool = SMTPConnectionPool("127.0.0.1", controller.port, use_tls=False, size=2)
+    session_factory = sessionmaker(bind=test_db.get_bind(), autocommit=False, autoflush=False)
+    sender = BulkEmailSender(session_factory=session_factory, pool=pool, concurrency=2, chunk_size=1, fetch_size=2)
+    result = sender.run_campaign(campaign.id)
+    pool.close_all()
+
+    assert result.status == CampaignStatus.COMPLETED
+    assert result.sent_count == 3
+    assert result.last_user_id == users[-1].id
+    assert sorted(e.rcpt_tos[0] for e in handler.messages) == [
+        "bulk2@example.com", "bulk3@example.com", "bulk4@example.com"
+    ]
+
+    # Finished campaigns are not sent again
+    assert sender.run_campaign(campaign.id) is None
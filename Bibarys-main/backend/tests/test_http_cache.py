@@ -0,0 +1,72 @@
+"""
+Tests for ETags and conditional GETs on catalog reads
+"""
+from app.config import settings
+from app.core.constants import ProductCategory
+from app.db.models import Product, Review
+from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.product_service import ProductService
+
+
+def make_product(db, seller, name="Kefir"):
+    product_data = ProductCreate(name=name, price=2.5, quantity=10, category=ProductCategory.DAIRY)
+    return ProductService.create_product(db, product_data, seller.id).id
+
+
+def test_product_etag(client, test_db, test_seller):
+    """Test 304 on a matching ETag, views counted without changing it, new ETag after an edit"""
+    seller_id = test_seller.id
+    product_id = make_product(test_db, test_seller)
+
+    first = client.get(f"/api/v1/products/{product_id}")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == settings.CACHE_CONTROL_PRODUCT
+
+    again = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    test_db.expire_all()
+    assert test_db.get(Product, product_id).view_count == 2
+    ProductService.update_product(test_db, product_id, ProductUpdate(price=3.0), seller_id)
+
+    changed = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["price"] == 3.0
+
+
+def test_product_list_etag(client, test_db, test_seller):
+    """Test list ETags follow the catalog version and the query"""
+    make_product(test_db, test_seller)
+
+    first = client.get("/api/v1/products?page_size=10")
+    etag = first.headers["ETag"]
+    assert client.get("/api/v1/products?page_size=10", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+    assert client.get("/api/v1/products?page_size=5", headers={"If-None-Match": etag}).status_code == 200
+
+    make_product(test_db, test_seller, name="Ayran")
+    refreshed = client.get("/api/v1/products?page_size=10", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["total"] == 2
+
+
+def test_review_list_etag(client, test_db, test_user, test_seller):
+    """Test review list ETag changes when a review is added"""
+    user_id, seller_id = test_user.id, test_seller.id
+    product_id = make_product(test_db, test_seller)
+    test_db.add(Review(product_id=product_id, user_id=user_id, rating=5, images=[]))
+    test_db.commit()
+
+    first = client.get(f"/api/v1/reviews/product/{product_id}")
+    etag = first.headers["ETag"]
+    assert first.json()["total"] == 1
+    assert client.get(f"/api/v1/reviews/product/{product_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    test_db.add(Review(product_id=product_id, user_id=seller_id, rating=3, images=[]))
+    test_db.commit()
+    refreshed = client.get(f"/api/v1/reviews/product/{product_id}", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["total"] == 2
@@ -0,0 +1,69 @@
+"""
+Tests for list endpoints rendered from column rows
+"""
+from app.core.constants import OrderStatus, ProductCategory, UserRole
+from app.core.security import create_access_token, hash_password
+from app.db.models import Order, OrderItem, Product, User
+from app.schemas.order import OrderResponse
+from app.schemas.product import ProductResponse
+
+
+def make_catalog(db, seller, customer):
+    products = [
+        Product(name=f"Milk {i}", description=None if i % 2 else "Fresh", price=1.5 + i, quantity=i,
+                category=ProductCategory.DAIRY, seller_id=seller.id, image_urls=[f"/static/{i}.jpg"],
+                is_active=i != 2)
+        for i in range(4)
+    ]
+    db.add_all(products)
+    db.flush()
+    order = Order(user_id=customer.id, status=OrderStatus.PROCESSING, total_price=10.0, delivery_method="standard",
+                  delivery_cost=2.0, delivery_address="Almaty, Abay 1", phone="+77010000000")
+    db.add(order)
+    db.flush()
+    db.add_all(OrderItem(order_id=order.id, product_id=p.id, quantity=2, price_at_purchase=p.price,
+                         seller_id=seller.id) for p in products[:2])
+    db.commit()
+    return products, order
+
+
+def expected(schema, obj):
+    return schema.model_validate(obj).model_dump(mode="json")
+
+
+def test_rows_match_response_schemas(client, test_db, test_user, test_seller):
+    """Test row-rendered lists equal the Pydantic rendering of the same ORM objects"""
+    admin = User(email="admin@example.com", password_hash=hash_password("adminpassword"), first_name="Admin",
+                 last_name="User", role=UserRole.ADMIN, is_active=True, is_verified=True)
+    test_db.add(admin)
+    test_db.commit()
+    products, order = make_catalog(test_db, test_seller, test_user)
+    product_json = {p.id: expected(ProductResponse, p) for p in products}
+    order_json = expected(OrderResponse, order)
+    tokens = {
+        role: create_access_token(data={"sub": str(user.id), "role": role})
+        for role, user in (("admin", admin), ("seller", test_seller), ("customer", test_user))
+    }
+
+    def get(path, role=None):
+        headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    listed = get("/api/v1/products?sort_by=price&sort_order=asc")
+    assert listed["total"] == 3 and listed["total_pages"] == 1
+    assert listed["items"] == [product_json[p.id] for p in products if p.is_active]
+
+    searched = get("/api/v1/products/search?q=milk&limit=2")
+    assert searched["total"] == 4 and searched["page_size"] == 2
+    assert all(item == product_json[item["id"]] for item in searched["items"])
+
+    assert sorted(get("/api/v1/admin/products", "admin"), key=lambda p: p["id"]) == list(product_json.values())
+    assert len(get("/api/v1/seller/products", "seller")) == 4
+
+    for path, role in (("/api/v1/orders", "customer"), ("/api/v1/admin/orders", "admin"),
+                       ("/api/v1/seller/orders", "seller")):
+        orders = get(path, role)
+        assert orders["total"] == 1
+        assert orders["items"] == [order_json]
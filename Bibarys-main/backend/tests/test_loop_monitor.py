@@ -0,0 +1,41 @@
+"""
+Tests for the event loop blocking detector
+"""
+import asyncio
+import logging
+import time
+
+from app.core.loop_monitor import LoopLagMonitor, event_loop_blocked_total, event_loop_lag_seconds
+
+
+def blocking_handler():
+    time.sleep(0.3)
+
+
+async def fake_asgi_app(scope):
+    await asyncio.sleep(0.05)
+    blocking_handler()
+    await asyncio.sleep(0.15)
+
+
+def test_logs_blocking_stack_with_route(caplog):
+    """Test that a stall is reported with the route and the blocking frame"""
+    before = event_loop_blocked_total.values().get(("GET /slow",), 0)
+    lag_before = sum(event_loop_lag_seconds.values().get((), [0])[:-1])
+
+    async def main():
+        monitor = LoopLagMonitor(threshold_ms=100, interval=0.02)
+        monitor.start()
+        try:
+            await fake_asgi_app({"type": "http", "method": "GET", "path": "/slow"})
+        finally:
+            await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        asyncio.run(main())
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("Event loop blocked for over" in m and "GET /slow" in m and "blocking_handler" in m for m in messages)
+    assert any("Event loop was blocked for" in m for m in messages)
+    assert event_loop_blocked_total.values()[("GET /slow",)] == before + 1
+    assert sum(event_loop_lag_seconds.values()[()][:-1]) > lag_before
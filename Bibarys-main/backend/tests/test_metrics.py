@@ -0,0 +1,100 @@
+"""
+Tests for Prometheus metrics
+"""
+import threading
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.core.metrics import (
+    Counter, Histogram, Registry, cache_collector, db_pool_checkout_seconds, instrument_engine
+)
+from app.core.cache import TTLCache
+
+
+def test_counter_sums_per_thread_shards():
+    """Test that increments from many threads are all counted"""
+    counter = Counter("jobs_total", "Jobs", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("a",))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(("b",), 2)
+
+    assert counter.values() == {("a",): 4000, ("b",): 2}
+    assert 'jobs_total{kind="a"} 4000' in counter.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test bucket, sum and count lines"""
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("/x",))
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+
+
+def test_cache_collector_reports_hit_ratio():
+    """Test that cache statistics become gauges"""
+    cache = TTLCache()
+    cache.set("k", 1)
+    cache.get("k")
+    cache.get("missing")
+    registry = Registry()
+    registry.register_collector(cache_collector({"demo": cache}))
+
+    text = registry.render()
+    assert 'cache_hits_total{cache="demo"} 1' in text
+    assert 'cache_hit_ratio{cache="demo"} 0.5' in text
+
+
+def test_metrics_endpoint_requires_token(client, monkeypatch):
+    """Test that metrics are hidden without a configured token and refused with a wrong one"""
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client, test_db, test_seller, monkeypatch):
+    """Test that requests are counted per route template and status"""
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    client.get("/api/v1/products/123456")
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/products/{product_id}",status="404"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/products/{product_id}",status="404",le="+Inf"}' in text
+    assert "threadpool_tokens_total" in text
+    assert "websocket_connections" in text
+    assert 'cache_hit_ratio{cache="auth_token"}' in text
+    assert 'db_pool_size{pool="primary"}' in text
+
+
+def test_pool_checkout_wait_is_timed_after_dispose(tmp_path):
+    """Test that checkouts are timed, including on the pool created by dispose()"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    instrument_engine(engine, "test-pool")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    counts = db_pool_checkout_seconds.values()[("test-pool",)]
+    assert sum(counts[:-1]) == 2
+    engine.dispose()
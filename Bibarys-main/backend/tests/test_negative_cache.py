@@ -0,0 +1,48 @@
+"""
+Tests for the negative cache of deleted product and user ids
+"""
+from app.core.constants import ProductCategory
+from app.core.security import create_access_token
+from app.schemas.product import ProductCreate
+from app.services.product_service import ProductService, missing_product_cache
+from app.services.user_service import UserService, missing_user_cache
+
+
+def make_product(db, seller_id, name):
+    product_data = ProductCreate(name=name, price=2.5, quantity=10, category=ProductCategory.DAIRY)
+    return ProductService.create_product(db, product_data, seller_id).id
+
+
+def test_deleted_product_skips_database(client, test_db, test_seller, query_budget):
+    """Test deleted ids are answered without queries, new ids are not cached and creation clears"""
+    seller_id = test_seller.id
+    deleted = make_product(test_db, seller_id, "Kefir")
+    make_product(test_db, seller_id, "Ayran")
+    ProductService.delete_product(test_db, deleted, seller_id)
+
+    assert client.get(f"/api/v1/products/{deleted}").status_code == 404
+    query_budget(client.get(f"/api/v1/products/{deleted}"), 0)
+    assert client.get(f"/api/v1/reviews/product/{deleted}").status_code == 404
+    query_budget(client.get(f"/api/v1/reviews/product/{deleted}"), 0)
+
+    # Beyond the highest id: may be created next, so always looked up,
+    # but against the recently read highest id rather than a second query
+    assert client.get("/api/v1/products/1000").status_code == 404
+    assert not missing_product_cache.is_missing(1000)
+    query_budget(client.get("/api/v1/products/1001"), 1)
+
+    missing_product_cache.remember(3, 10)
+    created = make_product(test_db, seller_id, "Tan")
+    assert created == 3
+    assert client.get(f"/api/v1/products/{created}").status_code == 200
+
+
+def test_deleted_user_token(client, test_db, test_user, test_seller):
+    """Test a token of a deleted user is rejected from the negative cache"""
+    user_id = test_user.id
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    UserService.delete_user(test_db, user_id)
+
+    assert client.get("/api/v1/cart", headers=headers).status_code == 401
+    assert missing_user_cache.is_missing(user_id)
+    assert client.get("/api/v1/cart", headers=headers).status_code == 401
@@ -0,0 +1,81 @@
+"""
+Tests for on-demand request profiling
+"""
+import pstats
+import time
+
+import pytest
+
+from app.core import profiling
+from app.core.constants import UserRole
+from app.core.profiling import ProfileStore, create_profile_token, verify_profile_token
+from app.core.security import create_access_token
+from app.db.models import User
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ProfileStore(str(tmp_path / "profiles"), max_profiles=2)
+    monkeypatch.setattr(profiling, "profile_store", store)
+    monkeypatch.setattr("app.api.v1.admin.profile_store", store)
+    return store
+
+
+def test_profile_token_signature_and_expiry():
+    """Test that tampered and expired tokens are rejected"""
+    token, expires_at = create_profile_token(60)
+    assert verify_profile_token(token)
+    assert not verify_profile_token(f"{expires_at + 1}.{token.split('.')[1]}")
+    assert not verify_profile_token(f"{int(time.time()) - 1}.deadbeef")
+    assert not verify_profile_token("garbage")
+
+
+def test_profiles_async_and_threadpool_routes(client, store):
+    """Test that async handlers and sync handlers on worker threads are both captured"""
+    token, _ = create_profile_token(60)
+
+    response = client.get("/api/v1/products", headers={"X-Profile": token})
+    assert response.status_code == 200
+    async_stats = pstats.Stats(store.get_path(response.headers["X-Profile-Id"]))
+    assert any(name == "get_products" for _, _, name in async_stats.stats)
+
+    response = client.get(f"/api/v1/products/search?q=milk&_profile={token}")
+    assert response.status_code == 200
+    sync_stats = pstats.Stats(store.get_path(response.headers["X-Profile-Id"]))
+    assert any(name == "search_products" for _, _, name in sync_stats.stats)
+
+    # Without a valid token nothing is profiled
+    assert "X-Profile-Id" not in client.get("/api/v1/products", headers={"X-Profile": "1.bad"}).headers
+
+
+def test_sampled_route_and_bounded_store(client, store, monkeypatch):
+    """Test 1-in-N sampling and eviction of the oldest profiles"""
+    monkeypatch.setattr(profiling, "sample_routes", {"GET /api/v1/products": 1})
+    ids = [client.get("/api/v1/products").headers["X-Profile-Id"] for _ in range(3)]
+
+    listed = [profile["id"] for profile in store.list()]
+    assert len(listed) == 2
+    assert ids[0] not in listed
+    assert store.list()[0]["trigger"] == "sample"
+
+
+def test_admin_lists_and_downloads_profiles(client, test_db, store):
+    """Test the admin token, list and download endpoints"""
+    admin = User(email="admin@example.com", password_hash="x", first_name="Admin", last_name="User",
+                 role=UserRole.ADMIN, is_active=True, is_verified=True)
+    test_db.add(admin)
+    test_db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id), 'role': 'admin'})}"}
+
+    token = client.post("/api/v1/admin/profiles/token?ttl=60", headers=headers).json()["token"]
+    profile_id = client.get("/api/v1/products", headers={"X-Profile": token}).headers["X-Profile-Id"]
+
+    profiles = client.get("/api/v1/admin/profiles", headers=headers).json()["profiles"]
+    assert profiles[0]["id"] == profile_id
+    assert profiles[0]["route"] == "GET /api/v1/products"
+
+    text = client.get(f"/api/v1/admin/profiles/{profile_id}?format=text", headers=headers)
+    assert "get_products" in text.text
+    download = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=headers)
+    assert download.headers["content-type"] == "application/octet-stream"
+    assert client.get("/api/v1/admin/profiles/../../etc", headers=headers).status_code == 404
@@ -0,0 +1,54 @@
+"""
+Tests for per-request SQL statistics
+"""
+import logging
+from sqlalchemy import select, text
+
+from app.core.constants import ProductCategory
+from app.core.security import create_access_token
+from app.db import query_stats
+from app.db.models import CartItem, Product
+
+
+def test_counts_statements_and_flags_repeats(test_db, caplog):
+    """Test that repeated statement shapes are reported as N+1"""
+    stats, token = query_stats.begin()
+    try:
+        for i in range(4):
+            test_db.execute(select(Product).where(Product.id == i)).all()
+        test_db.execute(text("SELECT 1"))
+    finally:
+        query_stats.end(token)
+
+    assert stats.count == 5
+    assert stats.total_time > 0
+    assert len(stats.repeated(3)) == 1
+
+    with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+        stats.warn_repeated("GET /test", threshold=3)
+    assert "Possible N+1 in GET /test: statement ran 4 times" in caplog.text
+
+    # Nothing is recorded outside a request
+    test_db.execute(text("SELECT 1"))
+    assert stats.count == 5
+
+
+def test_cart_stays_within_query_budget(client, test_db, test_user, test_seller, query_budget):
+    """Test that the cart costs the same number of queries regardless of size"""
+    products = [
+        Product(name=f"Bread {i}", description="Fresh", price=1.0, quantity=5,
+                category=ProductCategory.BAKERY, seller_id=test_seller.id, image_urls=[])
+        for i in range(5)
+    ]
+    test_db.add_all(products)
+    test_db.commit()
+    test_db.add_all([CartItem(user_id=test_user.id, product_id=p.id, quantity=1) for p in products])
+    test_db.commit()
+
+    token = create_access_token(data={"sub": str(test_user.id), "role": "customer"})
+    response = client.get("/api/v1/cart", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+    # Principal lookup + one joined cart query
+    assert query_budget(response, 2) == 2
+    assert response.headers["X-DB-Time"].endswith("ms")
@@ -0,0 +1,45 @@
+"""
+Tests for the shared rate limit storage
+"""
+import time
+from limits import parse
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.core.rate_limit import SQLiteStorage, limiter
+from app.main import app
+
+
+def test_sqlite_storage_is_shared_between_workers(tmp_path):
+    """Test that two storage instances on one file enforce a combined limit"""
+    uri = f"sqlite:///{tmp_path / 'ratelimit.db'}"
+    worker_a = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    worker_b = SlidingWindowCounterRateLimiter(SQLiteStorage(uri))
+    item = parse("5/minute")
+
+    allowed = [worker.hit(item, "login", "127.0.0.1") for worker in (worker_a, worker_b) * 4]
+    assert allowed.count(True) == 5
+    assert not worker_b.hit(item, "login", "127.0.0.1")
+    assert worker_a.hit(item, "login", "10.0.0.1")
+
+    stats = worker_b.get_window_stats(item, "login", "127.0.0.1")
+    assert stats.remaining == 0
+    assert stats.reset_time > time.time()
+
+
+def test_sqlite_storage_purges_expired_counters(tmp_path):
+    """Test that counters from old windows do not accumulate"""
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'ratelimit.db'}")
+    storage.incr("old", expiry=0)
+    assert storage.get("old") == 0
+
+    storage._next_purge = 0
+    storage.incr("new", expiry=60)
+    rows = storage._connection().execute("SELECT key FROM rate_limits").fetchall()
+    assert rows == [("new",)]
+    assert storage.get("new") == 1
+
+
+def test_auth_routes_use_app_limiter():
+    """Test that route limits and the app share one limiter and storage"""
+    assert app.state.limiter is limiter
+    assert any(name.startswith("app.api.v1.auth.") for name in limiter._route_limits)
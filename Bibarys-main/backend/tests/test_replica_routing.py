@@ -0,0 +1,107 @@
+"""
+Tests for read replica routing, with two SQLite files as primary and replica
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.models import User
+from app.db.routing import Replica, ReplicaSet, RoutingSession, client_key, mark_recent_write, recent_writers
+
+
+def make_database(path, marker):
+    """Create a database whose only user tells which file answered"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(email=f"{marker}@example.com", password_hash="x", first_name=marker, last_name="db"))
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = make_database(tmp_path / "primary.db", "primary")
+    replica_engine = make_database(tmp_path / "replica.db", "replica")
+    replica = Replica(
+        name="replica",
+        engine=replica_engine,
+        async_engine=create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"),
+    )
+    replicas = ReplicaSet([replica])
+    factory = sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)
+    yield primary, replicas, factory
+    recent_writers.clear()
+    primary.dispose()
+    replica_engine.dispose()
+
+
+def first_name(db):
+    return db.scalars(select(User.first_name).order_by(User.id)).first()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(databases):
+    """Test that queries use the replica while flushes use the primary"""
+    primary, _, factory = databases
+    with factory() as db:
+        assert first_name(db) == "replica"
+        assert db.bind_name == "replica"
+
+        db.add(User(email="new@example.com", password_hash="x", first_name="new", last_name="user"))
+        db.commit()
+
+    with sessionmaker(bind=primary)() as db:
+        assert db.scalar(select(User.id).where(User.email == "new@example.com")) is not None
+
+
+def test_read_your_writes_uses_primary(databases, monkeypatch):
+    """Test that a client who just wrote reads from the primary"""
+    _, replicas, factory = databases
+    monkeypatch.setattr(db_session, "replica_set", replicas)
+    monkeypatch.setattr(db_session, "ReadSessionLocal", factory)
+    request = Request({
+        "type": "http", "headers": [(b"authorization", b"Bearer abc")], "client": ("10.0.0.1", 1234)
+    })
+
+    dependency = db_session.get_read_db(request)
+    assert first_name(next(dependency)) == "replica"
+    dependency.close()
+
+    mark_recent_write(client_key("Bearer abc", "10.0.0.1"))
+    dependency = db_session.get_read_db(request)
+    assert first_name(next(dependency)) == "primary"
+    dependency.close()
+
+
+def test_unhealthy_replica_falls_back_to_primary(databases, tmp_path):
+    """Test that a failed health check routes reads to the primary"""
+    primary, replicas, factory = databases
+    broken = Replica(name="broken", engine=create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"))
+    replicas = ReplicaSet([broken])
+    replicas.check()
+    assert broken.healthy is False
+
+    with sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas)() as db:
+        assert first_name(db) == "primary"
+        assert db.bind_name == "primary"
+
+
+def test_async_session_reads_from_replica(databases, tmp_path):
+    """Test that async read sessions route to the replica's async engine"""
+    _, replicas, _ = databases
+    primary_async = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    factory = async_sessionmaker(primary_async, sync_session_class=RoutingSession, replicas=replicas, use_async=True)
+
+    async def read():
+        async with factory() as db:
+            name = await db.scalar(select(User.first_name).order_by(User.id))
+        await primary_async.dispose()
+        await replicas.replicas[0].async_engine.dispose()
+        return name
+
+    assert asyncio.run(read()) == "replica"
@@ -0,0 +1,88 @@
+"""
+Tests for the catalog response cache
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core.constants import ProductCategory
+from app.core.response_cache import (
+    MemoryBackend, ResponseCache, SQLiteBackend, category_tag, product_tag,
+)
+from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.product_service import ProductService
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return ResponseCache(MemoryBackend(maxsize=100, ttl=60))
+    return ResponseCache(SQLiteBackend(f"sqlite:///{tmp_path / 'cache.db'}", maxsize=100, ttl=60))
+
+
+def test_tag_invalidation(cache):
+    """Test entries are dropped by any of their tags, and reads racing a write are not kept"""
+    key = cache.key("products", {"page": 1, "category": None, "sort_by": "price"})
+    assert key == "products?page=1&sort_by=price"
+
+    tags = (product_tag(1), category_tag(ProductCategory.DAIRY))
+    cache.set(key, b"{}", 'W/"a"', tags, cache.versions(tags))
+    assert cache.get(key).body == b"{}"
+
+    cache.invalidate_products([2], [ProductCategory.BAKERY])
+    assert cache.get(key) is not None
+    cache.invalidate_products([1], [])
+    assert cache.get(key) is None
+
+    # Versions read, then a write invalidates before the result is stored
+    versions = cache.versions(tags)
+    cache.invalidate(category_tag(ProductCategory.DAIRY))
+    cache.set(key, b"[]", 'W/"b"', tags, versions)
+    assert cache.get(key) is None
+
+
+def test_async_access_keeps_blocking_backend_off_the_loop(cache, monkeypatch):
+    """Test that coroutines reach the SQLite backend on worker threads, the memory one inline"""
+    threads = []
+    for name in ("get", "set", "versions"):
+        method = getattr(cache.backend, name)
+        monkeypatch.setattr(cache.backend, name, lambda *args, _method=method: (
+            threads.append(threading.get_ident()), _method(*args))[1])
+
+    async def main():
+        tags = (product_tag(1),)
+        versions = await cache.versions_async(tags)
+        await cache.set_async("products?page=1", b"{}", 'W/"a"', tags, versions)
+        return threading.get_ident(), await cache.get_async("products?page=1")
+
+    loop_thread, entry = asyncio.run(main())
+    assert entry.body == b"{}"
+    on_loop = [thread == loop_thread for thread in threads]
+    assert on_loop == [not cache.backend.blocking] * len(threads)
+
+
+def test_catalog_reads_cached_until_product_write(client, test_db, test_seller, query_budget):
+    """Test repeated reads skip the database and service writes invalidate them"""
+    seller_id = test_seller.id
+    dairy = ProductService.create_product(
+        test_db, ProductCreate(name="Kefir", price=2.5, quantity=10, category=ProductCategory.DAIRY), seller_id
+    ).id
+    bakery = ProductService.create_product(
+        test_db, ProductCreate(name="Bread", price=1.0, quantity=10, category=ProductCategory.BAKERY), seller_id
+    ).id
+
+    first = client.get(f"/api/v1/products/{dairy}")
+    cached = client.get(f"/api/v1/products/{dairy}")
+    assert cached.content == first.content
+    # Only the view count update
+    query_budget(cached, 1)
+
+    dairy_list = client.get("/api/v1/products?category=dairy").content
+    ProductService.update_product(test_db, bakery, ProductUpdate(price=1.2), seller_id)
+    query_budget(client.get("/api/v1/products?category=dairy"), 0)
+    assert client.get("/api/v1/products").json()["items"][0]["price"] == 1.2
+
+    ProductService.update_product(test_db, dairy, ProductUpdate(price=3.0), seller_id)
+    assert client.get(f"/api/v1/products/{dairy}").json()["price"] == 3.0
+    assert client.get("/api/v1/products?category=dairy").content != dairy_list
@@ -0,0 +1,65 @@
+"""
+Tests for search facets
+"""
+from app.core.constants import ProductCategory
+from app.db.models import Product
+from app.schemas.product import ProductUpdate
+from app.services.product_service import ProductService
+
+
+def test_search_facets(client, test_db, test_seller, query_budget):
+    """Test facet counts, filters they ignore, caching and invalidation"""
+    seller_id = test_seller.id
+    specs = [
+        (ProductCategory.DAIRY, 3.0, 10, 4.5),
+        (ProductCategory.DAIRY, 12.0, 0, 3.2),
+        (ProductCategory.BAKERY, 30.0, 5, 0.0),
+        (ProductCategory.BAKERY, 150.0, 5, 2.0),
+    ]
+    products = [
+        Product(name=f"Milk bar {i}", price=price, quantity=quantity, category=category,
+                rating=rating, seller_id=seller_id, image_urls=[])
+        for i, (category, price, quantity, rating) in enumerate(specs)
+    ]
+    products.append(Product(name="Bread", price=1.0, quantity=1, category=ProductCategory.BAKERY,
+                            seller_id=seller_id, image_urls=[]))
+    test_db.add_all(products)
+    test_db.commit()
+    first_id = products[0].id
+
+    plain = client.get("/api/v1/products/search?q=milk").json()
+    assert "facets" not in plain
+
+    facets = client.get("/api/v1/products/search?q=milk&facets=true&price_buckets=10,100").json()["facets"]
+    categories = {entry["category"]: entry["count"] for entry in facets["categories"]}
+    assert categories["dairy"] == 2 and categories["bakery"] == 2 and categories["meat"] == 0
+    assert facets["price"] == [
+        {"min": 0.0, "max": 10.0, "count": 1},
+        {"min": 10.0, "max": 100.0, "count": 2},
+        {"min": 100.0, "max": None, "count": 1},
+    ]
+    assert facets["rating"] == [
+        {"min_rating": 4, "count": 1}, {"min_rating": 3, "count": 2},
+        {"min_rating": 2, "count": 3}, {"min_rating": 1, "count": 3},
+    ]
+    assert facets["in_stock"] == 3
+
+    # Category counts ignore the category filter; the rest apply it
+    response = client.get("/api/v1/products/search?q=milk&category=dairy&in_stock=true&facets=true&price_buckets=10,100")
+    filtered = response.json()
+    assert filtered["total"] == 1
+    categories = {entry["category"]: entry["count"] for entry in filtered["facets"]["categories"]}
+    assert categories["dairy"] == 1 and categories["bakery"] == 2
+    assert [bucket["count"] for bucket in filtered["facets"]["price"]] == [1, 0, 0]
+    assert filtered["facets"]["in_stock"] == 1
+
+    # Facet rows cached: only the result queries run
+    query_budget(client.get("/api/v1/products/search?q=milk&skip=1&facets=true&price_buckets=10,100"), 2)
+
+    ProductService.update_product(test_db, first_id, ProductUpdate(price=20.0), seller_id)
+    facets = client.get("/api/v1/products/search?q=milk&facets=true&price_buckets=10,100").json()["facets"]
+    assert [bucket["count"] for bucket in facets["price"]] == [0, 3, 1]
+
+    assert client.get("/api/v1/products/search?q=milk&facets=true&price_buckets=10,5").status_code == 400
+    for bounds in ("10,nan", "nan", "10,inf", "1e999"):
+        assert client.get(f"/api/v1/products/search?q=milk&facets=true&price_buckets={bounds}").status_code == 400
@@ -0,0 +1,98 @@
+"""
+Tests for password hashing executor
+"""
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+
+from app.core.exceptions import ServiceUnavailableException
+from app.core.security import PasswordHasher, pwd_context, verify_password
+from app.services.user_service import UserService
+
+
+def test_hasher_rejects_when_queue_is_full():
+    """Test that hashing fails fast once workers and queue are busy"""
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hash"
+
+    worker = threading.Thread(target=hasher.run, args=(slow_hash,))
+    worker.start()
+    started.wait(5)
+
+    with pytest.raises(ServiceUnavailableException) as exc_info:
+        hasher.run(lambda: "other")
+    assert exc_info.value.status_code == 503
+
+    release.set()
+    worker.join()
+    stats = hasher.stats()
+    assert stats["count"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_login_rehashes_password_with_new_rounds(test_db, test_user):
+    """Test that hashes made with other BCRYPT_ROUNDS are upgraded on login"""
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    test_user.password_hash = old_context.hash("testpassword")
+    test_db.commit()
+
+    user = UserService.authenticate_user(test_db, "test@example.com", "testpassword")
+
+    assert user is not None
+    assert user.password_hash.startswith("$2b$")
+    assert not pwd_context.needs_update(user.password_hash)
+    assert verify_password("testpassword", user.password_hash)
+
+
+def test_login_releases_connection_while_hashing(test_db, test_user, monkeypatch):
+    """Test that no transaction (on SQLite, the writer connection) is held during bcrypt"""
+    from app.services import user_service
+
+    verify = user_service.verify_and_update_password
+    in_transaction = []
+
+    def checking_verify(*args):
+        in_transaction.append(test_db.in_transaction())
+        return verify(*args)
+
+    monkeypatch.setattr(user_service, "verify_and_update_password", checking_verify)
+    user = UserService.authenticate_user(test_db, "test@example.com", "testpassword")
+
+    assert user is not None and user.role is not None
+    assert in_transaction == [False]
+
+
+def test_async_hashing_holds_no_thread_while_queued():
+    """Test that async callers queue on the executor and are rejected past the limit"""
+    hasher = PasswordHasher(workers=1, queue_limit=2)
+    release = threading.Event()
+
+    async def main():
+        waiting = [asyncio.ensure_future(hasher.run_async(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServiceUnavailableException):
+            await hasher.run_async(lambda: "other")
+        # Queued callers are coroutines, not threads
+        assert threading.active_count() <= threads_before + 1
+        release.set()
+        return await asyncio.gather(*waiting)
+
+    threads_before = threading.active_count()
+    assert asyncio.run(main()) == [True, True, True]
+    assert hasher.run(lambda: "free again") == "free again"
+
+
+def test_login_endpoint(client, test_user):
+    """Test login through the async route"""
+    response = client.post("/api/v1/auth/login", json={"email": "test@example.com", "password": "testpassword"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+    wrong = client.post("/api/v1/auth/login", json={"email": "test@example.com", "password": "wrongpassword"})
+    assert wrong.status_code == 401
@@ -0,0 +1,50 @@
+"""
+Tests for the synthetic data generator
+"""
+from datetime import date
+
+from sqlalchemy import text
+
+import seed_data
+
+
+def seed(path, **overrides):
+    engine = seed_data.create_seed_engine(f"sqlite:///{path}")
+    volumes = dict(users=50, products=200, order_items=2000, reviews=300,
+                   cart_items=40, wishlist_items=60, transactions=200, sellers=5)
+    volumes.update(overrides)
+    try:
+        counts = seed_data.Seeder(engine, 7, date(2025, 12, 31), 365, 500, 1.1).run(**volumes)
+        with engine.connect() as conn:
+            orders = conn.execute(text("SELECT * FROM orders ORDER BY id")).all()
+            items = conn.execute(text(
+                "SELECT product_id, COUNT(*) FROM order_items GROUP BY product_id ORDER BY 2 DESC"
+            )).all()
+            totals = conn.execute(text(
+                "SELECT o.total_price, SUM(i.price_at_purchase * i.quantity) + o.delivery_cost "
+                "FROM orders o JOIN order_items i ON i.order_id = o.id GROUP BY o.id"
+            )).all()
+    finally:
+        engine.dispose()
+    return counts, orders, items, totals
+
+
+def test_volumes_and_consistency(tmp_path):
+    """Test requested volumes, order totals and Zipfian popularity"""
+    counts, orders, items, totals = seed(tmp_path / "a.db")
+
+    assert counts["users"] == 50
+    assert counts["order_items"] == 2000
+    assert counts["orders"] == counts["payments"] == len(orders)
+    assert counts["cart_items"] == 40 and counts["wishlist"] == 60
+    assert all(abs(total - expected) < 0.01 for total, expected in totals)
+    # The most popular 5% of products get far more than 5% of order items
+    top = sum(n for _, n in items[:10])
+    assert top > 0.3 * 2000
+
+
+def test_same_seed_same_rows(tmp_path):
+    """Test that generation is deterministic per seed"""
+    _, first, _, _ = seed(tmp_path / "a.db")
+    _, second, _, _ = seed(tmp_path / "b.db")
+    assert first == second
@@ -0,0 +1,126 @@
+"""
+Tests for single-flight request coalescing
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.config import settings
+from app.core.exceptions import NotFoundException
+from app.core.single_flight import SingleFlight, SingleFlightError, single_flight_requests_total
+
+
+def counts(name):
+    values = single_flight_requests_total.values()
+    return {result: values.get((name, result), 0) for result in ("executed", "shared", "timeout")}
+
+
+def test_threads_share_one_call():
+    """Test concurrent sync callers get the first caller's result and its exceptions"""
+    flight = SingleFlight("test_threads")
+    release = threading.Event()
+    calls = []
+
+    def lookup():
+        calls.append(1)
+        release.wait(5)
+        return {"id": 1}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, 1, lookup)]
+        while not flight._calls:
+            pass
+        futures += [pool.submit(flight.do, 1, lookup) for _ in range(7)]
+        # Followers are waiting on the first call
+        time.sleep(0.2)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert counts("test_threads") == {"executed": 1, "shared": 7, "timeout": 0}
+
+    def missing():
+        raise NotFoundException(detail="Product not found")
+
+    with pytest.raises(NotFoundException):
+        flight.do(2, missing)
+    assert not flight._calls
+
+
+def test_coroutines_share_one_call(monkeypatch):
+    """Test concurrent async callers share a result, and stop waiting after the max wait"""
+    flight = SingleFlight("test_async")
+    calls = []
+
+    async def lookup(delay):
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("page=1", lambda: lookup(0.05)) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert counts("test_async") == {"executed": 1, "shared": 9, "timeout": 0}
+
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_MAX_WAIT", 0.01)
+    calls.clear()
+
+    async def slow_first():
+        first = asyncio.create_task(flight.do_async("page=2", lambda: lookup(0.2)))
+        await asyncio.sleep(0)
+        second = await flight.do_async("page=2", lambda: lookup(0))
+        return await first, second
+
+    assert asyncio.run(slow_first()) == (2, 2)
+    assert counts("test_async")["timeout"] == 1
+    assert not flight._futures
+
+
+def test_waiting_callers_get_their_own_exception():
+    """Test followers of a failed call get a copy of API errors and a chained error otherwise"""
+    flight = SingleFlight("test_errors")
+
+    def follower_error(key, error):
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise error
+
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flight.do, key, failing)
+            while not flight._calls:
+                pass
+            follower = pool.submit(flight.do, key, failing)
+            time.sleep(0.1)
+            release.set()
+            assert leader.exception() is error
+            return follower.exception()
+
+    not_found = NotFoundException(detail="Product not found")
+    shared = follower_error(1, not_found)
+    assert isinstance(shared, NotFoundException) and shared is not not_found
+    assert (shared.status_code, shared.detail) == (404, "Product not found")
+    assert shared.__cause__ is not_found
+
+    broken = RuntimeError("database is locked")
+    shared = follower_error(2, broken)
+    assert isinstance(shared, SingleFlightError) and shared.__cause__ is broken
+
+    async def failing_async():
+        await asyncio.sleep(0.05)
+        raise broken
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do_async("page=1", failing_async) for _ in range(2)), return_exceptions=True
+        )
+
+    leader_error, shared = asyncio.run(main())
+    assert leader_error is broken
+    assert isinstance(shared, SingleFlightError) and shared.__cause__ is broken
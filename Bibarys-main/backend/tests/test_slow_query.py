@@ -0,0 +1,84 @@
+"""
+Tests for the slow query log
+"""
+from sqlalchemy import create_engine, text
+
+from app.core.constants import UserRole
+from app.core.security import create_access_token
+from app.db.models import User
+from app.db.slow_query import SlowQueryRecorder, fingerprint, redact_parameters
+
+
+def test_fingerprint_groups_statements_by_shape():
+    """Test that literals, placeholders and IN lists are normalized"""
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.c' AND id = 42") == \
+        "SELECT * FROM users WHERE email = ? AND id = ?"
+    assert fingerprint("SELECT id FROM products\n  WHERE id IN (?, ?, ?) LIMIT ?") == \
+        fingerprint("SELECT id FROM products WHERE id IN (%(id_1)s, %(id_2)s) LIMIT 20")
+    # Bound parameter names with digits are not literals
+    assert fingerprint("SELECT anon_1.id FROM anon_1") == "SELECT anon_1.id FROM anon_1"
+
+
+def test_parameters_are_redacted():
+    """Test that text values are hidden and numbers kept"""
+    assert redact_parameters(("secret@example.com", 5, None, b"\x00\x01")) == \
+        ["<redacted:18>", 5, None, "<bytes:2>"]
+    assert redact_parameters({"password": "hunter2", "limit": 20}) == \
+        {"password": "<redacted:7>", "limit": 20}
+
+
+def test_records_slow_statements_with_plan(tmp_path):
+    """Test that statements past the threshold are grouped and explained afterwards"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    recorder = SlowQueryRecorder(threshold_ms=0, max_entries=2)
+    recorder.install(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(3):
+            conn.execute(text("SELECT * FROM items WHERE name = :name"), {"name": f"item-{i}"})
+
+    # Not explained inside the request's transaction, only on a later pass
+    assert all(entry["plan"] is None for entry in recorder.top())
+    recorder.explain_pending()
+    entries = {entry["statement"]: entry for entry in recorder.top()}
+    select = entries["SELECT * FROM items WHERE name = ?"]
+    assert select["count"] == 3
+    assert select["parameters"][0].startswith("<redacted:")
+    assert any("SCAN" in line for line in select["plan"])
+    assert select["avg_ms"] == select["total_ms"] / 3
+
+    # Only the fingerprints with the most total time are kept
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert len(recorder.top()) == 2
+    recorder.clear()
+    assert recorder.top() == []
+    engine.dispose()
+
+
+def test_admin_endpoint_lists_slow_queries(client, test_db, test_user, monkeypatch):
+    """Test that only admins can read and reset the slow query log"""
+    recorder = SlowQueryRecorder(threshold_ms=0)
+    monkeypatch.setattr("app.api.v1.admin.slow_query_recorder", recorder)
+    recorder.record(test_db.connection(), "SELECT * FROM users WHERE id = 1", (), 0.5)
+
+    admin = User(email="admin@example.com", password_hash="x", first_name="Admin", last_name="User",
+                 role=UserRole.ADMIN, is_active=True, is_verified=True)
+    test_db.add(admin)
+    test_db.commit()
+    admin_id, user_id = admin.id, test_user.id
+
+    token = create_access_token(data={"sub": str(user_id), "role": "customer"})
+    response = client.get("/api/v1/admin/slow-queries", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin_id), 'role': 'admin'})}"}
+    response = client.get("/api/v1/admin/slow-queries", headers=headers)
+    assert response.status_code == 200
+    queries = response.json()["queries"]
+    assert queries[0]["statement"] == "SELECT * FROM users WHERE id = ?"
+    assert queries[0]["max_ms"] == 500
+
+    assert client.delete("/api/v1/admin/slow-queries", headers=headers).status_code == 200
+    assert recorder.top() == []
@@ -0,0 +1,43 @@
+"""
+Tests for the SQLite connection profile
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.db.session import configure_sqlite
+
+
+def test_pragmas_applied_on_connect(tmp_path):
+    """Test that writer connections use WAL and the configured pragmas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", pool_size=1, max_overflow=0)
+    configure_sqlite(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+    engine.dispose()
+
+
+def test_read_connections_reject_writes(tmp_path):
+    """Test that the reader pool cannot modify the database"""
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    writer = create_engine(url, pool_size=1, max_overflow=0)
+    reader = create_engine(url, pool_size=2, max_overflow=0)
+    configure_sqlite(writer)
+    configure_sqlite(reader, read_only=True)
+
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM items")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(text("INSERT INTO items (name) VALUES ('b')"))
+
+    writer.dispose()
+    reader.dispose()